@@ -0,0 +1,115 @@
+"""
+Разбор python файлов SourceExtractor: проверка результата на модулях с эндпоинтами, декораторами
+и методами классов и время однопроходного обхода сверх ast.parse.
+
+    python app/algorithm/benchmarks/ast_extraction.py --files 200 --repeat 5
+"""
+import argparse
+import ast
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from services.ast_extractor import SourceExtractor  # noqa: E402
+
+
+def generate_module(i: int, functions: int) -> str:
+    """Модуль, похожий на слой API/сервисов FastAPI приложения"""
+    lines = [
+        "import os",
+        "from fastapi import APIRouter, Depends, status",
+        f"from app.services.s{i} import Service{i}",
+        f"router = APIRouter(prefix='/r{i}', tags=['r{i}'])",
+        "",
+        f"class Service{i}:",
+        "    def __init__(self, repo):",
+        "        self.repo = repo",
+    ]
+    for j in range(functions):
+        lines += [
+            "    @staticmethod",
+            f"    def method{j}(self, item: Item{j}, limit: int = 10) -> list:",
+            f"        data = self.repo.fetch(item.id, limit=min(limit, len(os.environ)))",
+            f"        for row in data:",
+            f"            if row.valid():",
+            f"                self.repo.save(row.transform(lambda x: x.strip()), commit=bool(row))",
+            f"        return [self.method{(j + 1) % functions}(item) for _ in range(limit)]",
+        ]
+    for j in range(functions):
+        lines += [
+            f"@router.get('/items{j}/{{item_id}}', response_model=List[Item{j}],"
+            f" status_code=status.HTTP_200_OK, dependencies=[Depends(auth)])",
+            f"async def get_item{j}(item_id: int, service: Service{i} = Depends(get_service)) -> Item{j}:",
+            f"    result = await service.method{j}(await load(item_id), limit=int(os.getenv('L', '5')))",
+            f"    log.info('item %s', item_id)",
+            f"    return Item{j}.model_validate(result)",
+            "",
+            f"@cache(ttl=timedelta(seconds=60), key=lambda *a, **kw: str(a) + str(sorted(kw.items())))",
+            f"def helper{j}(value, *rest):",
+            f"    return sum(map(int, filter(None, [value, *rest])))",
+            "",
+            "@cache(ttl=60)",
+            f"@router.post('/items{j}', response_model=Item{j})",
+            f"async def create_item{j}(item: Item{j}):",
+            f"    return await plain{j}(item)",
+            "",
+            f"def plain{j}(item):",
+            f"    return validate(item)",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def check_expectations() -> None:
+    """Функции без декораторов учитываются, эндпоинт находится под любым числом декораторов"""
+    funcs = SourceExtractor("app/m0.py").extract(generate_module(0, 1)).functions
+    expected = {
+        "Service0.__init__": (False, []),
+        "Service0.method0": (False, ["staticmethod"]),
+        "get_item0": (True, ["router.get"]),
+        "helper0": (False, ["cache"]),
+        "create_item0": (True, ["cache", "router.post"]),
+        "plain0": (False, []),
+    }
+    actual = {name: (func.is_endpoint, [dec.name for dec in func.decorators]) for name, func in funcs.items()}
+    if actual != expected:
+        raise SystemExit(f"Разбор модуля не совпал с ожидаемым: {actual}")
+    endpoint = funcs["create_item0"].endpoint
+    if (endpoint.method, endpoint.full_path, endpoint.response_model) != ("post", "/r0/items0", "Item0"):
+        raise SystemExit(f"Эндпоинт под декоратором разобран неверно: {endpoint}")
+
+
+def measure(parse, sources, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for file_path, code in sources:
+            parse(code, file_path)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--files", type=int, default=200)
+    argparser.add_argument("--functions", type=int, default=20, help="функций каждого вида в модуле")
+    argparser.add_argument("--repeat", type=int, default=5)
+    args = argparser.parse_args()
+
+    check_expectations()
+    sources = [(f"app/m{i}.py", generate_module(i, args.functions)) for i in range(args.files)]
+
+    size = sum(len(code) for _, code in sources)
+    parse_only = measure(lambda code, file_path: ast.parse(code, filename=file_path), sources, args.repeat)
+    extractor = measure(lambda code, file_path: SourceExtractor(file_path).extract(code), sources, args.repeat)
+
+    print(f"файлов: {len(sources)}, {size / 1024 / 1024:.1f} МБ, лучший из {args.repeat} прогонов")
+    print(f"ast.parse:        {parse_only:.3f} с")
+    print(f"SourceExtractor:  {extractor:.3f} с (обход {extractor - parse_only:.3f} с, "
+          f"{(extractor - parse_only) / parse_only:.0%} от ast.parse)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Бенчмарк сжатия сообщений стрима задачи без MinIO и gRPC: синтетический проект разбирается
+через InMemoryStorage, сообщения собираются ParseService.messages и сжимаются так же, как в gRPC
+(gzip - zlib с заголовком gzip, deflate - zlib поток). Для каждого вида сообщений выводится
+объём до и после сжатия и время сжатия/распаковки на сообщение.
+
+    python app/algorithm/benchmarks/compression_benchmark.py --files 500 --encoding node_table
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import zlib
+from collections import defaultdict
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from infrastructure.object_storage.memory_storage import InMemoryStorage  # noqa: E402
+from project_generator import PREFIX, ProjectShape, generate_project  # noqa: E402
+from services.analyzer import ProjectAnalyzer  # noqa: E402
+from services.manage.object_manager import object_manager  # noqa: E402
+from services.manage.parse_cache_manager import parse_cache  # noqa: E402
+from services.parse_backend import parse_backend  # noqa: E402
+from services.parse_service import ParseService  # noqa: E402
+
+# wbits как у zlib в gRPC: 31 - формат gzip, 15 - формат zlib (deflate в gRPC)
+WBITS = {"gzip": 31, "deflate": 15}
+
+
+def compressor(wbits: int, level: int) -> Callable[[bytes], bytes]:
+    def compress(data: bytes) -> bytes:
+        obj = zlib.compressobj(level, zlib.DEFLATED, wbits)
+        return obj.compress(data) + obj.flush()
+    return compress
+
+
+def measure(func: Callable[[bytes], bytes], payloads: List[bytes], repeat: int) -> float:
+    """Лучшее время обработки всех payloads из repeat прогонов"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for payload in payloads:
+            func(payload)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+async def collect(args: argparse.Namespace) -> Dict[str, List[bytes]]:
+    """Сериализованные сообщения стрима, сгруппированные по заполненному полю oneof"""
+    shape = ProjectShape(files=args.files, seed=args.seed)
+    object_manager.repo = InMemoryStorage(generate_project(shape))
+    parse_cache.repo = None
+    parse_backend.mode = "inline"
+    parse_backend.start()
+    try:
+        analysis = await ProjectAnalyzer(PREFIX).run()
+    finally:
+        parse_backend.shutdown()
+
+    groups: Dict[str, List[bytes]] = defaultdict(list)
+    async for msg in ParseService().messages(1, analysis, encoding=args.encoding):
+        groups[msg.WhichOneof("graph_part_type")].append(msg.SerializeToString())
+    return groups
+
+
+def report(groups: Dict[str, List[bytes]], algorithm: str, level: int, min_bytes: int, repeat: int) -> None:
+    compress = compressor(WBITS[algorithm], level)
+    decompress: Callable[[bytes], bytes] = lambda data: zlib.decompress(data, WBITS[algorithm])
+
+    print(f"\n{algorithm}, уровень {level}, порог {min_bytes} байт")
+    print(f"{'сообщения':<28}{'шт':>6}{'байт':>12}{'сжато':>12}{'доля':>8}{'сжатие, мкс':>14}{'распаковка, мкс':>17}")
+    total: Tuple[int, int, int] = (0, 0, 0)
+    for name, payloads in groups.items():
+        # сообщения меньше порога уходят без сжатия
+        large = [payload for payload in payloads if len(payload) >= min_bytes]
+        compressed = [compress(payload) for payload in large]
+        raw = sum(len(payload) for payload in payloads)
+        sent = raw - sum(len(payload) for payload in large) + sum(len(data) for data in compressed)
+        compress_us = measure(compress, large, repeat) / len(payloads) * 1e6
+        decompress_us = measure(decompress, compressed, repeat) / len(payloads) * 1e6
+        print(f"{name:<28}{len(payloads):>6}{raw:>12}{sent:>12}{sent / raw:>8.2f}"
+              f"{compress_us:>14.1f}{decompress_us:>17.1f}")
+        total = (total[0] + len(payloads), total[1] + raw, total[2] + sent)
+    print(f"{'всего':<28}{total[0]:>6}{total[1]:>12}{total[2]:>12}{total[2] / total[1]:>8.2f}")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--files", type=int, default=200, help="python модулей в проекте")
+    argparser.add_argument("--seed", type=int, default=0)
+    argparser.add_argument("--encoding", choices=ParseService.ARCHITECTURE_ENCODINGS, default="batch")
+    argparser.add_argument("--algorithm", action="append", choices=list(WBITS),
+                           help="по умолчанию - все")
+    argparser.add_argument("--level", type=int, action="append", help="уровень zlib, по умолчанию 1 и 6")
+    argparser.add_argument("--min-bytes", type=int, default=1024, help="порог сжатия сообщения")
+    argparser.add_argument("--repeat", type=int, default=3)
+    args = argparser.parse_args()
+
+    # журнал сервисов на каждое сообщение исказил бы замеры
+    logging.disable(logging.INFO)
+    groups = asyncio.run(collect(args))
+    print(f"файлов: {args.files}, архитектура: {args.encoding}, лучший из {args.repeat}")
+    for algorithm in args.algorithm or list(WBITS):
+        for level in args.level or [1, 6]:
+            report(groups, algorithm, level, args.min_bytes, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Память, занимаемая результатами разбора всех функций проекта:
+прежнее представление словарями (FunctionInfo.to_dict) против FunctionInfo.
+
+    python app/algorithm/benchmarks/function_memory.py --files 2000
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from project_generator import ProjectShape, generate_project, python_files  # noqa: E402
+from services.ast_extractor import SourceExtractor  # noqa: E402
+
+
+def parse_dicts(code: bytes, file_path: str) -> Dict[str, Dict]:
+    """Функции файла словарями, как их возвращал прежний разбор"""
+    return {name: func.to_dict() for name, func in SourceExtractor(file_path).extract(code).functions.items()}
+
+
+def retained(parse: Callable[[bytes, str], Dict], sources: Dict[str, bytes], keys: List[str]):
+    """Байты, которые остаются занятыми результатами разбора после освобождения AST"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        results = [parse(sources[key], key) for key in keys]
+        gc.collect()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return after - before, sum(len(funcs) for funcs in results)
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--files", type=int, default=2000)
+    argparser.add_argument("--seed", type=int, default=0)
+    args = argparser.parse_args()
+
+    files = generate_project(ProjectShape(files=args.files, seed=args.seed))
+    keys = python_files(files)
+
+    legacy_bytes, legacy_functions = retained(parse_dicts, files, keys)
+    records_bytes, records_functions = retained(lambda code, key: SourceExtractor(key).extract(code).functions, files, keys)
+    assert legacy_functions == records_functions
+
+    print(f"файлов: {len(keys)}, функций: {records_functions}")
+    print(f"словари:      {legacy_bytes / 1024 / 1024:8.1f} МБ, {legacy_bytes / legacy_functions:6.0f} байт на функцию")
+    print(f"FunctionInfo: {records_bytes / 1024 / 1024:8.1f} МБ, {records_bytes / records_functions:6.0f} байт на функцию")
+    print(f"экономия: {legacy_bytes / records_bytes:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Повторная загрузка проекта после правки: полный анализ против инкрементального по снимку прошлого анализа.
+Изменённые модули генерируются заново (другие вызовы и импорты), каждая загрузка лежит под новым префиксом,
+как у core. Проверяется, что инкрементальный граф совпадает с полным. Время снимка (распаковка и запись)
+выводится отдельно: оно зависит от размера проекта, а не правки. Перед замерами тот же проект анализируется
+из папки и из zip-архива: имена модулей, граф и снимок не должны зависеть от способа загрузки.
+
+    python app/algorithm/benchmarks/incremental_analysis.py --files 1000 --changed 1 --changed 10 --changed 100
+"""
+import argparse
+import asyncio
+import io
+import logging
+import os
+import random
+import sys
+import time
+import uuid
+import zipfile
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from infrastructure.object_storage.memory_storage import InMemoryStorage  # noqa: E402
+from models.snapshot_models import AnalysisSnapshot  # noqa: E402
+from project_generator import PREFIX, ProjectShape, _module, generate_project  # noqa: E402
+from services.analyzer import ProjectAnalyzer  # noqa: E402
+from services.manage.object_manager import object_manager  # noqa: E402
+from services.manage.parse_cache_manager import parse_cache  # noqa: E402
+from services.manage.snapshot_manager import SnapshotManager  # noqa: E402
+from services.parse_backend import parse_backend  # noqa: E402
+
+
+def upload(files: Dict[str, bytes]) -> str:
+    """Новая загрузка проекта: файлы под префиксом с новым uuid, как у core"""
+    prefix = f"bench/project.zip/{uuid.uuid4()}/None/unpacked/"
+    object_manager.repo = InMemoryStorage({prefix + key[len(PREFIX):]: content for key, content in files.items()})
+    return prefix
+
+
+def upload_archive(files: Dict[str, bytes]) -> str:
+    """Та же загрузка одним zip-архивом: ключ архива без завершающего слэша"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for key, content in files.items():
+            archive.writestr(key[len(PREFIX):], content)
+    key = f"bench/project.zip/{uuid.uuid4()}/None/archive.zip"
+    object_manager.repo = InMemoryStorage({key: buffer.getvalue()})
+    return key
+
+
+def relative_graph(graph: List, prefix: str) -> List:
+    """Граф без корня загрузки: узлы из папки и из архива сравнимы"""
+    strip = (lambda name: name[len(prefix):] if name.startswith(prefix) else name)
+    return sorted((strip(parent), sorted(map(strip, children))) for parent, children in graph)
+
+
+async def check_sources(files: Dict[str, bytes]) -> None:
+    """Папка и архив одного проекта дают одинаковые модули, граф и снимок"""
+    results = []
+    for load in (upload, upload_archive):
+        # без прошлого снимка анализ полный, но рёбра файлов попадают в снимок
+        _, analysis, graph = await analyze(load(files))
+        snapshot = analysis.snapshot(1)
+        results.append((relative_graph(graph, analysis.prefix),
+                        {rel: (file.edges, file.used_modules, file.module_refs)
+                         for rel, file in snapshot.files.items()}))
+    (folder_graph, folder_files), (archive_graph, archive_files) = results
+    if not folder_graph or folder_graph != archive_graph or folder_files != archive_files:
+        raise SystemExit("граф или снимок проекта из архива не совпал с загрузкой папкой")
+
+
+async def analyze(prefix: str, previous: AnalysisSnapshot = None,
+                  incremental: bool = True) -> Tuple[float, ProjectAnalyzer, List]:
+    started = time.perf_counter()
+    analysis = await ProjectAnalyzer(prefix, previous, incremental=incremental).run()
+    graph = list(analysis.call_graph())
+    return time.perf_counter() - started, analysis, graph
+
+
+async def run(args: argparse.Namespace) -> None:
+    shape = ProjectShape(files=args.files, seed=args.seed)
+    files = generate_project(shape)
+    rnd = random.Random(args.seed)
+    await check_sources(files)
+
+    _, first, _ = await analyze(upload(files))
+    snapshot = first.snapshot(1)
+    started = time.perf_counter()
+    blob = SnapshotManager._dumps(snapshot)
+    dump_time = time.perf_counter() - started
+
+    print(f"файлов: {args.files}, снимок: {len(blob)} байт, сериализация {dump_time:.3f} с")
+    print(f"{'изменено':>9}{'заново':>8}{'полный, с':>11}{'инкр., с':>10}{'снимок, с':>11}"
+          f"{'+рёбер':>8}{'-рёбер':>8}{'граф совпал':>13}")
+    for changed in args.changed:
+        edited = dict(files)
+        for i in rnd.sample(range(args.files), changed):
+            edited[f"{PREFIX}app/m{i}.py"] = _module(shape, i, random.Random(rnd.random())).encode("utf-8")
+
+        prefix = upload(edited)
+        full_time, _, full_graph = await analyze(prefix, incremental=False)
+
+        started = time.perf_counter()
+        previous = SnapshotManager._loads(blob)
+        load_time = time.perf_counter() - started
+        inc_time, analysis, graph = await analyze(prefix, previous)
+        delta = analysis.graph_delta()
+
+        print(f"{changed:>9}{delta.reanalyzed_files:>8}{full_time:>11.3f}{inc_time:>10.3f}{load_time:>11.3f}"
+              f"{sum(len(children) for _, children in delta.added_edges):>8}"
+              f"{sum(len(children) for _, children in delta.removed_edges):>8}"
+              f"{'да' if graph == full_graph else 'НЕТ':>13}")
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--files", type=int, default=1000, help="python модулей в проекте")
+    argparser.add_argument("--changed", type=int, action="append", help="изменённых модулей, по умолчанию 1, 10, 100")
+    argparser.add_argument("--seed", type=int, default=0)
+    argparser.add_argument("--backend", choices=("inline", "process"), default="process")
+    args = argparser.parse_args()
+    args.changed = args.changed or [1, 10, 100]
+
+    # журнал сервисов и кеш разбора исказили бы замеры полного анализа
+    logging.disable(logging.INFO)
+    parse_cache.repo = None
+    parse_backend.mode = args.backend
+    parse_backend.start()
+    try:
+        asyncio.run(run(args))
+    finally:
+        parse_backend.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Бенчмарк разбора проекта без MinIO: синтетический FastAPI проект отдаётся через InMemoryStorage.
+Для каждого этапа Parser и для ProjectAnalyzer выводится время, файлы/с, функции/с и пик памяти.
+
+    python app/algorithm/benchmarks/parser_benchmark.py --files 500 --repeat 3
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from typing import Awaitable, Callable, List, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from infrastructure.object_storage.memory_storage import InMemoryStorage  # noqa: E402
+from project_generator import PREFIX, ProjectShape, generate_project, python_files  # noqa: E402
+from services.analyzer import ProjectAnalyzer  # noqa: E402
+from services.manage.object_manager import object_manager  # noqa: E402
+from services.manage.parse_cache_manager import parse_cache  # noqa: E402
+from services.parse_backend import parse_backend  # noqa: E402
+from services.parser import Parser  # noqa: E402
+
+
+async def stage_parse_files(keys: List[str]) -> int:
+    functions = 0
+    for key in keys:
+        functions += len(await Parser.parse_python_file_s3(key))
+    return functions
+
+
+async def stage_extract_endpoints(keys: List[str]) -> int:
+    await Parser.extract_endpoints(PREFIX)
+    return 0
+
+
+async def stage_call_graph(keys: List[str]) -> int:
+    return sum([1 async for _ in Parser.build_call_graph_s3(PREFIX)])
+
+
+async def stage_dependencies(keys: List[str]) -> int:
+    await Parser.get_dependencies_s3(PREFIX)
+    return 0
+
+
+async def stage_analyzer(keys: List[str]) -> int:
+    analysis = await ProjectAnalyzer(PREFIX).run()
+    analysis.endpoints()
+    return sum(1 for _ in analysis.call_graph())
+
+
+# имя, этап, разбирает ли этап python файлы (иначе - только файлы зависимостей)
+STAGES: List[Tuple[str, Callable[[List[str]], Awaitable[int]], bool]] = [
+    ("parse_python_file_s3", stage_parse_files, True),
+    ("extract_endpoints", stage_extract_endpoints, True),
+    ("build_call_graph_s3", stage_call_graph, True),
+    ("get_dependencies_s3", stage_dependencies, False),
+    ("ProjectAnalyzer", stage_analyzer, True),
+]
+
+
+async def measure(stage: Callable[[List[str]], Awaitable[int]], keys: List[str], repeat: int) -> Tuple[float, int]:
+    """Лучшее время из repeat прогонов и пик памяти отдельного прогона под tracemalloc"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await stage(keys)
+        best = min(best, time.perf_counter() - started)
+
+    # tracemalloc замедляет выделение памяти в разы, поэтому в замер времени не входит
+    tracemalloc.start()
+    try:
+        await stage(keys)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+async def run(args: argparse.Namespace) -> None:
+    shape = ProjectShape(files=args.files, classes=args.classes, methods=args.methods,
+                         routers=args.routers, endpoints=args.endpoints, functions=args.functions,
+                         seed=args.seed)
+    files = generate_project(shape)
+    keys = python_files(files)
+    functions = shape.files * shape.functions_per_file
+    size = sum(len(content) for content in files.values())
+
+    object_manager.repo = InMemoryStorage(files, page_size=args.page_size)
+    if not args.cache:
+        parse_cache.repo = None
+    parse_backend.mode = args.backend
+    parse_backend.start()
+
+    dependency_files = [key for key in files if key.endswith(ProjectAnalyzer.DEPENDENCY_FILES)]
+    selected = [item for item in STAGES if not args.stage or item[0] in args.stage]
+    print(f"файлов: {len(files)} (python: {len(keys)}), функций: {functions}, {size / 1024 / 1024:.1f} МБ, "
+          f"разбор: {args.backend}, кеш: {'да' if args.cache else 'нет'}, лучший из {args.repeat}")
+    if args.backend == "process":
+        print("пик памяти учитывает только основной процесс, не пул разбора")
+    print(f"{'этап':<22}{'время, с':>10}{'файлы/с':>12}{'функции/с':>14}{'пик, МБ':>10}")
+    try:
+        for name, stage, parses in selected:
+            elapsed, peak = await measure(stage, keys, args.repeat)
+            files_rate = (len(keys) if parses else len(dependency_files)) / elapsed
+            functions_rate = f"{functions / elapsed:.0f}" if parses else "-"
+            print(f"{name:<22}{elapsed:>10.3f}{files_rate:>12.0f}{functions_rate:>14}{peak / 1024 / 1024:>10.1f}")
+    finally:
+        parse_backend.shutdown()
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--files", type=int, default=200, help="python модулей в проекте")
+    argparser.add_argument("--classes", type=int, default=3, help="классов в модуле")
+    argparser.add_argument("--methods", type=int, default=5, help="методов в классе")
+    argparser.add_argument("--routers", type=int, default=1, help="APIRouter в модуле")
+    argparser.add_argument("--endpoints", type=int, default=4, help="эндпоинтов на роутер")
+    argparser.add_argument("--functions", type=int, default=5, help="прочих функций в модуле")
+    argparser.add_argument("--seed", type=int, default=0)
+    argparser.add_argument("--repeat", type=int, default=3)
+    argparser.add_argument("--page-size", type=int, default=1000, help="ключей на страницу листинга")
+    argparser.add_argument("--backend", choices=parse_backend.MODES, default="inline")
+    argparser.add_argument("--cache", action="store_true", help="не отключать кеш разбора")
+    argparser.add_argument("--stage", action="append", choices=[name for name, _, _ in STAGES],
+                           help="запустить только указанные этапы")
+    args = argparser.parse_args()
+
+    # журнал сервисов на каждый файл исказил бы замеры
+    logging.disable(logging.INFO)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Генератор синтетических FastAPI проектов для бенчмарков алгоритма"""
+import random
+from dataclasses import dataclass
+from typing import Dict, List
+
+PREFIX = "bench/project.zip/00000000-0000-0000-0000-000000000000/None/unpacked/"
+
+
+@dataclass
+class ProjectShape:
+    files: int = 200
+    classes: int = 3            # классов в модуле
+    methods: int = 5            # методов в классе
+    routers: int = 1            # APIRouter в модуле
+    endpoints: int = 4          # эндпоинтов на роутер
+    functions: int = 5          # прочих функций модуля
+    # пакетов с одинаковым набором модулей: при packages > 1 имена функций и классов повторяются
+    # в разных пакетах, как get_user / UserService в соседних приложениях монорепозитория
+    packages: int = 1
+    seed: int = 0
+
+    @property
+    def functions_per_file(self) -> int:
+        return self.classes * self.methods + self.routers * self.endpoints + self.functions
+
+
+REQUIREMENTS = """fastapi==0.115.0
+uvicorn[standard]>=0.30
+# база данных
+sqlalchemy~=2.0
+pydantic>=2,<3
+redis
+"""
+
+PYPROJECT = """[project]
+name = "bench"
+version = "0.1.0"
+dependencies = ["fastapi>=0.115", "sqlalchemy[asyncio]>=2.0", "httpx"]
+
+[tool.poetry.dependencies]
+python = "^3.13"
+alembic = "^1.13"
+"""
+
+
+def _module(shape: ProjectShape, i: int, rnd: random.Random, package: str = "app") -> str:
+    other = rnd.randrange(shape.files)
+    lines = [
+        "import logging",
+        "from typing import List, Optional",
+        "from fastapi import APIRouter, Depends, HTTPException",
+        f"from {package}.m{other} import Service{other}_0, helper{other}_0",
+        "",
+        "log = logging.getLogger(__name__)",
+    ]
+    for r in range(shape.routers):
+        lines.append(f"router{r} = APIRouter(prefix='/m{i}/r{r}', tags=['m{i}'])")
+    lines.append("")
+
+    for c in range(shape.classes):
+        lines.append(f"class Service{i}_{c}:")
+        lines.append("    def __init__(self, repo):")
+        lines.append("        self.repo = repo")
+        for m in range(shape.methods):
+            target = rnd.randrange(shape.methods)
+            lines += [
+                "    @staticmethod",
+                f"    async def method{m}(self, item: Item{c}, limit: int = 10) -> Optional[Item{c}]:",
+                f"        rows = await self.repo.fetch(item.id, limit=limit)",
+                f"        for row in rows:",
+                f"            if row.valid():",
+                f"                log.info('row %s', row.id)",
+                f"                await self.method{target}(row, limit=limit - 1)",
+                f"        return helper{i}_{rnd.randrange(max(shape.functions, 1))}(rows)",
+                "",
+            ]
+
+    for r in range(shape.routers):
+        for e in range(shape.endpoints):
+            method = rnd.choice(("get", "post", "put", "patch", "delete"))
+            c = rnd.randrange(max(shape.classes, 1))
+            lines += [
+                f"@router{r}.{method}('/items{e}/{{item_id}}', response_model=List[Item{e}], status_code=200)",
+                f"async def endpoint{r}_{e}(item_id: int, service: Service{i}_{c} = Depends(get_service)) -> Item{e}:",
+                f"    item = await service.method{rnd.randrange(max(shape.methods, 1))}(await load(item_id))",
+                "    if item is None:",
+                "        raise HTTPException(status_code=404)",
+                f"    return Service{other}_0(item).method0(item)",
+                "",
+            ]
+
+    # декоратор обязателен: Parser учитывает только функции с декоратором
+    for f in range(shape.functions):
+        lines += [
+            "@staticmethod",
+            f"def helper{i}_{f}(rows, *rest):",
+            f"    return helper{other}_0([row.transform() for row in rows if row])",
+            "",
+        ]
+    return "\n".join(lines)
+
+
+def generate_project(shape: ProjectShape, prefix: str = PREFIX) -> Dict[str, bytes]:
+    """Ключ S3 -> содержимое файла; структура как у распакованной загрузки core"""
+    rnd = random.Random(shape.seed)
+    files = {
+        f"{prefix}requirements.txt": REQUIREMENTS.encode("utf-8"),
+        f"{prefix}pyproject.toml": PYPROJECT.encode("utf-8"),
+        f"{prefix}README.md": b"# bench\n",
+        f"{prefix}app/__init__.py": b"",
+    }
+    if shape.packages == 1:
+        for i in range(shape.files):
+            files[f"{prefix}app/m{i}.py"] = _module(shape, i, rnd).encode("utf-8")
+        return files
+    for p in range(shape.packages):
+        files[f"{prefix}app/p{p}/__init__.py"] = b""
+        for i in range(shape.files):
+            files[f"{prefix}app/p{p}/m{i}.py"] = _module(shape, i, rnd, f"app.p{p}").encode("utf-8")
+    return files
+
+
+def python_files(files: Dict[str, bytes]) -> List[str]:
+    return sorted(key for key in files if key.endswith(".py"))
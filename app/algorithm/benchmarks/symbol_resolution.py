@@ -0,0 +1,116 @@
+"""
+Разрешение вызовов при построении графа: прежний общий индекс имён (последнее одноимённое
+определение в проекте побеждает) и SymbolTable по импортам модулей.
+Проект из нескольких пакетов с одинаковыми именами: импорты в генераторе не выходят за пакет,
+поэтому ребро в чужой пакет - ошибка разрешения.
+
+    python app/algorithm/benchmarks/symbol_resolution.py --files 200 --packages 5
+"""
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../src")))
+
+from models.parse_models import FunctionInfo, ModuleInfo  # noqa: E402
+from project_generator import PREFIX, ProjectShape, generate_project, python_files  # noqa: E402
+from services.ast_extractor import SourceExtractor  # noqa: E402
+from services.symbol_table import SymbolTable  # noqa: E402
+
+# функция и имена узлов её вызовов, как в рёбрах графа
+Graph = List[Tuple[FunctionInfo, List[str]]]
+
+
+def map_call_to_function(call: str, func_info: FunctionInfo,
+                         all_funcs_index: Dict[str, FunctionInfo]) -> Optional[FunctionInfo]:
+    """Прежний Parser.map_call_to_function"""
+    if call in all_funcs_index:
+        return all_funcs_index[call]
+    obj, _, method = call.partition(".")
+    obj_type = func_info.arg_type(obj)
+    if obj_type:
+        return all_funcs_index.get(f"{obj_type}.{method}")
+    return None
+
+
+def resolve_calls(func_data: FunctionInfo, all_funcs_index: Dict[str, FunctionInfo]) -> List[str]:
+    """Прежний Parser.resolve_calls"""
+    children: List[str] = []
+    for call in func_data.calls:
+        target_func = map_call_to_function(call, func_data, all_funcs_index)
+        resolved_name = (
+            f"{target_func.file}/{target_func.class_name}.{target_func.name}"
+            if target_func
+            else f"{func_data.file}/{call}"
+        )
+        children.append(resolved_name)
+    return children
+
+
+def legacy_graph(modules: Dict[str, ModuleInfo]) -> Graph:
+    """Граф так, как его строил CallGraphBuilder до SymbolTable: общий индекс имён проекта"""
+    index: Dict[str, FunctionInfo] = {}
+    pending = []
+    for module in modules.values():
+        for func_name, func in module.functions.items():
+            index[func_name] = func
+            if func.class_name:
+                index[f"{func.class_name}.{func.name}"] = func
+            pending.append(func)
+    return [(func, resolve_calls(func, index)) for func in pending]
+
+
+def symbol_graph(modules: Dict[str, ModuleInfo]) -> Graph:
+    symbols = SymbolTable(modules, PREFIX)
+    return [(func, symbols.resolve_calls(func))
+            for module in modules.values() for func in module.functions.values()]
+
+
+def measure(build: Callable[[Dict[str, ModuleInfo]], Graph], modules: Dict[str, ModuleInfo],
+            repeat: int) -> Tuple[float, Graph]:
+    best, graph = float("inf"), []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        graph = build(modules)
+        best = min(best, time.perf_counter() - started)
+    return best, graph
+
+
+def summary(graph: Graph) -> Tuple[int, int]:
+    """Разрешённые вызовы и из них ведущие в чужой пакет"""
+    resolved = foreign = 0
+    for func, children in graph:
+        package = func.file.rsplit("/", 1)[0]
+        for call, child in zip(func.calls, children):
+            if child == f"{func.file}/{call}":
+                continue
+            resolved += 1
+            # узел: <пакет>/<модуль>.py/<класс>.<функция>
+            foreign += child.rsplit("/", 2)[0] != package
+    return resolved, foreign
+
+
+def main():
+    argparser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    argparser.add_argument("--files", type=int, default=200, help="модулей в пакете")
+    argparser.add_argument("--packages", type=int, default=5)
+    argparser.add_argument("--seed", type=int, default=0)
+    argparser.add_argument("--repeat", type=int, default=5)
+    args = argparser.parse_args()
+
+    files = generate_project(ProjectShape(files=args.files, packages=args.packages, seed=args.seed))
+    modules = {key: SourceExtractor(key).extract(files[key]) for key in python_files(files)}
+    calls = sum(len(func.calls) for module in modules.values() for func in module.functions.values())
+
+    print(f"модулей: {len(modules)}, вызовов: {calls}, лучший из {args.repeat}")
+    print(f"{'':<14}{'время, с':>10}{'разрешено':>10}{'чужой пакет':>12}")
+    for name, build in (("общий индекс", legacy_graph), ("SymbolTable", symbol_graph)):
+        elapsed, graph = measure(build, modules, args.repeat)
+        resolved, foreign = summary(graph)
+        print(f"{name:<14}{elapsed:>10.3f}{resolved:>10}{foreign:>12}")
+
+
+if __name__ == "__main__":
+    main()
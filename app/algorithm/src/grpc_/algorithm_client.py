@@ -1,13 +1,88 @@
+import asyncio
+from typing import Optional
+
 import grpc
 from grpc_control.generated.shared import common_pb2
 from grpc_control.generated.api import algorithm_pb2_grpc
 
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("AlgorithmClient")
+
+
+COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
 
 class AlgorithmClient:
-    """Клиент для отправки сообщений по gRPC"""
+    """
+    Клиент для отправки сообщений по gRPC.
+    Один канал на процесс: стримы задач мультиплексируются в одном HTTP/2 соединении,
+    keepalive держит его живым между задачами, при обрыве gRPC переподключается с backoff.
+    """
 
-    def __init__(self, core_host: str = "grpc_proxy", core_port: int = 50051):
+    def __init__(self, core_host: str = "grpc_proxy", core_port: int = 50051, compression: str = "none",
+                 max_streams: int = 100, connect_timeout: float = 10,
+                 keepalive_time: float = 30, keepalive_timeout: float = 10, reconnect_backoff_max: float = 10):
+        if compression not in COMPRESSION:
+            raise ValueError(f"Неизвестное сжатие {compression}, допустимы: {tuple(COMPRESSION)}")
+        if max_streams < 1:
+            raise ValueError(f"Число стримов должно быть положительным, получено {max_streams}")
         self.core_address = f"{core_host}:{core_port}"
+        # Сжимается каждое сообщение стрима: grpcio не даёт отключить сжатие отдельного сообщения
+        # на стороне клиента, а сообщение, которое не уменьшилось при сжатии, gRPC сам шлёт без него
+        self.compression = COMPRESSION[compression]
+        self.connect_timeout = connect_timeout
+        self.options = [
+            ("grpc.keepalive_time_ms", int(keepalive_time * 1000)),
+            ("grpc.keepalive_timeout_ms", int(keepalive_timeout * 1000)),
+            # соединение держится и между задачами, пока стримов нет
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.max_pings_without_data", 0),
+            ("grpc.initial_reconnect_backoff_ms", 100),
+            ("grpc.min_reconnect_backoff_ms", 100),
+            ("grpc.max_reconnect_backoff_ms", int(reconnect_backoff_max * 1000)),
+        ]
+        # лишние стримы ждут здесь, а не в очереди HTTP/2 соединения
+        self._streams = asyncio.Semaphore(max_streams)
+        self._channel: Optional[grpc.aio.Channel] = None
+        self._stub: Optional[algorithm_pb2_grpc.AlgorithmConnectionServiceStub] = None
+
+    async def start(self) -> None:
+        """Заранее устанавливает соединение, чтобы первая задача не ждала его"""
+        try:
+            await self._ready()
+            log.info(f"Соединение с {self.core_address} установлено")
+        except ConnectionError as e:
+            # не критично: канал продолжит подключаться сам
+            log.warning(str(e))
+
+    async def close(self) -> None:
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+            self._stub = None
+
+    def _get_stub(self) -> algorithm_pb2_grpc.AlgorithmConnectionServiceStub:
+        # канал создаётся в работающем event loop, к которому он привязан
+        if self._channel is None:
+            self._channel = grpc.aio.insecure_channel(self.core_address, options=self.options,
+                                                      compression=self.compression)
+            self._stub = algorithm_pb2_grpc.AlgorithmConnectionServiceStub(self._channel)
+        return self._stub
+
+    async def _ready(self) -> algorithm_pb2_grpc.AlgorithmConnectionServiceStub:
+        """Ждёт готовности канала (в том числе переподключения) не дольше connect_timeout"""
+        stub = self._get_stub()
+        try:
+            await asyncio.wait_for(self._channel.channel_ready(), timeout=self.connect_timeout)
+        except asyncio.TimeoutError:
+            raise ConnectionError(f"Нет соединения с {self.core_address} за {self.connect_timeout} с")
+        return stub
 
     async def send(self, task_id: int, data):
         """Отправляет данные в Proxy"""
@@ -21,22 +96,37 @@ class AlgorithmClient:
                 # Единичное значение
                 yield self._prepare_msg(task_id, data)
 
-        await self._send_stream(generator())
+        await self._send_stream(task_id, generator())
 
     async def stream(self, task_id: int, async_iter):
         """Передать генератор, который yield-ит элементы для GraphPartResponse"""
+        error = None
 
         async def generator():
-            async for item in async_iter:
-                yield self._prepare_msg(task_id, item)
+            nonlocal error
+            try:
+                async for item in async_iter:
+                    yield self._prepare_msg(task_id, item)
+            except Exception as e:
+                error = e
+                raise
 
-        await self._send_stream(generator())
+        try:
+            await self._send_stream(task_id, generator())
+        except asyncio.CancelledError:
+            # grpc.aio отменяет вызов при ошибке в генераторе запросов, сама ошибка теряется
+            if error is not None:
+                raise error
+            raise
 
-    async def _send_stream(self, msg_stream):
-        """Открывает gRPC канал и отправляет поток сообщений."""
-        async with grpc.aio.insecure_channel(self.core_address) as channel:
-            stub = algorithm_pb2_grpc.AlgorithmConnectionServiceStub(channel)
-            await stub.ConnectToCore(msg_stream)
+    async def _send_stream(self, task_id: int, msg_stream):
+        """
+        Отправляет поток сообщений отдельным стримом в общем канале.
+        task_id в метаданных: прокси узнаёт задачу до первого сообщения и может отменить её сразу.
+        """
+        async with self._streams:
+            stub = await self._ready()
+            await stub.ConnectToCore(msg_stream, metadata=(("x-task-id", str(task_id)),))
 
     def _prepare_msg(self, task_id: int, item) -> common_pb2.GraphPartResponse:
         """Конвертирует item в корректный GraphPartResponse"""
@@ -64,3 +154,15 @@ class AlgorithmClient:
         raise TypeError(
             f"Unsupported item type for GraphPartResponse: {type(item)} — {item}"
         )
+
+
+algorithm_client = AlgorithmClient(
+    core_host=CONFIG.grpc.host,
+    core_port=CONFIG.grpc.port,
+    compression=CONFIG.grpc.compression,
+    max_streams=CONFIG.grpc.max_streams,
+    connect_timeout=CONFIG.grpc.connect_timeout,
+    keepalive_time=CONFIG.grpc.keepalive_time,
+    keepalive_timeout=CONFIG.grpc.keepalive_timeout,
+    reconnect_backoff_max=CONFIG.grpc.reconnect_backoff_max,
+)
@@ -1,7 +1,8 @@
 import json
-from typing import Optional
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 from aio_pika import RobustQueue
+from aio_pika.abc import AbstractIncomingMessage, AbstractQueue
 
 from infrastructure.broker.manager import ConnectionBrokerManager
 from utils.logger import create_logger
@@ -14,19 +15,30 @@ class Consumer:
         self.connection: ConnectionBrokerManager = connection
         self.queue: Optional[RobustQueue] = None
 
-    async def start(self, queue_name):
+    async def start(self, queue_name, prefetch_count: int = 1):
         if not self.connection.channel:
             await self.connection.connect()
 
-        queue = await self.connection.channel.declare_queue(queue_name, durable=True)
-        log.info(f"Подписан на очередь: {queue_name}")
+        if self.connection.exclusive or queue_name == self.connection.queue_name:
+            # очередь уже объявлена при подключении: временная очередь реплики или очередь с аргументами,
+            # повторное объявление без них брокер отклонит
+            queue = self.connection.queue
+        else:
+            queue = await self.connection.channel.declare_queue(queue_name, durable=True)
+        log.info(f"Подписан на очередь: {queue.name}")
 
-        await self.connection.channel.set_qos(prefetch_count=1)  # одна задачу в один момент времени
+        # брокер не отдаст больше prefetch_count неподтверждённых задач, остальные достанутся другим репликам
+        await self.connection.channel.set_qos(prefetch_count=prefetch_count)
 
         self.queue = queue
 
         log.info("Consumer готов")
 
+    def attach(self, queue: AbstractQueue) -> None:
+        """Чтение уже объявленной очереди, например прежней очереди задач на своём канале"""
+        self.queue = queue
+        log.info(f"Подписан на очередь: {queue.name}")
+
     async def messages(self):
         """
         Асинхронный генератор, отдающий сообщения наружу.
@@ -43,3 +55,22 @@ class Consumer:
                         yield body
                     except Exception as e:
                         log.error(f"Ошибка при чтении сообщения: {e}")
+
+    async def deliveries(self) -> AsyncIterator[Tuple[Dict[str, Any], AbstractIncomingMessage]]:
+        """
+        Асинхронный генератор (тело, сообщение) без подтверждения.
+        ack/nack выполняет получатель после обработки задачи; нечитаемое сообщение отклоняется сразу.
+        """
+        if not self.connection.channel:
+            raise RuntimeError("Брокер не подключен. Сначала вызови connect()")
+
+        async with self.queue.iterator() as queue_iter:
+            async for message in queue_iter:
+                try:
+                    body = json.loads(message.body)
+                except Exception as e:
+                    log.error(f"Ошибка при чтении сообщения: {e}")
+                    await message.reject(requeue=False)
+                    continue
+                log.info(f"Получено сообщение: {body}")
+                yield body, message
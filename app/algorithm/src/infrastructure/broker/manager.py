@@ -3,6 +3,7 @@ from typing import Optional
 import aio_pika
 from aio_pika import Exchange, RobustConnection, Channel
 from aio_pika.abc import AbstractQueue
+from aio_pika.exceptions import ChannelNotFoundEntity
 
 from utils.config import CONFIG
 from utils.logger import create_logger
@@ -18,13 +19,20 @@ class ConnectionBrokerManager:
                  user: str = CONFIG.broker.user,
                  password: str = CONFIG.broker.password,
                  exchange: str = CONFIG.broker.exchange,
-                 exchange_type: str = 'direct') -> None:
+                 exchange_type: str = 'direct',
+                 exclusive: bool = False,
+                 max_priority: int = 0) -> None:
         self.host: str = host
         self.user: str = user
         self.password: str = password
         self.exchange_name: str = exchange
         self.exchange_type: str = exchange_type
         self.queue_name: str = queue_name
+        # exclusive - своя временная очередь у каждой реплики (имя выдаёт брокер), удаляется при отключении:
+        # так сообщение с ключом key получают все реплики, а не одна из них
+        self.exclusive: bool = exclusive
+        # max_priority > 0 - очередь с приоритетами сообщений 0..max_priority, объявляется так же, как в core
+        self.max_priority: int = max_priority
 
         self.exchange: Optional[Exchange] = None
         self.connection: Optional[RobustConnection] = None
@@ -53,10 +61,44 @@ class ConnectionBrokerManager:
             log.info("Подключение к брокеру закрыто")
 
     async def _create_queue(self, queue_name: str) -> AbstractQueue:
-        queue: AbstractQueue = await self.channel.declare_queue(queue_name, durable=True)
+        if self.exclusive:
+            queue: AbstractQueue = await self.channel.declare_queue(queue_name, exclusive=True, auto_delete=True)
+        else:
+            arguments = {"x-max-priority": self.max_priority} if self.max_priority else None
+            queue: AbstractQueue = await self.channel.declare_queue(queue_name, durable=True, arguments=arguments)
         log.info(f"Создана очередь: {queue_name}")
         return queue
 
+    async def declare_delay_queue(self, queue_name: str, delay: float) -> AbstractQueue:
+        """
+        Очередь ожидания без потребителей: сообщение лежит в ней delay секунд и по истечении TTL
+        возвращается в exchange с ключом key, то есть в основную очередь, с прежним приоритетом
+        """
+        queue: AbstractQueue = await self.channel.declare_queue(queue_name, durable=True, arguments={
+            "x-message-ttl": int(delay * 1000),
+            "x-dead-letter-exchange": self.exchange_name,
+            "x-dead-letter-routing-key": self.key,
+        })
+        log.info(f"Создана очередь ожидания: {queue_name}, {delay} с")
+        return queue
+
+    async def detach_queue(self, queue_name: str, prefetch_count: int = 1) -> Optional[AbstractQueue]:
+        """
+        Прежняя очередь с ключом key на отдельном канале: отвязывается от exchange, чтобы новые сообщения
+        шли только в основную очередь, а накопленные ещё можно было дочитать. None - такой очереди нет.
+        """
+        channel = await self.connection.channel()
+        try:
+            queue: AbstractQueue = await channel.declare_queue(queue_name, passive=True)
+        except ChannelNotFoundEntity:
+            # канал закрыт брокером вместе с ошибкой
+            return None
+        await queue.unbind(self.exchange, routing_key=self.key)
+        await channel.set_qos(prefetch_count=prefetch_count)
+        log.info(f"Очередь {queue_name} отвязана от {self.exchange}, сообщений в ней: "
+                 f"{queue.declaration_result.message_count}")
+        return queue
+
     async def _bind_exchange_as_queue(self, queue: AbstractQueue, routing_key: str) -> None:
         await queue.bind(self.exchange, routing_key=routing_key)
         log.info(f"Очередь {queue} привязана к {self.exchange}")
@@ -0,0 +1,27 @@
+import aio_pika
+from aio_pika.abc import AbstractIncomingMessage
+
+from infrastructure.broker.manager import ConnectionBrokerManager
+from utils.logger import create_logger
+
+log = create_logger("BrokerProducer")
+
+
+class Producer:
+    def __init__(self, connection: ConnectionBrokerManager):
+        self.connection: ConnectionBrokerManager = connection
+
+    async def defer(self, message: AbstractIncomingMessage, queue_name: str) -> None:
+        """
+        Копия сообщения в очередь ожидания queue_name через exchange по умолчанию: тело, приоритет
+        и заголовки сохраняются. Исходное сообщение подтверждает вызывающий, когда копия принята брокером.
+        """
+        msg = aio_pika.Message(
+            message.body,
+            headers=message.headers,
+            content_type=message.content_type,
+            priority=message.priority,
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
+        await self.connection.channel.default_exchange.publish(msg, routing_key=queue_name)
+        log.info(f"Сообщение отложено в {queue_name}")
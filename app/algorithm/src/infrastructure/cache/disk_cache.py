@@ -0,0 +1,104 @@
+import asyncio
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+from infrastructure.cache.interface import AbstractParseCache
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("DiskParseCache")
+
+
+class DiskParseCache(AbstractParseCache):
+    """
+    Кеш на локальном диске: один файл на ключ, ограничение по суммарному размеру.
+    mtime файла обновляется при чтении, при переполнении удаляются самые давние записи.
+    """
+
+    def __init__(self, directory: str = CONFIG.cache.dir, max_bytes: int = CONFIG.cache.max_bytes,
+                 low_watermark: float = 0.8):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        self.total_bytes = 0
+        self._evicting = False
+
+    async def start(self) -> None:
+        await asyncio.to_thread(self._scan)
+        log.info(f"Кеш разбора на диске {self.directory}: {self.total_bytes} байт")
+
+    async def close(self) -> None:
+        return
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / key
+
+    def _scan(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.total_bytes = sum(path.stat().st_size for path in self.directory.glob("*/*"))
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await asyncio.to_thread(self._read, self._path(key))
+
+    @staticmethod
+    def _read(path: Path) -> Optional[bytes]:
+        try:
+            data = path.read_bytes()
+            os.utime(path)
+            return data
+        except FileNotFoundError:
+            return None
+
+    async def set(self, key: str, value: bytes, replace: bool = False) -> None:
+        written = await asyncio.to_thread(self._write, self._path(key), value, replace)
+        self.total_bytes += written
+        if self.total_bytes > self.max_bytes and not self._evicting:
+            self._evicting = True
+            try:
+                await asyncio.to_thread(self._evict)
+            finally:
+                self._evicting = False
+
+    @staticmethod
+    def _write(path: Path, value: bytes, replace: bool) -> int:
+        """Пишет значение и возвращает, на сколько байт вырос кеш"""
+        try:
+            previous = path.stat().st_size
+        except FileNotFoundError:
+            previous = 0
+        else:
+            if not replace:
+                return 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # запись через временный файл, чтобы читатель не увидел половину значения
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(value)
+        os.replace(tmp_name, path)
+        return len(value) - previous
+
+    def _evict(self) -> None:
+        """Удаляет самые давно использованные записи до low_watermark от лимита"""
+        entries = []
+        for path in self.directory.glob("*/*"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * self.low_watermark
+        evicted = 0
+        for _, size, path in entries:
+            if total <= target:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+
+        self.total_bytes = total
+        log.info(f"Кеш разбора: вытеснено {evicted} записей, занято {total} байт")
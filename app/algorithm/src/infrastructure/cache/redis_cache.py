@@ -0,0 +1,92 @@
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+
+from infrastructure.cache.interface import AbstractParseCache
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("RedisParseCache")
+
+
+class RedisParseCache(AbstractParseCache):
+    """
+    Кеш в Redis, общий для всех реплик алгоритма.
+    Время последнего обращения хранится в sorted set, суммарный размер - в счётчике;
+    при переполнении удаляются самые давние записи. Политика вытеснения самого Redis не трогается,
+    так как он общий с core.
+    """
+
+    def __init__(self, host: str = CONFIG.redis.host, port: int = CONFIG.redis.port, db: int = CONFIG.redis.db,
+                 max_bytes: int = CONFIG.cache.max_bytes, prefix: str = "parse_cache",
+                 low_watermark: float = 0.8, evict_batch: int = 256):
+        self.client = redis.Redis(host=host, port=port, db=db)
+        self.max_bytes = max_bytes
+        self.low_watermark = low_watermark
+        self.evict_batch = evict_batch
+        self.prefix = prefix
+        self.lru_key = f"{prefix}:lru"
+        self.bytes_key = f"{prefix}:bytes"
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    async def start(self) -> None:
+        await self.client.ping()
+        log.info("Кеш разбора в Redis подключен")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.get(self._key(key))
+            pipe.zadd(self.lru_key, {key: time.time()}, xx=True)
+            value, _ = await pipe.execute()
+        return value
+
+    async def set(self, key: str, value: bytes, replace: bool = False) -> None:
+        if replace:
+            previous = await self.client.set(self._key(key), value, get=True)
+            grown = len(value) - len(previous or b"")
+        elif await self.client.set(self._key(key), value, nx=True):
+            grown = len(value)
+        else:
+            return
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zadd(self.lru_key, {key: time.time()})
+            pipe.incrby(self.bytes_key, grown)
+            _, total = await pipe.execute()
+
+        if total > self.max_bytes:
+            await self._evict(total)
+
+    async def _evict(self, total: int) -> None:
+        """Удаляет самые давно использованные записи до low_watermark от лимита"""
+        target = self.max_bytes * self.low_watermark
+        evicted = 0
+        while total > target:
+            keys = await self.client.zrange(self.lru_key, 0, self.evict_batch - 1)
+            if not keys:
+                break
+            async with self.client.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.strlen(self._key(key.decode()))
+                sizes = await pipe.execute()
+
+            # из пачки удаляем только столько самых старых записей, сколько нужно
+            victims, freed = [], 0
+            for key, size in zip(keys, sizes):
+                if total - freed <= target:
+                    break
+                victims.append(key)
+                freed += size
+
+            async with self.client.pipeline(transaction=False) as pipe:
+                pipe.delete(*(self._key(key.decode()) for key in victims))
+                pipe.zrem(self.lru_key, *victims)
+                pipe.decrby(self.bytes_key, freed)
+                *_, total = await pipe.execute()
+            evicted += len(victims)
+        log.info(f"Кеш разбора: вытеснено {evicted} записей, занято {total} байт")
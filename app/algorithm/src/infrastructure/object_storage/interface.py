@@ -1,9 +1,17 @@
 from abc import ABC, abstractmethod
-from typing import AsyncIterator
+from typing import AsyncIterator, Optional, Tuple
 
 
 class AbstractStorage(ABC):
 
+    @abstractmethod
+    async def start(self) -> None:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
     @abstractmethod
     async def stream_read(self, file_key: str) -> None:
         pass
@@ -15,3 +23,11 @@ class AbstractStorage(ABC):
     @abstractmethod
     async def get_filenames(self, file_key: str) -> None:
         pass
+
+    @abstractmethod
+    def iter_filenames(self, file_key: str) -> AsyncIterator[str]:
+        pass
+
+    @abstractmethod
+    def iter_objects(self, file_key: str) -> AsyncIterator[Tuple[str, Optional[str], int]]:
+        pass
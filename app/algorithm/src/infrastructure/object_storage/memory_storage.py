@@ -0,0 +1,68 @@
+import asyncio
+import hashlib
+from typing import AsyncIterator, Dict, Optional, Tuple
+
+from infrastructure.object_storage.interface import AbstractStorage
+from utils.logger import create_logger
+
+log = create_logger("InMemoryStorageInfra")
+
+
+class InMemoryStorage(AbstractStorage):
+    """
+    Хранилище в памяти процесса с тем же поведением, что и ObjectStorageManager:
+    ключи листинга отсортированы и отдаются страницами, отсутствующий файл - FileNotFoundError.
+    Используется в бенчмарках и локальных прогонах без MinIO.
+    """
+
+    def __init__(self, files: Optional[Dict[str, bytes]] = None, page_size: int = 1000):
+        self.files: Dict[str, bytes] = dict(files or {})
+        self.page_size = page_size
+
+    async def start(self) -> None:
+        log.info(f"Хранилище в памяти, файлов: {len(self.files)}")
+
+    async def close(self) -> None:
+        return
+
+    def put(self, file_key: str, content: bytes) -> None:
+        self.files[file_key] = content
+
+    async def iter_filenames(self, dir_path: str) -> AsyncIterator[str]:
+        """Постраничный листинг 'директории', между страницами управление отдаётся event loop"""
+        keys = sorted(key for key in self.files if key.startswith(dir_path))
+        for start in range(0, len(keys), self.page_size):
+            await asyncio.sleep(0)
+            for key in keys[start:start + self.page_size]:
+                yield key
+
+    async def iter_objects(self, dir_path: str) -> AsyncIterator[Tuple[str, str, int]]:
+        """Листинг с ETag как у S3 для загрузки одним запросом (md5 содержимого в кавычках) и размером"""
+        async for key in self.iter_filenames(dir_path):
+            yield key, self.etag(self.files[key]), len(self.files[key])
+
+    @staticmethod
+    def etag(content: bytes) -> str:
+        return f'"{hashlib.md5(content).hexdigest()}"'
+
+    async def get_filenames(self, dir_path: str) -> list[str]:
+        """Получение имен всех файлов в 'директории'"""
+        return [key async for key in self.iter_filenames(dir_path)]
+
+    async def stream_read(self, file_key: str, chunk_size: Optional[int] = 1024 * 1024,
+                          decode: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Асинхронный итератор по файлу"""
+        data = self._get(file_key)
+        for start in range(0, len(data), chunk_size or len(data) or 1):
+            chunk = data[start:start + chunk_size] if chunk_size else data
+            yield chunk.decode(decode) if decode else chunk
+
+    async def read(self, file_key: str) -> bytes:
+        """Получение файла"""
+        return self._get(file_key)
+
+    def _get(self, file_key: str) -> bytes:
+        try:
+            return self.files[file_key]
+        except KeyError:
+            raise FileNotFoundError(f"Файл {file_key} не найден в хранилище в памяти")
@@ -1,6 +1,9 @@
-from typing import AsyncIterator, Optional
+import asyncio
+from contextlib import AsyncExitStack
+from typing import AsyncIterator, Optional, Tuple
 
 import aioboto3
+from aiobotocore.config import AioConfig
 
 from infrastructure.object_storage.interface import AbstractStorage
 from utils.config import CONFIG
@@ -14,6 +17,8 @@ class ObjectStorageManager(AbstractStorage):
                  access_key_id: str = CONFIG.s3.ACCESS_ID,
                  secret_access_key: str = CONFIG.s3.SECRET_KEY,
                  bucket: str = CONFIG.s3.BUCKET,
+                 max_pool_connections: int = CONFIG.s3.max_pool_connections,
+                 keepalive_timeout: float = CONFIG.s3.keepalive_timeout,
                  ):
 
         self.endpoint_url = endpoint_url
@@ -23,48 +28,92 @@ class ObjectStorageManager(AbstractStorage):
         self.s3_config = {"service_name": "s3",
                           "endpoint_url": self.endpoint_url,
                           "aws_access_key_id": self.access_key_id,
-                          "aws_secret_access_key": self.secret_access_key}
+                          "aws_secret_access_key": self.secret_access_key,
+                          "config": AioConfig(max_pool_connections=max_pool_connections,
+                                              connector_args={"keepalive_timeout": keepalive_timeout})}
+
+        # Один клиент (и один пул соединений) на весь процесс
+        self.session = aioboto3.Session()
+        self._exit_stack: Optional[AsyncExitStack] = None
+        self._client = None
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        """Создание общего клиента S3"""
+        async with self._lock:
+            if self._client is not None:
+                return
+            exit_stack = AsyncExitStack()
+            self._client = await exit_stack.enter_async_context(self.session.client(**self.s3_config))
+            self._exit_stack = exit_stack
+            log.info(f"Клиент S3 создан, {self.endpoint_url}")
+
+    async def close(self) -> None:
+        """Закрытие общего клиента S3 и его пула соединений"""
+        async with self._lock:
+            if self._exit_stack is None:
+                return
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._client = None
+            log.info("Клиент S3 закрыт")
+
+    async def _get_client(self):
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    async def iter_filenames(self, dir_path: str) -> AsyncIterator[str]:
+        """Постраничный листинг 'директории', ключи отдаются по мере прихода страниц"""
+        async for key, _, _ in self.iter_objects(dir_path):
+            yield key
+
+    async def iter_objects(self, dir_path: str) -> AsyncIterator[Tuple[str, str, int]]:
+        """
+        Листинг с ETag и размером объектов: по ETag видно, изменился ли файл, без чтения содержимого,
+        по размеру - сколько байт не читается из-за правил исключения
+        """
+        s3 = await self._get_client()
+        try:
+            paginator = s3.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(Bucket=self.bucket, Prefix=dir_path):
+                for obj in page.get("Contents", []):
+                    yield obj["Key"], obj["ETag"], obj["Size"]
+        except Exception as e:
+            log.error(f"Ошибка получения файлов в {dir_path}: {e}")
+            raise
 
     async def get_filenames(self, dir_path: str) -> list[str]:
         """Получение имен всех файлов в 'директории'"""
-        async with aioboto3.Session().client(**self.s3_config) as s3:
-            try:
-                response = await s3.list_objects_v2(
-                    Bucket=self.bucket,
-                    Prefix=dir_path
-                )
-                return [obj["Key"] for obj in response.get("Contents", [])]
-            except Exception as e:
-                log.error(f"Ошибка получения файлов в {dir_path}: {e}")
-                raise
+        return [key async for key in self.iter_filenames(dir_path)]
 
     async def stream_read(self, file_key: str, chunk_size: Optional[int] = 1024 * 1024,
                           decode: Optional[str] = None) -> AsyncIterator[bytes]:
         """Асинхронный итератор по файлу"""
-        async with aioboto3.Session().client(**self.s3_config) as s3:
-            try:
-                response = await s3.get_object(Bucket=self.bucket, Key=file_key)
-                stream = response["Body"]
+        s3 = await self._get_client()
+        try:
+            response = await s3.get_object(Bucket=self.bucket, Key=file_key)
+            stream = response["Body"]
 
-                async for chunk in stream.iter_chunks(chunk_size=chunk_size):
-                    if not chunk:
-                        break
+            async for chunk in stream.iter_chunks(chunk_size=chunk_size):
+                if not chunk:
+                    break
 
-                    if decode:
-                        yield chunk.decode(decode)
-                    else:
-                        yield chunk
+                if decode:
+                    yield chunk.decode(decode)
+                else:
+                    yield chunk
 
-            except s3.exceptions.NoSuchKey:
-                raise FileNotFoundError(f"Файл {file_key} не найден в бакете {self.bucket}")
+        except s3.exceptions.NoSuchKey:
+            raise FileNotFoundError(f"Файл {file_key} не найден в бакете {self.bucket}")
 
     async def read(self, file_key: str):
         """Получение файла"""
-        async with aioboto3.Session().client(**self.s3_config) as s3:
-            try:
-                response = await s3.get_object(Bucket=self.bucket, Key=file_key)
-                async with response["Body"] as stream:
-                    return await stream.read()
-
-            except s3.exceptions.NoSuchKey:
-                raise FileNotFoundError(f"Файл {file_key} не найден в бакете {self.bucket}")
+        s3 = await self._get_client()
+        try:
+            response = await s3.get_object(Bucket=self.bucket, Key=file_key)
+            async with response["Body"] as stream:
+                return await stream.read()
+
+        except s3.exceptions.NoSuchKey:
+            raise FileNotFoundError(f"Файл {file_key} не найден в бакете {self.bucket}")
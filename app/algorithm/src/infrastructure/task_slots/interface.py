@@ -0,0 +1,22 @@
+from abc import ABC, abstractmethod
+
+
+class AbstractTaskSlots(ABC):
+
+    @abstractmethod
+    async def start(self) -> None:
+        pass
+
+    @abstractmethod
+    async def close(self) -> None:
+        pass
+
+    @abstractmethod
+    async def acquire(self, user_id: int, task_id: int, limit: int, lease: float) -> bool:
+        """Занимает слот пользователя, если занято меньше limit; слот освобождается сам через lease секунд"""
+        pass
+
+    @abstractmethod
+    async def release(self, user_id: int, task_id: int, finished: bool) -> None:
+        """Освобождает слот; finished - задача закончена окончательно и больше не ждёт в очереди"""
+        pass
@@ -0,0 +1,41 @@
+import time
+from typing import Dict
+
+from infrastructure.task_slots.interface import AbstractTaskSlots
+from utils.logger import create_logger
+
+log = create_logger("InMemoryTaskSlots")
+
+
+class InMemoryTaskSlots(AbstractTaskSlots):
+    """
+    Слоты пользователей в памяти процесса: ограничение действует в пределах одной реплики,
+    а core не узнаёт о завершении задач. Для одной реплики и локальных прогонов без Redis.
+    """
+
+    def __init__(self):
+        # пользователь -> задача -> момент, после которого слот считается свободным
+        self.slots: Dict[int, Dict[int, float]] = {}
+
+    async def start(self) -> None:
+        log.info("Слоты задач пользователей в памяти")
+
+    async def close(self) -> None:
+        return
+
+    async def acquire(self, user_id: int, task_id: int, limit: int, lease: float) -> bool:
+        now = time.monotonic()
+        slots = self.slots.setdefault(user_id, {})
+        for expired in [task for task, deadline in slots.items() if deadline <= now]:
+            del slots[expired]
+        if task_id not in slots and len(slots) >= limit:
+            return False
+        slots[task_id] = now + lease
+        return True
+
+    async def release(self, user_id: int, task_id: int, finished: bool) -> None:
+        slots = self.slots.get(user_id)
+        if slots is not None:
+            slots.pop(task_id, None)
+            if not slots:
+                del self.slots[user_id]
@@ -0,0 +1,60 @@
+import time
+
+import redis.asyncio as redis
+
+from infrastructure.task_slots.interface import AbstractTaskSlots
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("RedisTaskSlots")
+
+# Занятые слоты пользователя - sorted set задача -> срок аренды; просроченные (упавшая реплика) удаляются
+_ACQUIRE = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if not redis.call('ZSCORE', KEYS[1], ARGV[3]) and redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[4], ARGV[3])
+-- ключ живёт до самой поздней аренды: короткая аренда новой задачи не удаляет слоты остальных
+local latest = redis.call('ZRANGE', KEYS[1], -1, -1, 'WITHSCORES')
+redis.call('EXPIREAT', KEYS[1], math.ceil(tonumber(latest[2])))
+return 1
+"""
+
+
+class RedisTaskSlots(AbstractTaskSlots):
+    """
+    Слоты пользователей в Redis, общие для всех реплик алгоритма.
+    Окончательно завершённая задача удаляется и из tasks:active:<пользователь> - набора задач в очереди
+    и в работе, по которому core считает приоритет новых задач пользователя.
+    """
+
+    def __init__(self, host: str = CONFIG.redis.host, port: int = CONFIG.redis.port, db: int = CONFIG.redis.db,
+                 prefix: str = "tasks"):
+        self.client = redis.Redis(host=host, port=port, db=db)
+        self.prefix = prefix
+        self._acquire = self.client.register_script(_ACQUIRE)
+
+    def _running_key(self, user_id: int) -> str:
+        return f"{self.prefix}:running:{user_id}"
+
+    def _active_key(self, user_id: int) -> str:
+        return f"{self.prefix}:active:{user_id}"
+
+    async def start(self) -> None:
+        await self.client.ping()
+        log.info("Слоты задач пользователей в Redis подключены")
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+    async def acquire(self, user_id: int, task_id: int, limit: int, lease: float) -> bool:
+        now = time.time()
+        return bool(await self._acquire(keys=[self._running_key(user_id)], args=[now, limit, task_id, now + lease]))
+
+    async def release(self, user_id: int, task_id: int, finished: bool) -> None:
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zrem(self._running_key(user_id), task_id)
+            if finished:
+                pipe.zrem(self._active_key(user_id), task_id)
+            await pipe.execute()
@@ -0,0 +1,93 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+
+@dataclass(slots=True)
+class DecoratorInfo:
+    name: Optional[str]
+    # аргументы в текстовом виде, заполняются только у декораторов эндпоинтов
+    args: Tuple[str, ...]
+    path: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"name": self.name, "args": list(self.args), "path": self.path}
+
+
+@dataclass(slots=True)
+class EndpointInfo:
+    object: str
+    method: str
+    path: str
+    full_path: str
+    response_model: Optional[str] = None
+    # аргументы декоратора эндпоинта, тот же кортеж, что в его DecoratorInfo
+    args: Tuple[str, ...] = ()
+
+
+@dataclass(slots=True)
+class FunctionInfo:
+    """
+    Функция модуля после разбора.
+    Имена интернированы, коллекции - кортежи; пустые arg_types и endpoint не хранятся (None).
+    """
+    name: str
+    file: Optional[str]
+    class_name: Optional[str]
+    args: Tuple[str, ...]
+    arg_types: Optional[Dict[str, str]]
+    decorators: Tuple[DecoratorInfo, ...]
+    calls: Tuple[str, ...]
+    is_async: bool
+    returns: Optional[str]
+    endpoint: Optional[EndpointInfo] = None
+
+    @property
+    def is_endpoint(self) -> bool:
+        return self.endpoint is not None
+
+    def arg_type(self, arg: str) -> Optional[str]:
+        return self.arg_types.get(arg) if self.arg_types else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Прежнее представление функции словарём, как до FunctionInfo"""
+        endpoint_info = None
+        if self.endpoint is not None:
+            endpoint_info = {
+                "decorator": {
+                    "object": self.endpoint.object,
+                    "method": self.endpoint.method,
+                    "args": list(self.endpoint.args),
+                },
+                "path": self.endpoint.path,
+                "full_path": self.endpoint.full_path,
+                "response_model": self.endpoint.response_model,
+            }
+        return {
+            "name": self.name,
+            "file": self.file,
+            "class": self.class_name,
+            "args": list(self.args),
+            "arg_types": dict(self.arg_types or {}),
+            "decorators": [dec.to_dict() for dec in self.decorators],
+            "calls": list(self.calls),
+            "is_endpoint": self.is_endpoint,
+            "endpoint_info": endpoint_info,
+            "_type": "async" if self.is_async else "sync",
+            "returns": self.returns,
+        }
+
+
+@dataclass(slots=True)
+class ImportInfo:
+    """import module [as alias] (name=None) или from module import name [as alias] с уровнем level"""
+    module: Optional[str]
+    name: Optional[str]
+    alias: Optional[str]
+    level: int = 0
+
+
+@dataclass(slots=True)
+class ModuleInfo:
+    """Результат разбора файла: функции ("name" / "Class.name") и импорты модуля"""
+    functions: Dict[str, FunctionInfo]
+    imports: Tuple[ImportInfo, ...] = ()
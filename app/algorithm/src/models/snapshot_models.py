@@ -0,0 +1,44 @@
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, List, Tuple
+
+from models.parse_models import ModuleInfo
+
+# ребро графа: родитель и имена узлов его вызовов
+Edge = Tuple[str, List[str]]
+
+
+@dataclass(slots=True)
+class FileSnapshot:
+    """
+    Файл проекта в прошлом анализе. Пути (узлы рёбер, модули) хранятся относительно корня загрузки,
+    так как каждая загрузка проекта лежит под новым префиксом.
+    """
+    # ETag объекта или md5 содержимого в том же виде
+    fingerprint: str
+    module: ModuleInfo
+    edges: List[Edge]
+    # модули, пространства имён которых читались при разрешении вызовов файла
+    used_modules: FrozenSet[str] = frozenset()
+    # имена, искавшиеся среди уникальных имён проекта
+    used_names: FrozenSet[str] = frozenset()
+    # точечные имена модулей, которые искали импорты файла
+    module_refs: FrozenSet[str] = frozenset()
+
+
+@dataclass(slots=True)
+class AnalysisSnapshot:
+    """Результат прошлого анализа проекта: основа для инкрементального анализа новой загрузки"""
+    task_id: int
+    files: Dict[str, FileSnapshot] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class GraphDelta:
+    """Изменения графа вызовов относительно прошлого анализа, пути узлов - в новой загрузке"""
+    base_task_id: int
+    added_nodes: List[str]
+    removed_nodes: List[str]
+    added_edges: List[Edge]
+    removed_edges: List[Edge]
+    changed_files: int
+    reanalyzed_files: int
@@ -0,0 +1,328 @@
+import asyncio
+import hashlib
+import os
+from collections import defaultdict
+from functools import cached_property
+from typing import Dict, List, Any, AsyncIterator, Iterator, Optional, Set, Tuple
+
+from models.parse_models import FunctionInfo, ModuleInfo
+from models.snapshot_models import AnalysisSnapshot, Edge, FileSnapshot, GraphDelta
+from services.archive_source import ArchiveSource
+from services.ignore_rules import IgnoreRules
+from services.manage.object_manager import object_manager
+from services.manage.parse_cache_manager import parse_cache
+from services.parse_backend import parse_backend
+from services.parser import Parser
+from services.pipeline import read_ahead, fetch_files
+from services.symbol_table import SymbolTable
+from services.task_budget import TaskBudget, TaskStopped
+from utils.logger import create_logger
+
+log = create_logger("ProjectAnalyzer")
+
+
+class ProjectAnalyzer:
+    """
+    Однопроходный анализ проекта: один листинг, одно чтение и один разбор каждого файла.
+    Инкрементальный режим (incremental=True или есть previous - снимок прошлого анализа проекта):
+    файлы с тем же отпечатком, что в снимке, не читаются и не разбираются, а рёбра заново разрешаются
+    только у файлов, на разрешение вызовов которых повлияли изменения.
+    Расход бюджета задачи проверяется на каждом файле: при остановке анализ завершается с тем,
+    что успел разобрать, а причина остаётся в stopped.
+    Файлы, исключённые правилами ignore, не читаются: они отбрасываются по листингу или таблице архива.
+    """
+
+    DEPENDENCY_FILES = ("requirements.txt", "pyproject.toml")
+
+    def __init__(self, prefix: str, previous: Optional[AnalysisSnapshot] = None, incremental: bool = False,
+                 budget: Optional[TaskBudget] = None, ignore: Optional[IgnoreRules] = None):
+        # ключ архива или префикс папки в хранилище
+        self.source = prefix
+        # корень проекта для путей и имён модулей, всегда со слэшем: у ключа архива его нет
+        self.prefix = prefix.rstrip("/") + "/"
+        self.budget = budget if budget is not None else TaskBudget()
+        self.ignore = ignore if ignore is not None else IgnoreRules.from_config()
+        self.stopped: Optional[TaskStopped] = None
+        self.previous = previous
+        self.incremental = incremental or previous is not None
+        self.dependencies: Dict[str, List[str]] = {}
+        # file_key -> функции и импорты файла, общий результат для всех этапов
+        self.files: Dict[str, ModuleInfo] = {}
+        # file_key -> отпечаток python файла (ETag или md5 содержимого), только в инкрементальном режиме
+        self.fingerprints: Dict[str, str] = {}
+        # python файлы, взятые из прошлого снимка без чтения
+        self.restored: Set[str] = set()
+        # пути относительно корня: python файлы, добавленные, изменённые или удалённые с прошлого анализа
+        self.changed: Set[str] = set()
+        # python файлы, рёбра которых разрешались заново, а не брались из снимка
+        self.reanalyzed: Set[str] = set()
+        # file_key -> рёбра файла с путями относительно корня, как они попадут в снимок
+        self._relative_edges: Dict[str, List[Edge]] = {}
+
+    async def run(self) -> "ProjectAnalyzer":
+        """Читает и разбирает все файлы проекта ровно один раз"""
+        dependencies: Dict[str, List[str]] = {}
+        hits, misses = parse_cache.hits, parse_cache.misses
+        parsing = set()
+        # байты архива учитывает ArchiveSource при чтении
+        archive = ArchiveSource.is_archive(self.source)
+        files = self._files()
+        try:
+            self.budget.check()
+            while True:
+                # чтение одного файла (или страницы листинга, части архива) не переживёт время задачи
+                try:
+                    file_key, content = await self.budget.within(anext(files))
+                except StopAsyncIteration:
+                    break
+                self.budget.spend(files=1, size=0 if archive else len(content))
+                self.budget.check()
+                if not file_key.endswith(".py"):
+                    self._analyze_dependencies(file_key, content, dependencies)
+                    continue
+                if self.incremental and file_key not in self.fingerprints:
+                    # архив читается целиком, но неизменённые файлы не разбираются
+                    self.fingerprints[file_key] = self.fingerprint(content)
+                    if self._restore(file_key):
+                        continue
+
+                parsing.add(asyncio.create_task(self._analyze_python(file_key, content)))
+                # не читаем впрок больше, чем успевает разобрать пул
+                if len(parsing) >= parse_backend.capacity:
+                    _, parsing = await asyncio.wait(parsing, timeout=self.budget.remaining,
+                                                    return_when=asyncio.FIRST_COMPLETED)
+                    self.budget.check_time()
+
+            while parsing:
+                _, parsing = await asyncio.wait(parsing, timeout=self.budget.remaining)
+                self.budget.check_time()
+        except TaskStopped as e:
+            self.stopped = e
+            log.warning(f"Анализ {self.source} остановлен: {e.detail}, разобрано файлов {len(self.files)}")
+        finally:
+            for task in parsing:
+                task.cancel()
+            await files.aclose()
+
+        log.info(f"Кеш разбора: попаданий {parse_cache.hits - hits}, промахов {parse_cache.misses - misses}")
+        log.info(f"Исключено правилами: файлов {self.ignore.skipped_files}, {self.ignore.skipped_bytes} байт")
+
+        # файлы приходят в порядке готовности, результат упорядочиваем как листинг
+        self.files = {key: self.files[key] for key in sorted(self.files)}
+        self.dependencies = {os.path.basename(key): dependencies[key] for key in sorted(dependencies)}
+
+        if self.incremental:
+            # не разобранный файл для графа - всё равно что удалённый
+            self.changed = {self._relative(key) for key in self.files if key not in self.restored}
+            if self.previous is not None:
+                self.changed.update(self.previous.files.keys() - {self._relative(key) for key in self.files})
+                log.info(f"Инкрементальный анализ относительно задачи {self.previous.task_id}: "
+                         f"из снимка {len(self.restored)} файлов, изменено {len(self.changed)}")
+        return self
+
+    @staticmethod
+    def fingerprint(content: bytes) -> str:
+        """Отпечаток содержимого в виде ETag S3 для загрузки одним запросом"""
+        return f'"{hashlib.md5(content).hexdigest()}"'
+
+    def _relative(self, file_key: str) -> str:
+        return file_key[len(self.prefix):]
+
+    def _restore(self, file_key: str) -> bool:
+        """Берёт разбор файла из прошлого снимка, если отпечаток не изменился"""
+        if self.previous is None:
+            return False
+        old = self.previous.files.get(self._relative(file_key))
+        if old is None or old.fingerprint != self.fingerprints[file_key]:
+            return False
+        for func in old.module.functions.values():
+            func.file = file_key
+        self.files[file_key] = old.module
+        self.restored.add(file_key)
+        self.budget.spend(functions=len(old.module.functions))
+        return True
+
+    def _files(self) -> AsyncIterator[Tuple[str, bytes]]:
+        """Содержимое нужных файлов: из архива одним GET или по объекту на файл"""
+        if ArchiveSource.is_archive(self.source):
+            return ArchiveSource(self.source, budget=self.budget, ignore=self.ignore).files(self._is_wanted)
+        return fetch_files(self._wanted_keys(), object_manager.repo.read)
+
+    def _is_wanted(self, file_key: str) -> bool:
+        return file_key.endswith(".py") or file_key.endswith(self.DEPENDENCY_FILES)
+
+    async def _wanted_keys(self) -> AsyncIterator[str]:
+        async for file_key, etag in self.ignore.filter_listing(read_ahead(self._listing()), self.prefix,
+                                                               self._is_wanted, object_manager.repo.read):
+            if etag is not None and file_key.endswith(".py"):
+                # неизменённый файл не читается: разбор берётся из снимка
+                self.fingerprints[file_key] = etag
+                if self._restore(file_key):
+                    self.budget.spend(files=1)
+                    self.budget.check()
+                    continue
+            yield file_key
+
+    async def _listing(self) -> AsyncIterator[Tuple[str, Optional[str], int]]:
+        """Ключи проекта с размером, в инкрементальном режиме - и с ETag объектов"""
+        listed = 0
+        async for file_key, etag, size in object_manager.repo.iter_objects(self.prefix):
+            listed += 1
+            yield file_key, etag if self.incremental else None, size
+        log.info(f"Получено {listed} файлов по префиксу {self.prefix}")
+
+    async def _analyze_python(self, file_key: str, code: bytes) -> None:
+        try:
+            module = self.files[file_key] = await parse_backend.parse(code, file_key)
+            self.budget.spend(functions=len(module.functions))
+        except Exception as e:
+            log.error(f"Ошибка при парсинге S3 файла {file_key}: {e}")
+
+    @staticmethod
+    def _analyze_dependencies(file_key: str, content: bytes, dependencies: Dict[str, List[str]]) -> None:
+        try:
+            if file_key.endswith(".txt"):
+                dependencies[file_key] = Parser.parse_requirements(content.decode("utf-8").splitlines())
+            else:
+                dependencies[file_key] = Parser.parse_pyproject(content)
+        except Exception as e:
+            log.error(f"Ошибка при чтении зависимостей из {file_key}: {e}")
+
+    def functions(self) -> Iterator[Tuple[str, FunctionInfo]]:
+        """Все функции проекта в порядке листинга файлов"""
+        for module in self.files.values():
+            yield from module.functions.items()
+
+    def endpoints(self) -> List[Dict[str, Any]]:
+        return Parser.endpoints_from_functions(self.functions())
+
+    @cached_property
+    def symbols(self) -> SymbolTable:
+        """Таблица символов проекта, строится один раз после run() и общая для всех этапов"""
+        return SymbolTable(self.files, self.prefix, track=self.incremental)
+
+    def call_graph(self) -> Iterator[Tuple[str, List[str]]]:
+        if not self.incremental:
+            return Parser.call_graph_from_modules(self.files.items(), self.prefix, self.symbols)
+        return (edge for edges in self.file_edges.values() for edge in edges)
+
+    # --- инкрементальный анализ ---
+
+    def affected_files(self) -> Set[str]:
+        """
+        file_key файлов, вызовы которых надо разрешить заново: изменённые файлы и те, чьё разрешение
+        читало изменённые модули, модули с импортами добавленных/удалённых модулей или уникальные имена
+        функций изменённых файлов. Рёбра остальных файлов не изменились и берутся из снимка.
+        """
+        if self.previous is None:
+            return set(self.files)
+        previous = self.previous.files
+        # имена появившихся и исчезнувших модулей: импорты, которые их искали, теперь находят другое
+        moved: Set[str] = set()
+        # функции изменённых файлов до и после: от них зависит уникальность имён в проекте
+        names: Set[str] = set()
+        for rel in self.changed:
+            old, new = previous.get(rel), self.files.get(self.prefix + rel)
+            if old is None or new is None:
+                moved.update(self.symbols.module_names(self.prefix + rel))
+            if old is not None:
+                names.update(old.module.functions)
+            if new is not None:
+                names.update(new.functions)
+
+        dirty = set(self.changed)
+        if moved:
+            dirty.update(rel for rel, old in previous.items() if not old.module_refs.isdisjoint(moved))
+
+        affected = set()
+        for file_key in self.files:
+            rel = self._relative(file_key)
+            old = previous.get(rel)
+            if (old is None or rel in self.changed or not old.used_modules.isdisjoint(dirty)
+                    or not old.used_names.isdisjoint(names)):
+                affected.add(file_key)
+        return affected
+
+    @cached_property
+    def file_edges(self) -> Dict[str, List[Edge]]:
+        """Рёбра графа по файлам в порядке листинга"""
+        self.reanalyzed = self.affected_files()
+        edges: Dict[str, List[Edge]] = {}
+        for file_key, module in self.files.items():
+            if file_key in self.reanalyzed:
+                edges[file_key] = [(name, self.symbols.resolve_calls(func)) for name, func in module.functions.items()]
+                self._relative_edges[file_key] = [(parent, [self._relative(child) for child in children])
+                                                  for parent, children in edges[file_key]]
+            else:
+                old = self.previous.files[self._relative(file_key)].edges
+                edges[file_key] = [(parent, [self.prefix + child for child in children]) for parent, children in old]
+                self._relative_edges[file_key] = old
+        if self.previous is not None:
+            log.info(f"Рёбра разрешены заново у {len(self.reanalyzed)} из {len(self.files)} файлов")
+        return edges
+
+    def snapshot(self, task_id: int) -> AnalysisSnapshot:
+        """Снимок анализа для следующей загрузки проекта"""
+        previous = self.previous.files if self.previous is not None else {}
+        # таблица символов строится, только если что-то разрешалось заново
+        symbols: Optional[SymbolTable] = self.__dict__.get("symbols")
+        files: Dict[str, FileSnapshot] = {}
+        for file_key in self.file_edges:
+            rel = self._relative(file_key)
+            old = previous.get(rel)
+            if file_key not in self.reanalyzed:
+                used_modules, used_names = old.used_modules, old.used_names
+            elif symbols is not None:
+                used_modules = frozenset(self._relative(key) for key in symbols.used_modules.get(file_key, ()))
+                used_names = frozenset(symbols.used_names.get(file_key, ()))
+            else:
+                # ни в одном заново разбираемом файле нет функций
+                used_modules = used_names = frozenset()
+            refs = symbols.module_refs.get(file_key) if symbols is not None else None
+            if refs is not None:
+                module_refs = frozenset(refs)
+            elif file_key in self.restored:
+                module_refs = old.module_refs
+            else:
+                # пространство имён изменённого модуля ещё никто не читал
+                module_refs = frozenset()
+            files[rel] = FileSnapshot(self.fingerprints[file_key], self.files[file_key], self._relative_edges[file_key],
+                                      used_modules, used_names, module_refs)
+        return AnalysisSnapshot(task_id, files)
+
+    def graph_delta(self) -> Optional[GraphDelta]:
+        """Добавленные и удалённые узлы и рёбра относительно прошлого анализа; для неполного анализа - None"""
+        if self.previous is None or self.stopped is not None:
+            return None
+        old_parents, old_children, old_edges = self._graph_sets(file.edges for file in self.previous.files.values())
+        new_parents, new_children, new_edges = self._graph_sets(self._relative_edges[key] for key in self.file_edges)
+
+        def grouped(pairs: Set[Tuple[str, str]]) -> List[Edge]:
+            by_parent: Dict[str, List[str]] = defaultdict(list)
+            for parent, child in sorted(pairs):
+                by_parent[parent].append(self.prefix + child)
+            return list(by_parent.items())
+
+        def nodes(parents: Set[str], children: Set[str]) -> List[str]:
+            return sorted(parents) + [self.prefix + child for child in sorted(children)]
+
+        return GraphDelta(
+            base_task_id=self.previous.task_id,
+            added_nodes=nodes(new_parents - old_parents, new_children - old_children),
+            removed_nodes=nodes(old_parents - new_parents, old_children - new_children),
+            added_edges=grouped(new_edges - old_edges),
+            removed_edges=grouped(old_edges - new_edges),
+            changed_files=len(self.changed),
+            reanalyzed_files=len(self.reanalyzed),
+        )
+
+    @staticmethod
+    def _graph_sets(files) -> Tuple[Set[str], Set[str], Set[Tuple[str, str]]]:
+        """Родители, узлы вызовов и рёбра (родитель, вызов) графа из рёбер файлов"""
+        parents, children, edges = set(), set(), set()
+        for file_edges in files:
+            for parent, calls in file_edges:
+                parents.add(parent)
+                children.update(calls)
+                edges.update((parent, call) for call in calls)
+        return parents, children, edges
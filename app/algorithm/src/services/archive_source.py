@@ -0,0 +1,127 @@
+import asyncio
+import io
+import mmap
+import posixpath
+import tarfile
+import tempfile
+import zipfile
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Tuple
+
+from services.ignore_rules import IgnoreRules
+from services.manage.object_manager import object_manager
+from services.task_budget import TaskBudget
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("ArchiveSource")
+
+
+class ArchiveSource:
+    """
+    Проект, загруженный в хранилище одним архивом.
+    Архив читается одним потоковым GET: небольшой - в память, большой - в spool-файл,
+    который отображается через mmap. Члены архива перебираются zipfile/tarfile без распаковки на диск.
+    Правила ignore проверяются по таблице членов архива, исключённые члены не распаковываются.
+    """
+
+    ARCHIVE_SUFFIXES = ("/archive.zip", "/archive.tar")
+
+    def __init__(self, archive_key: str,
+                 spool_memory: int = CONFIG.parser.archive_spool_memory,
+                 spool_dir: Optional[str] = CONFIG.parser.archive_spool_dir,
+                 batch_bytes: int = 4 * 1024 * 1024, budget: Optional[TaskBudget] = None,
+                 ignore: Optional[IgnoreRules] = None):
+        self.archive_key = archive_key
+        self.budget = budget
+        self.ignore = ignore
+        self.spool_memory = spool_memory
+        self.spool_dir = spool_dir
+        self.batch_bytes = batch_bytes
+
+    @staticmethod
+    def is_archive(project_path: str) -> bool:
+        return project_path.endswith(ArchiveSource.ARCHIVE_SUFFIXES)
+
+    async def files(self, wanted: Callable[[str], bool]) -> AsyncIterator[Tuple[str, bytes]]:
+        """Отдаёт (ключ, содержимое) нужных файлов архива, ключ = '<архив>/<путь в архиве>'"""
+        buffer: Optional[io.BytesIO] = io.BytesIO()
+        spool = None
+        size = 0
+        try:
+            async for chunk in object_manager.repo.stream_read(self.archive_key):
+                size += len(chunk)
+                if self.budget is not None:
+                    # архив больше бюджета не дочитывается
+                    self.budget.spend(size=len(chunk))
+                    self.budget.check()
+                if buffer is not None and size > self.spool_memory:
+                    spool = tempfile.TemporaryFile(dir=self.spool_dir)
+                    spool.write(buffer.getbuffer())
+                    buffer = None
+                if buffer is not None:
+                    buffer.write(chunk)
+                else:
+                    await asyncio.to_thread(spool.write, chunk)
+            log.info(f"Архив {self.archive_key} прочитан, {size} байт, "
+                     f"{'в памяти' if spool is None else 'в spool-файле'}")
+
+            if spool is not None:
+                spool.flush()
+                source = mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                source = buffer
+
+            batches = self._iter_batches(source, wanted)
+            try:
+                # распаковка идёт в потоке, event loop свободен
+                while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                    for name, content in batch:
+                        yield f"{self.archive_key}/{name}", content
+            finally:
+                batches.close()
+                if isinstance(source, mmap.mmap):
+                    source.close()
+        finally:
+            if spool is not None:
+                spool.close()
+
+    def _iter_batches(self, source, wanted: Callable[[str], bool]) -> Iterator[List[Tuple[str, bytes]]]:
+        """Группирует члены архива в пачки, чтобы не переключаться в поток ради каждого файла"""
+        batch, batch_size = [], 0
+        for name, content in self._iter_members(source, wanted):
+            batch.append((name, content))
+            batch_size += len(content)
+            if batch_size >= self.batch_bytes:
+                yield batch
+                batch, batch_size = [], 0
+        if batch:
+            yield batch
+
+    def _iter_members(self, source, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, bytes]]:
+        if zipfile.is_zipfile(source):
+            source.seek(0)
+            with zipfile.ZipFile(source) as archive:
+                members = [(posixpath.normpath(info.filename), info)
+                           for info in archive.infolist() if not info.is_dir()]
+                if self.ignore is not None:
+                    self.ignore.load_gitignores(members, archive.read)
+                for name, info in members:
+                    if self._wanted(name, info.file_size, wanted):
+                        yield name, archive.read(info)
+            return
+
+        source.seek(0)
+        with tarfile.open(fileobj=source, mode="r:*") as archive:
+            if self.ignore is not None and self.ignore.gitignore:
+                # .gitignore может лежать в tar после файлов своего каталога: сначала читаются заголовки,
+                # дальше проход последовательный - для сжатых tar случайный доступ дорогой
+                members = [(posixpath.normpath(member.name), member) for member in archive.getmembers()]
+                self.ignore.load_gitignores([(name, member) for name, member in members if member.isfile()],
+                                            lambda member: archive.extractfile(member).read())
+            for member in archive:
+                name = posixpath.normpath(member.name)
+                if member.isfile() and self._wanted(name, member.size, wanted):
+                    yield name, archive.extractfile(member).read()
+
+    def _wanted(self, name: str, size: int, wanted: Callable[[str], bool]) -> bool:
+        return wanted(name) and (self.ignore is None or not self.ignore.skip(name, size))
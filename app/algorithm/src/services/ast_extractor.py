@@ -0,0 +1,222 @@
+import ast
+import re
+import sys
+from typing import Dict, List, Optional, Tuple, Union
+
+from models.parse_models import DecoratorInfo, EndpointInfo, FunctionInfo, ImportInfo, ModuleInfo
+
+HTTP_METHODS = {"get", "post", "put", "patch", "delete"}
+_RESPONSE_MODEL = re.compile(r"response_model\s*=\s*([A-Za-z_][A-Za-z0-9_\.]*)")
+
+
+def _call_name(node: ast.AST) -> Optional[str]:
+    """Полное имя вызова: a.b.c для a.b.c() и a().b.c(), имя интернируется"""
+    parts = []
+    while True:
+        if isinstance(node, ast.Name):
+            parts.append(node.id)
+            break
+        elif isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        elif isinstance(node, ast.Call):
+            node = node.func
+        else:
+            break
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return sys.intern(parts[0])
+    return sys.intern(".".join(reversed(parts)))
+
+
+def _is_endpoint_decorator(name: Optional[str]) -> bool:
+    if not name:
+        return False
+    obj, dot, method = name.partition(".")
+    return bool(dot) and "." not in method and method.lower() in HTTP_METHODS
+
+
+class SourceExtractor(ast.NodeVisitor):
+    """
+    Извлечение функций, вызовов, декораторов, роутеров и импортов модуля за один обход AST.
+    Учитываются все функции и все их декораторы, эндпоинт определяется по первому декоратору с HTTP
+    методом в любой позиции, вызовы идут в порядке обхода в ширину, как у ast.walk.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self.functions: Dict[str, FunctionInfo] = {}
+        self.routers: Dict[str, str] = {}
+        self.imports: List[ImportInfo] = []
+        # (глубина, имя) вызовов текущей функции
+        self._calls: List[Tuple[int, str]] = []
+        self._depth = 0
+
+    def extract(self, code: Union[str, bytes]) -> ModuleInfo:
+        self.visit(ast.parse(code, filename=self.file_path))
+        # префиксы роутеров известны только после обхода всего модуля
+        for func in self.functions.values():
+            if func.endpoint is not None:
+                self._enhance_endpoint_info(func)
+        return ModuleInfo(functions=self.functions, imports=tuple(self.imports))
+
+    # --- уровень модуля ---
+
+    def visit_Module(self, node: ast.Module) -> None:
+        for child in node.body:
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._add_function(child, None)
+            elif isinstance(child, ast.ClassDef):
+                for sub in child.body:
+                    if isinstance(sub, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                        self._add_function(sub, sys.intern(child.name))
+            elif isinstance(child, ast.Assign):
+                self._add_router(child)
+            elif isinstance(child, (ast.Import, ast.ImportFrom)):
+                self._add_imports(child)
+
+    def _add_imports(self, node: Union[ast.Import, ast.ImportFrom]) -> None:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                self.imports.append(ImportInfo(module=sys.intern(alias.name), name=None, alias=alias.asname))
+        else:
+            module = sys.intern(node.module) if node.module else None
+            for alias in node.names:
+                self.imports.append(ImportInfo(module=module, name=sys.intern(alias.name),
+                                               alias=alias.asname, level=node.level))
+
+    def _add_router(self, node: ast.Assign) -> None:
+        """router = APIRouter(prefix=...) / app = FastAPI(root_path=...)"""
+        if not isinstance(node.value, ast.Call):
+            return
+        if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+            return
+        call_name = _call_name(node.value.func)
+        if not call_name:
+            return
+
+        if call_name.endswith("APIRouter"):
+            keys = ("prefix",)
+        elif call_name.endswith("FastAPI"):
+            keys = ("root_path", "prefix")
+        else:
+            return
+
+        prefix = ""
+        for kw in node.value.keywords:
+            if kw.arg in keys:
+                prefix = ast.literal_eval(kw.value)
+        self.routers[node.targets[0].id] = prefix
+
+    # --- функции ---
+
+    def _add_function(self, node: Union[ast.FunctionDef, ast.AsyncFunctionDef], class_name: Optional[str]) -> None:
+        self._calls = []
+        self._depth = 0
+        self.generic_visit(node)
+        # ast.walk обходит дерево в ширину: стабильная сортировка по глубине даёт тот же порядок
+        self._calls.sort(key=lambda item: item[0])
+
+        decorators = tuple(self._decorator(dec) for dec in node.decorator_list)
+        endpoint = None
+        # эндпоинт может быть обёрнут другими декораторами: @cache над @router.get
+        for decorator in decorators:
+            if _is_endpoint_decorator(decorator.name):
+                obj, _, method = decorator.name.partition(".")
+                endpoint = EndpointInfo(object=obj, method=sys.intern(method.lower()),
+                                        path=decorator.path, full_path=decorator.path, args=decorator.args)
+                break
+
+        name = sys.intern(node.name)
+        self.functions[f"{class_name}.{name}" if class_name else name] = FunctionInfo(
+            name=name,
+            file=self.file_path,
+            class_name=class_name,
+            args=tuple(sys.intern(arg.arg) for arg in node.args.args),
+            arg_types={arg.arg: sys.intern(arg.annotation.id)
+                       for arg in node.args.args if isinstance(arg.annotation, ast.Name)} or None,
+            decorators=decorators,
+            calls=tuple(call for _, call in self._calls),
+            is_async=isinstance(node, ast.AsyncFunctionDef),
+            returns=sys.intern(ast.unparse(node.returns)) if node.returns else None,
+            endpoint=endpoint,
+        )
+
+    @staticmethod
+    def _decorator(dec: ast.expr) -> DecoratorInfo:
+        """Имя и аргументы декоратора; аргументы в текст переводятся только у эндпоинтов"""
+        is_call = isinstance(dec, ast.Call)
+        name = _call_name(dec.func if is_call else dec)
+        dec_args = []
+        path = ""
+        if is_call:
+            unparse = _is_endpoint_decorator(name)
+            for arg in dec.args:
+                # path должен быть строкой
+                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+                    path = arg.value
+                elif unparse:
+                    dec_args.append(ast.unparse(arg))
+            if unparse:
+                for kw in dec.keywords:
+                    if kw.arg == "response_model":
+                        dec_args.append(f"response_model={ast.unparse(kw.value)}")
+                    else:
+                        dec_args.append(ast.unparse(kw.value))
+        return DecoratorInfo(name=name, args=tuple(dec_args), path=path)
+
+    def _enhance_endpoint_info(self, func: FunctionInfo) -> None:
+        """Полный путь с префиксом роутера и response_model эндпоинта"""
+        endpoint = func.endpoint
+        endpoint.full_path = f"{self.routers.get(endpoint.object, '')}{endpoint.path}"
+
+        response_model = None
+        for arg in endpoint.args:
+            if "response_model" in arg:
+                match = _RESPONSE_MODEL.search(arg)
+                if match:
+                    response_model = match.group(1)
+        endpoint.response_model = response_model or func.returns
+
+    # --- обход тела функции ---
+
+    def generic_visit(self, node: ast.AST) -> None:
+        """
+        Обход дочерних узлов без поиска visit_<класс> для каждого узла:
+        интересны только вызовы, а поля ctx (Load/Store) пропускаются.
+        """
+        self._depth += 1
+        for field in _child_fields(type(node)):
+            value = getattr(node, field, None)
+            if type(value) is list:
+                for item in value:
+                    if isinstance(item, ast.AST):
+                        if type(item) is ast.Call:
+                            self.visit_Call(item)
+                        else:
+                            self.generic_visit(item)
+            elif isinstance(value, ast.AST):
+                if type(value) is ast.Call:
+                    self.visit_Call(value)
+                else:
+                    self.generic_visit(value)
+        self._depth -= 1
+
+    def visit_Call(self, node: ast.Call) -> None:
+        name = _call_name(node.func)
+        if name:
+            self._calls.append((self._depth, name))
+        self.generic_visit(node)
+
+
+_CHILD_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+
+def _child_fields(node_type: type) -> Tuple[str, ...]:
+    """Поля класса узла, в которых могут быть дочерние узлы"""
+    fields = _CHILD_FIELDS.get(node_type)
+    if fields is None:
+        fields = tuple(field for field in node_type._fields if field not in ("ctx", "id", "arg", "attr", "name"))
+        _CHILD_FIELDS[node_type] = fields
+    return fields
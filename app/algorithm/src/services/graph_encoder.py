@@ -0,0 +1,41 @@
+from typing import Dict, List, Sequence, Tuple
+
+import grpc_control.generated.shared.common_pb2 as common_pb2
+
+
+class NodeTableEncoder:
+    """
+    Кодирование рёбер графа через таблицу узлов.
+    Каждый путь получает ID при первом появлении и передаётся один раз - в том сообщении,
+    где встретился впервые; дальше рёбра ссылаются на него числом.
+    Один кодировщик на стрим задачи: ID продолжаются от сообщения к сообщению.
+    """
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def _node_id(self, path: str, new_nodes: List[str]) -> int:
+        node_id = self.ids.get(path)
+        if node_id is None:
+            node_id = self.ids[path] = len(self.ids)
+            new_nodes.append(path)
+        return node_id
+
+    def encode(self, edges: Sequence[Tuple[str, Sequence[str]]]) -> common_pb2.GraphPartArchitectureEncoded:
+        offset = len(self.ids)
+        new_nodes: List[str] = []
+        parents: List[int] = []
+        children_count: List[int] = []
+        children: List[int] = []
+        for parent, calls in edges:
+            parents.append(self._node_id(parent, new_nodes))
+            children_count.append(len(calls))
+            for call in calls:
+                children.append(self._node_id(call, new_nodes))
+        return common_pb2.GraphPartArchitectureEncoded(
+            node_offset=offset,
+            nodes=new_nodes,
+            parents=parents,
+            children_count=children_count,
+            children=children,
+        )
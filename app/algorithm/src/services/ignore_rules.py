@@ -0,0 +1,208 @@
+import posixpath
+import re
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Pattern, Tuple, TypeVar
+
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("IgnoreRules")
+
+T = TypeVar("T")
+
+
+class IgnoreRule:
+    """Одна строка в формате .gitignore, base - каталог файла правил относительно корня проекта"""
+
+    def __init__(self, regex: Pattern[str], negate: bool, dir_only: bool, anchored: bool, base: str = ""):
+        self.regex = regex
+        self.negate = negate
+        self.dir_only = dir_only
+        self.anchored = anchored
+        self.base = base
+
+    @classmethod
+    def parse(cls, line: str, base: str = "") -> Optional["IgnoreRule"]:
+        line = line.rstrip("\r\n")
+        if not line.strip() or line.startswith("#"):
+            return None
+        # пробелы в конце отбрасываются, кроме экранированного
+        stripped = line.rstrip(" ")
+        if stripped.endswith("\\") and len(stripped) < len(line):
+            stripped += " "
+        line = stripped
+
+        negate = line.startswith("!")
+        if negate:
+            line = line[1:]
+        elif line.startswith(("\\!", "\\#")):
+            line = line[1:]
+        dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            return None
+        # шаблон со слэшем в начале или середине привязан к каталогу правил, без слэша - к любому уровню
+        anchored = "/" in line
+        return cls(re.compile(cls._translate(line.lstrip("/"))), negate, dir_only, anchored, base)
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        i, n, out = 0, len(pattern), []
+        while i < n:
+            c = pattern[i]
+            if pattern.startswith("**", i):
+                at_start = i == 0 or pattern[i - 1] == "/"
+                if at_start and pattern.startswith("**/", i):
+                    # "**/" - любое число каталогов, в том числе ни одного
+                    out.append("(?:.*/)?")
+                    i += 3
+                    continue
+                if at_start and i + 2 == n:
+                    # "/**" в конце - всё содержимое каталога
+                    out.append(".*")
+                    i += 2
+                    continue
+                out.append("[^/]*")
+                i += 2
+            elif c == "*":
+                out.append("[^/]*")
+                i += 1
+            elif c == "?":
+                out.append("[^/]")
+                i += 1
+            elif c == "[":
+                j = pattern.find("]", i + 2)
+                if j < 0:
+                    out.append(re.escape(c))
+                    i += 1
+                    continue
+                content = pattern[i + 1:j]
+                if content[0] in "!^":
+                    content = "^" + content[1:]
+                out.append(f"[{content.replace(chr(92), chr(92) * 2)}]")
+                i = j + 1
+            elif c == "\\" and i + 1 < n:
+                out.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                out.append(re.escape(c))
+                i += 1
+        return "".join(out)
+
+    def matches(self, path: str, is_dir: bool) -> bool:
+        if self.dir_only and not is_dir:
+            return False
+        relative = path[len(self.base) + 1:] if self.base else path
+        if not self.anchored:
+            relative = relative.rsplit("/", 1)[-1]
+        return self.regex.fullmatch(relative) is not None
+
+
+class IgnoreRules:
+    """
+    Правила исключения файлов проекта в формате .gitignore, проверяются по ключам листинга до чтения файлов.
+    Порядок как у git - побеждает последнее совпавшее правило: встроенные шаблоны (окружения, зависимости,
+    миграции, сгенерированный код), шаблоны из конфига, .gitignore проекта от корня вглубь и в конце
+    переопределения задачи. Файл в исключённом каталоге не возвращается отрицанием, сам каталог - можно
+    ("!migrations/"). Пути - относительно корня проекта (префикса загрузки или корня архива).
+    """
+
+    DEFAULT_PATTERNS = (
+        ".git/", ".hg/", ".svn/",
+        "venv/", ".venv/", "virtualenv/", "site-packages/", "dist-packages/",
+        "node_modules/", "bower_components/",
+        "__pycache__/", ".tox/", ".nox/", ".eggs/", "*.egg-info/", ".mypy_cache/", ".pytest_cache/",
+        "build/", "dist/",
+        "migrations/", "**/alembic/versions/",
+        "*_pb2.py", "*_pb2_grpc.py", "*_pb2.pyi",
+    )
+    GITIGNORE = ".gitignore"
+
+    def __init__(self, patterns: Iterable[str] = (), overrides: Iterable[str] = (), gitignore: bool = True):
+        self.gitignore = gitignore
+        self._rules = self._parse(patterns)
+        self._overrides = self._parse(overrides)
+        # каталог -> правила его .gitignore
+        self._gitignores: Dict[str, List[IgnoreRule]] = {}
+        # каталог -> исключён ли он, сбрасывается при добавлении .gitignore
+        self._dirs: Dict[str, bool] = {}
+        self.skipped_files = 0
+        self.skipped_bytes = 0
+
+    @classmethod
+    def from_config(cls, overrides: Optional[Iterable[str]] = None) -> "IgnoreRules":
+        """Правила из конфига с переопределениями из сообщения задачи: ["!migrations/", "tests/"]"""
+        patterns = (cls.DEFAULT_PATTERNS if CONFIG.ignore.defaults else ()) + tuple(CONFIG.ignore.patterns)
+        return cls(patterns, overrides or (), gitignore=CONFIG.ignore.gitignore)
+
+    @staticmethod
+    def _parse(lines: Iterable[str], base: str = "") -> List[IgnoreRule]:
+        return [rule for rule in (IgnoreRule.parse(line, base) for line in lines) if rule is not None]
+
+    def add_gitignore(self, directory: str, content: bytes) -> None:
+        rules = self._parse(content.decode("utf-8", errors="replace").splitlines(), directory.strip("/"))
+        if rules:
+            self._gitignores[directory.strip("/")] = rules
+            self._dirs.clear()
+
+    def load_gitignores(self, members: Iterable[Tuple[str, T]], read: Callable[[T], bytes]) -> None:
+        """Файлы .gitignore из полного списка файлов (архива): от корня вглубь, в исключённых каталогах - нет"""
+        if not self.gitignore:
+            return
+        found = [(path, member) for path, member in members if posixpath.basename(path) == self.GITIGNORE]
+        for path, member in sorted(found, key=lambda item: item[0].count("/")):
+            if not self.ignored(path):
+                self.add_gitignore(posixpath.dirname(path), read(member))
+
+    def ignored(self, path: str) -> bool:
+        parts = path.split("/")
+        for i in range(1, len(parts)):
+            directory = "/".join(parts[:i])
+            excluded = self._dirs.get(directory)
+            if excluded is None:
+                excluded = self._dirs[directory] = self._match(directory, is_dir=True)
+            if excluded:
+                return True
+        return self._match(path, is_dir=False)
+
+    def skip(self, path: str, size: int) -> bool:
+        """Проверяет файл и учитывает исключённый в skipped_files и skipped_bytes"""
+        if not self.ignored(path):
+            return False
+        self.skipped_files += 1
+        self.skipped_bytes += size
+        return True
+
+    def _match(self, path: str, is_dir: bool) -> bool:
+        excluded = False
+        for rule in self._rules_for(path):
+            if rule.matches(path, is_dir):
+                excluded = not rule.negate
+        return excluded
+
+    def _rules_for(self, path: str) -> Iterable[IgnoreRule]:
+        yield from self._rules
+        if self._gitignores:
+            parts = path.split("/")
+            for i in range(len(parts)):
+                yield from self._gitignores.get("/".join(parts[:i]), ())
+        yield from self._overrides
+
+    async def filter_listing(self, listing: AsyncIterator[Tuple[str, Optional[str], int]], prefix: str,
+                             wanted: Callable[[str], bool],
+                             read: Callable[[str], Awaitable[bytes]]) -> AsyncIterator[Tuple[str, Optional[str]]]:
+        """
+        Нужные и не исключённые (ключ, ETag) из листинга (ключ, ETag, размер).
+        .gitignore читается, когда встречается в листинге: S3 отдаёт ключи по возрастанию, и .gitignore
+        каталога идёт раньше почти всех его файлов (кроме имён, начинающихся с символов меньше '.').
+        """
+        async for file_key, etag, size in listing:
+            path = file_key[len(prefix):]
+            if posixpath.basename(path) == self.GITIGNORE:
+                if self.gitignore and not self.ignored(path):
+                    try:
+                        self.add_gitignore(posixpath.dirname(path), await read(file_key))
+                    except Exception as e:
+                        log.error(f"Ошибка чтения {file_key}: {e}")
+                continue
+            if wanted(file_key) and not self.skip(path, size):
+                yield file_key, etag
@@ -0,0 +1,93 @@
+import dataclasses
+import hashlib
+import pickle
+from typing import Optional, Union
+
+from models.parse_models import ModuleInfo
+from infrastructure.cache.disk_cache import DiskParseCache
+from infrastructure.cache.interface import AbstractParseCache
+from infrastructure.cache.redis_cache import RedisParseCache
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("ParseCacheManagerService")
+
+
+class ParseCacheManager:
+    """
+    Кеш результатов разбора файлов по хешу содержимого.
+    Путь файла в записи не хранится: одинаковый файл в новой загрузке проекта лежит под другим ключом S3.
+    Значения сериализуются pickle, поэтому хранилище кеша должно быть доверенным (внутренний диск/Redis).
+    """
+
+    # Увеличивать при любом изменении формата результата разбора
+    VERSION = 5
+
+    def __init__(self, repo: Optional[AbstractParseCache]):
+        self.repo = repo
+        self.hits = 0
+        self.misses = 0
+
+    async def start(self) -> None:
+        if self.repo is not None:
+            await self.repo.start()
+
+    async def close(self) -> None:
+        if self.repo is not None:
+            await self.repo.close()
+
+    @classmethod
+    def key(cls, code: Union[str, bytes]) -> str:
+        if isinstance(code, str):
+            code = code.encode("utf-8")
+        return f"v{cls.VERSION}-{hashlib.sha256(code).hexdigest()}"
+
+    async def get(self, key: str, file_path: str) -> Optional[ModuleInfo]:
+        if self.repo is None:
+            return None
+        try:
+            value = await self.repo.get(key)
+        except Exception as e:
+            log.error(f"Ошибка чтения кеша разбора {key}: {e}")
+            return None
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        try:
+            module = pickle.loads(value)
+        except Exception as e:
+            # повреждённая или устаревшая запись: файл разбирается заново
+            log.error(f"Ошибка чтения записи кеша разбора {key}: {e}")
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        for func in module.functions.values():
+            func.file = file_path
+        return module
+
+    async def set(self, key: str, module: ModuleInfo) -> None:
+        if self.repo is None:
+            return
+        detached = dataclasses.replace(module, functions={
+            name: dataclasses.replace(func, file=None) for name, func in module.functions.items()
+        })
+        try:
+            await self.repo.set(key, pickle.dumps(detached, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception as e:
+            log.error(f"Ошибка записи кеша разбора {key}: {e}")
+
+
+def create_parse_cache_repo(backend: str = CONFIG.cache.backend) -> Optional[AbstractParseCache]:
+    if backend == "disk":
+        return DiskParseCache()
+    if backend == "redis":
+        return RedisParseCache()
+    if backend == "none":
+        return None
+    raise ValueError(f"Неизвестный бэкенд кеша разбора {backend}")
+
+
+parse_cache = ParseCacheManager(create_parse_cache_repo())
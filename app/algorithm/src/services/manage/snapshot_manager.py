@@ -0,0 +1,71 @@
+import asyncio
+import hashlib
+import pickle
+import zlib
+from typing import Optional
+
+from infrastructure.cache.interface import AbstractParseCache
+from models.snapshot_models import AnalysisSnapshot
+from services.manage.parse_cache_manager import ParseCacheManager, parse_cache
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("SnapshotManagerService")
+
+
+class SnapshotManager:
+    """
+    Снимки прошлых анализов проектов для инкрементального анализа повторных загрузок.
+    Ключ снимка - project_key из сообщения задачи (id проекта в core): путь загрузки его не заменяет,
+    у разных проектов пользователя могут совпадать имена архивов.
+    Снимок хранится в том же хранилище, что и кеш разбора (одна запись на проект, перезаписывается),
+    сериализуется pickle и сжимается zlib. Вытесненный снимок - просто полный анализ следующей загрузки.
+    """
+
+    # Увеличивать при любом изменении формата снимка; формат разбора учитывается через ParseCacheManager.VERSION
+    VERSION = 1
+
+    def __init__(self, repo: Optional[AbstractParseCache]):
+        self.repo = repo
+
+    @property
+    def enabled(self) -> bool:
+        return self.repo is not None
+
+    @classmethod
+    def key(cls, project_key: str) -> str:
+        digest = hashlib.sha256(project_key.encode("utf-8")).hexdigest()
+        return f"snapshot-v{ParseCacheManager.VERSION}.{cls.VERSION}-{digest}"
+
+    async def get(self, project_key: str) -> Optional[AnalysisSnapshot]:
+        if self.repo is None:
+            return None
+        try:
+            value = await self.repo.get(self.key(project_key))
+            if value is None:
+                return None
+            return await asyncio.to_thread(self._loads, value)
+        except Exception as e:
+            log.error(f"Ошибка чтения снимка проекта {project_key}: {e}")
+            return None
+
+    async def set(self, project_key: str, snapshot: AnalysisSnapshot) -> None:
+        if self.repo is None:
+            return
+        try:
+            value = await asyncio.to_thread(self._dumps, snapshot)
+            await self.repo.set(self.key(project_key), value, replace=True)
+            log.info(f"Сохранён снимок проекта {project_key}: файлов {len(snapshot.files)}, {len(value)} байт")
+        except Exception as e:
+            log.error(f"Ошибка записи снимка проекта {project_key}: {e}")
+
+    @staticmethod
+    def _dumps(snapshot: AnalysisSnapshot) -> bytes:
+        return zlib.compress(pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL), 1)
+
+    @staticmethod
+    def _loads(value: bytes) -> AnalysisSnapshot:
+        return pickle.loads(zlib.decompress(value))
+
+
+snapshot_manager = SnapshotManager(parse_cache.repo if CONFIG.cache.snapshots else None)
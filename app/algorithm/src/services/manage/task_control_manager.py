@@ -0,0 +1,54 @@
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator
+
+from services.task_budget import TaskBudget
+from utils.logger import create_logger
+
+log = create_logger("TaskControlManagerService")
+
+
+class TaskControlManager:
+    """
+    Выполняющиеся на реплике задачи и их бюджеты.
+    Управляющие сообщения брокера приходят всем репликам: отмена задачи, которой здесь нет,
+    запоминается (ограниченно) на случай, если задача ещё ждёт в очереди и достанется этой реплике.
+    """
+
+    def __init__(self, remember: int = 1000):
+        self.remember = remember
+        self._running: Dict[int, TaskBudget] = {}
+        self._cancelled: "OrderedDict[int, str]" = OrderedDict()
+
+    @contextmanager
+    def track(self, task_id: int, budget: TaskBudget) -> Iterator[TaskBudget]:
+        detail = self._cancelled.pop(task_id, None)
+        if detail is not None:
+            budget.cancel(detail)
+        self._running[task_id] = budget
+        try:
+            yield budget
+        finally:
+            if self._running.get(task_id) is budget:
+                del self._running[task_id]
+
+    def cancel(self, task_id: int, detail: str = "задача отменена") -> None:
+        budget = self._running.get(task_id)
+        if budget is not None:
+            budget.cancel(detail)
+            log.info(f"Задача {task_id} отменяется: {detail}")
+            return
+        self._cancelled[task_id] = detail
+        self._cancelled.move_to_end(task_id)
+        while len(self._cancelled) > self.remember:
+            self._cancelled.popitem(last=False)
+
+    def handle(self, message: Dict[str, Any]) -> None:
+        """Управляющее сообщение брокера: {"type": "cancel", "task_id": 1, "reason": "проект удалён"}"""
+        if message.get("type") == "cancel" and "task_id" in message:
+            self.cancel(int(message["task_id"]), message.get("reason") or "задача отменена")
+        else:
+            log.warning(f"Неизвестное управляющее сообщение: {message}")
+
+
+task_control = TaskControlManager()
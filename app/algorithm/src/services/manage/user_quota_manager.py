@@ -0,0 +1,74 @@
+from typing import Any, Dict, Optional
+
+from infrastructure.task_slots.interface import AbstractTaskSlots
+from infrastructure.task_slots.memory_slots import InMemoryTaskSlots
+from infrastructure.task_slots.redis_slots import RedisTaskSlots
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("UserQuotaManagerService")
+
+
+class UserQuotaManager:
+    """
+    Ограничение числа задач одного пользователя, выполняющихся одновременно на всех репликах.
+    Задача сверх ограничения откладывается (TaskPool возвращает её в очередь через очередь ожидания),
+    и обработчики достаются задачам других пользователей. Слот арендуется на время бюджета задачи
+    с запасом: слот упавшей реплики освобождается сам. Ошибка хранилища слотов задачу не задерживает.
+    """
+
+    def __init__(self, repo: AbstractTaskSlots, limit: int = CONFIG.schedule.user_max_running,
+                 seconds: float = CONFIG.budget.seconds, lease_margin: float = 60, max_lease: float = 3600):
+        self.repo = repo
+        self.limit = limit
+        self.seconds = seconds
+        self.lease_margin = lease_margin
+        self.max_lease = max_lease
+
+    async def start(self) -> None:
+        await self.repo.start()
+
+    async def close(self) -> None:
+        await self.repo.close()
+
+    def lease(self, task: Dict[str, Any]) -> float:
+        seconds = (task.get("budget") or {}).get("seconds", self.seconds)
+        return seconds + self.lease_margin if seconds else self.max_lease
+
+    @staticmethod
+    def _user(task: Dict[str, Any]) -> Optional[int]:
+        user_id = task.get("user_id")
+        return int(user_id) if user_id is not None else None
+
+    async def acquire(self, task: Dict[str, Any]) -> bool:
+        user_id = self._user(task)
+        if user_id is None or not self.limit:
+            return True
+        try:
+            acquired = await self.repo.acquire(user_id, int(task["task_id"]), self.limit, self.lease(task))
+        except Exception as e:
+            log.error(f"Ошибка занятия слота пользователя {user_id}: {e}")
+            return True
+        if not acquired:
+            log.info(f"Задача {task['task_id']} отложена: у пользователя {user_id} уже {self.limit} задач в работе")
+        return acquired
+
+    async def release(self, task: Dict[str, Any], finished: bool) -> None:
+        user_id = self._user(task)
+        if user_id is None:
+            return
+        try:
+            await self.repo.release(user_id, int(task["task_id"]), finished)
+        except Exception as e:
+            log.error(f"Ошибка освобождения слота пользователя {user_id}: {e}")
+
+
+def create_task_slots_repo(backend: str = CONFIG.schedule.backend) -> AbstractTaskSlots:
+    if backend == "redis":
+        return RedisTaskSlots()
+    if backend == "memory":
+        return InMemoryTaskSlots()
+    raise ValueError(f"Неизвестный бэкенд слотов задач {backend}")
+
+
+user_quota = UserQuotaManager(create_task_slots_repo())
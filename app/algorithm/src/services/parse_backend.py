@@ -0,0 +1,83 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Union
+
+from models.parse_models import ModuleInfo
+from services.manage.parse_cache_manager import ParseCacheManager, parse_cache
+from services.parse_worker import parse_source
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("ParseBackend")
+
+
+class ParseBackend:
+    """
+    Разбор python файлов.
+    process - ast.parse и обход дерева в пуле процессов, event loop не блокируется;
+    inline - разбор прямо в event loop (запасной режим).
+    """
+
+    MODES = ("process", "inline")
+
+    def __init__(self, cache: ParseCacheManager, mode: str = CONFIG.parser.backend,
+                 workers: int = CONFIG.parser.workers):
+        if mode not in self.MODES:
+            raise ValueError(f"Неизвестный режим разбора {mode}, допустимы: {self.MODES}")
+        self.cache = cache
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def capacity(self) -> int:
+        """Сколько файлов имеет смысл держать в разборе одновременно"""
+        return self.workers * 2 if self.mode == "process" else 1
+
+    def start(self) -> None:
+        if self.mode != "process" or self._executor is not None:
+            return
+        # spawn: воркеры не наследуют gRPC/AMQP соединения и потоки родителя
+        self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                             mp_context=multiprocessing.get_context("spawn"))
+        log.info(f"Пул разбора запущен, процессов: {self.workers}")
+
+    def shutdown(self) -> None:
+        if self._executor is None:
+            return
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._executor = None
+        log.info("Пул разбора остановлен")
+
+    async def parse(self, code: Union[str, bytes], file_path: str) -> ModuleInfo:
+        """Разбор с учётом кеша: неизменённые файлы повторно не разбираются"""
+        key = self.cache.key(code)
+        module = await self.cache.get(key, file_path)
+        if module is None:
+            module = await self._parse(code, file_path)
+            await self.cache.set(key, module)
+        return module
+
+    async def _parse(self, code: Union[str, bytes], file_path: str) -> ModuleInfo:
+        if self.mode == "inline":
+            return parse_source(code, file_path)
+
+        if self._executor is None:
+            self.start()
+        executor = self._executor
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(executor, parse_source, code, file_path)
+        except BrokenProcessPool:
+            # пул перезапускает только первая задача, заметившая падение
+            if self._executor is executor:
+                log.error(f"Пул разбора упал на файле {file_path}, перезапуск")
+                self.shutdown()
+                self.start()
+            raise
+
+
+parse_backend = ParseBackend(parse_cache)
@@ -1,56 +1,147 @@
-from grpc_.algorithm_client import AlgorithmClient
+from typing import AsyncIterator, List, Optional, Tuple, Union
+
+import grpc
+
+from grpc_.algorithm_client import algorithm_client
 import grpc_control.generated.shared.common_pb2 as common_pb2
 
-from services.parser import Parser
+from services.analyzer import ProjectAnalyzer
+from services.graph_encoder import NodeTableEncoder
+from services.ignore_rules import IgnoreRules
+from services.manage.snapshot_manager import snapshot_manager
+from services.manage.task_control_manager import task_control
+from services.pipeline import batched
+from services.task_budget import TaskBudget, TaskStopped
 from utils.config import CONFIG
 from utils.logger import create_logger
 
 log = create_logger("ParseService")
 
 class ParseService:
+    # edge - сообщение на ребро, batch - пачки рёбер, node_table - пачки через таблицу узлов
+    ARCHITECTURE_ENCODINGS = ("edge", "batch", "node_table")
+
     def __init__(self):
-        self.client = AlgorithmClient(core_host=CONFIG.grpc.host, core_port=CONFIG.grpc.port)
+        if CONFIG.grpc.architecture_encoding not in self.ARCHITECTURE_ENCODINGS:
+            raise ValueError(f"Неизвестный формат архитектуры {CONFIG.grpc.architecture_encoding}, "
+                             f"допустимы: {self.ARCHITECTURE_ENCODINGS}")
+        self.client = algorithm_client
 
-    async def parse_project(self, task_id: int, project_path_s3: str):
-        """Парсинг проекта через один стрим сообщений"""
+    async def parse_project(self, task_id: int, project_path_s3: str,
+                            project_key: Optional[Union[int, str]] = None, budget: Optional[TaskBudget] = None,
+                            ignore: Optional[IgnoreRules] = None):
+        """
+        Парсинг проекта через один стрим сообщений.
+        project_key - проект, повторной загрузкой которого является эта: с его прошлым анализом
+        сравнивается новый; без него снимок не читается и не сохраняется.
+        Задачу можно отменить управляющим сообщением брокера (task_control) или из прокси (стрим
+        завершается со статусом CANCELLED); исчерпанный бюджет останавливает её с частичным результатом.
+        ignore - правила исключения файлов, по умолчанию из конфига.
+        """
+        snapshots = snapshot_manager.enabled and project_key is not None
+        budget = budget if budget is not None else TaskBudget()
+        analysis: Optional[ProjectAnalyzer] = None
 
         async def msg_generator():
-            response_id = 1
+            nonlocal analysis
+            # ===== единый проход по файлам проекта =====
+            previous = await snapshot_manager.get(str(project_key)) if snapshots else None
+            analysis = await ProjectAnalyzer(project_path_s3, previous, incremental=snapshots,
+                                             budget=budget, ignore=ignore).run()
+            log.info(f"Проект разобран, файлов: {len(analysis.files)}")
 
-            # ===== зависимости =====
-            dependencies = await Parser.get_dependencies_s3(project_path_s3)
-            log.info(f"Извлечены зависимости")
-            for key, value in dependencies.items():
-                yield common_pb2.GraphPartResponse(
-                    task_id=task_id,
-                    response_id=response_id,
-                    status=common_pb2.ParseStatus.REQUIREMENTS,
-                    graph_requirements=common_pb2.GraphPartRequirements(
-                        total=len(value), requirements=value
-                    )
-                )
-                log.info(f"Подготовлено сообщение {task_id} {response_id}")
-                response_id += 1
+            async for msg in self.messages(task_id, analysis):
+                yield msg
+
+        log.info(f"Начало парсинга задачи {task_id}")
+        with task_control.track(task_id, budget):
+            try:
+                await self.client.stream(task_id, msg_generator())
+            except grpc.aio.AioRpcError as e:
+                if e.code() != grpc.StatusCode.CANCELLED:
+                    raise
+                # отмена из прокси: задача не нужна и повторять её не надо
+                log.warning(f"Задача {task_id} отменена прокси: {e.details()}")
+                return
+        log.info(f"Конец парсинга задачи {task_id}")
+
+        # снимок сохраняется только после доставки полного стрима: следующая загрузка сравнивается с отправленным графом
+        if snapshots and analysis.stopped is None:
+            await snapshot_manager.set(str(project_key), analysis.snapshot(task_id))
+
+    async def messages(self, task_id: int, analysis: ProjectAnalyzer,
+                       encoding: str = CONFIG.grpc.architecture_encoding) -> AsyncIterator[common_pb2.GraphPartResponse]:
+        """
+        Сообщения стрима задачи по результату анализа проекта, последним идёт DONE с итогом задачи.
+        Бюджет проверяется перед каждым сообщением: остановленная задача сразу переходит к DONE.
+        """
+        stopped = analysis.stopped
+        response_id = 1
+        if stopped is None or stopped.partial:
+            parts = self._parts(task_id, analysis, encoding)
+            try:
+                async for msg in parts:
+                    # частичный результат остановленного анализа отправляется целиком, если задачу не отменят
+                    analysis.budget.check(cancel_only=stopped is not None)
+                    yield msg
+                    response_id = msg.response_id + 1
+            except TaskStopped as e:
+                stopped = analysis.stopped = e
+                log.warning(f"Отправка задачи {task_id} остановлена: {e.detail}")
+            finally:
+                await parts.aclose()
 
-            # ===== эндпоинты =====
-            endpoints_raw = await Parser.extract_endpoints(project_path_s3)
-            log.info(f"Извлечены эндпоинты")
-            log.info(f"Эндпоинты сырые: {endpoints_raw}")
-            endpoints = {item["function"]: item["method"] + " " + item["path"] for item in endpoints_raw}
-            log.info(f"Эндпоинты: {endpoints}")
+        # ===== DONE =====
+        yield common_pb2.GraphPartResponse(
+            task_id=task_id,
+            response_id=response_id,
+            status=common_pb2.ParseStatus.DONE,
+            graph_architecture=common_pb2.GraphPartArchitecture(parent="", children=""),
+            summary=self._summary(analysis)
+        )
+        log.info(f"Подготовлено сообщение {task_id} {response_id} — DONE"
+                 f"{'' if stopped is None else f', остановлено: {stopped.detail}'}")
+
+    async def _parts(self, task_id: int, analysis: ProjectAnalyzer,
+                     encoding: str) -> AsyncIterator[common_pb2.GraphPartResponse]:
+        """Сообщения с результатом анализа: зависимости, эндпоинты, архитектура и изменения графа"""
+        response_id = 1
+
+        # ===== зависимости =====
+        dependencies = analysis.dependencies
+        log.info(f"Извлечены зависимости")
+        for key, value in dependencies.items():
             yield common_pb2.GraphPartResponse(
                 task_id=task_id,
                 response_id=response_id,
-                status=common_pb2.ParseStatus.ENDPOINTS,
-                graph_endpoints=common_pb2.GraphPartEndpoints(
-                    total=len(endpoints), endpoints=endpoints
+                status=common_pb2.ParseStatus.REQUIREMENTS,
+                graph_requirements=common_pb2.GraphPartRequirements(
+                    total=len(value), requirements=value
                 )
             )
             log.info(f"Подготовлено сообщение {task_id} {response_id}")
             response_id += 1
 
-            # ===== архитектура =====
-            async for parent, children in Parser.build_call_graph_s3(project_path_s3):
+        # ===== эндпоинты =====
+        endpoints_raw = analysis.endpoints()
+        log.info(f"Извлечены эндпоинты")
+        log.info(f"Эндпоинты сырые: {endpoints_raw}")
+        endpoints = {item["function"]: item["method"] + " " + item["path"] for item in endpoints_raw}
+        log.info(f"Эндпоинты: {endpoints}")
+        yield common_pb2.GraphPartResponse(
+            task_id=task_id,
+            response_id=response_id,
+            status=common_pb2.ParseStatus.ENDPOINTS,
+            graph_endpoints=common_pb2.GraphPartEndpoints(
+                total=len(endpoints), endpoints=endpoints
+            )
+        )
+        log.info(f"Подготовлено сообщение {task_id} {response_id}")
+        response_id += 1
+
+        # ===== архитектура =====
+        if encoding == "edge":
+            for parent, children in analysis.call_graph():
                 yield common_pb2.GraphPartResponse(
                     task_id=task_id,
                     response_id=response_id,
@@ -61,25 +152,81 @@ class ParseService:
                 )
                 log.info(f"Подготовлено сообщение {task_id} {response_id}")
                 response_id += 1
+        else:
+            encoder = NodeTableEncoder() if encoding == "node_table" else None
+            async for batch in batched(self._edges(analysis),
+                                       max_items=CONFIG.grpc.architecture_batch_size,
+                                       max_bytes=CONFIG.grpc.architecture_batch_bytes,
+                                       window=CONFIG.grpc.architecture_batch_window,
+                                       size_of=self._edge_size):
+                if encoder is not None:
+                    part = {"graph_architecture_encoded": encoder.encode(batch)}
+                else:
+                    part = {"graph_architecture_batch": common_pb2.GraphPartArchitectureBatch(
+                        edges=[common_pb2.GraphPartArchitecture(parent=parent, children=children)
+                               for parent, children in batch]
+                    )}
+                yield common_pb2.GraphPartResponse(
+                    task_id=task_id,
+                    response_id=response_id,
+                    status=common_pb2.ParseStatus.ARHITECTURE,
+                    **part
+                )
+                log.info(f"Подготовлено сообщение {task_id} {response_id}, рёбер: {len(batch)}")
+                response_id += 1
 
-            # ===== DONE =====
+        # ===== изменения относительно прошлой загрузки проекта =====
+        delta = analysis.graph_delta()
+        if delta is not None:
             yield common_pb2.GraphPartResponse(
                 task_id=task_id,
                 response_id=response_id,
-                status=common_pb2.ParseStatus.DONE,
-                graph_architecture=common_pb2.GraphPartArchitecture(parent="", children="")
+                status=common_pb2.ParseStatus.DELTA,
+                graph_delta=common_pb2.GraphPartDelta(
+                    base_task_id=delta.base_task_id,
+                    added_nodes=delta.added_nodes,
+                    removed_nodes=delta.removed_nodes,
+                    added_edges=[common_pb2.GraphPartArchitecture(parent=parent, children=children)
+                                 for parent, children in delta.added_edges],
+                    removed_edges=[common_pb2.GraphPartArchitecture(parent=parent, children=children)
+                                   for parent, children in delta.removed_edges],
+                    changed_files=delta.changed_files,
+                    reanalyzed_files=delta.reanalyzed_files
+                )
             )
-            log.info(f"Подготовлено сообщение {task_id} {response_id} — DONE")
+            log.info(f"Подготовлено сообщение {task_id} {response_id}, изменено файлов: {delta.changed_files}")
 
-        log.info(f"Начало парсинга задачи {task_id}")
-        await self.client.stream(task_id, msg_generator())
-        log.info(f"Конец парсинга задачи {task_id}")
+    @staticmethod
+    def _summary(analysis: ProjectAnalyzer) -> common_pb2.GraphPartSummary:
+        stopped, budget = analysis.stopped, analysis.budget
+        return common_pb2.GraphPartSummary(
+            complete=stopped is None,
+            reason=common_pb2.StopReason.Value(stopped.reason) if stopped else common_pb2.StopReason.COMPLETED,
+            detail=stopped.detail if stopped else "",
+            files=budget.files,
+            bytes=budget.bytes_read,
+            functions=budget.functions,
+            elapsed=budget.elapsed,
+            skipped_files=analysis.ignore.skipped_files,
+            skipped_bytes=analysis.ignore.skipped_bytes
+        )
+
+    @staticmethod
+    async def _edges(analysis: ProjectAnalyzer) -> AsyncIterator[Tuple[str, List[str]]]:
+        for parent, children in analysis.call_graph():
+            yield parent, children
 
+    @staticmethod
+    def _edge_size(edge: Tuple[str, List[str]]) -> int:
+        """Примерный размер ребра в сообщении: строки и по паре байт заголовка на каждую"""
+        parent, children = edge
+        return len(parent) + sum(len(child) for child in children) + 2 * (len(children) + 1)
 
 
-async def run_parse_microservice(task_id, project_path_s3):
+async def run_parse_microservice(task_id, project_path_s3, project_key=None, budget=None, ignore=None):
     service = ParseService()
-    await service.parse_project(task_id, project_path_s3)
+    await service.parse_project(task_id, project_path_s3, project_key, TaskBudget.from_task(budget),
+                                IgnoreRules.from_config(ignore))
 
 # async def run():
 #     ps = ParseService()
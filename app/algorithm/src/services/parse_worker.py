@@ -0,0 +1,12 @@
+from typing import Union
+
+from models.parse_models import ModuleInfo
+from services.ast_extractor import SourceExtractor
+
+
+def parse_source(code: Union[str, bytes], file_path: str) -> ModuleInfo:
+    """
+    Выполняется в процессе пула: наружу уходят только функции и импорты модуля, не AST.
+    Модуль импортируется в каждом процессе пула, поэтому зависит только от разбора AST, без сервисов.
+    """
+    return SourceExtractor(file_path).extract(code)
@@ -1,321 +1,110 @@
-import ast
 import os
 import re
-from typing import Dict, List, Any, Optional, Union, AsyncIterator, Tuple
+from typing import Dict, List, Any, Optional, Union, AsyncIterator, Tuple, Iterable, Iterator
 
+from models.parse_models import FunctionInfo, ModuleInfo
+from services.ast_extractor import SourceExtractor
+from services.ignore_rules import IgnoreRules
 from services.manage.object_manager import object_manager
+from services.parse_backend import parse_backend
+from services.pipeline import read_ahead, fetch_files
+from services.symbol_table import SymbolTable
+from utils.logger import create_logger
+
+log = create_logger("Parser")
 
 
 class Parser:
     """Улучшенный парсер"""
 
-    HTTP_METHODS = {"get", "post", "put", "patch", "delete"}
-
-    @staticmethod
-    def parse_imports(node: ast.AST) -> List[Dict[str, Any]]:
-        """Собрать импорты"""
-        imports = []
-        for child in node.body:
-            if isinstance(child, ast.Import):
-                for alias in child.names:
-                    imports.append({
-                        "type": "import",
-                        "module": alias.name,
-                        "alias": alias.asname,
-                    })
-            elif isinstance(child, ast.ImportFrom):
-                for alias in child.names:
-                    imports.append({
-                        "type": "from",
-                        "module": child.module,
-                        "name": alias.name,
-                        "alias": alias.asname,
-                        "level": child.level,
-                    })
-        return imports
-
-    @staticmethod
-    def get_call_name(node: ast.AST) -> Optional[str]:
-        """Быстрое восстановление полного имени вызова"""
-        parts = []
-        while True:
-            if isinstance(node, ast.Name):
-                parts.append(node.id)
-                break
-            elif isinstance(node, ast.Attribute):
-                parts.append(node.attr)
-                node = node.value
-            elif isinstance(node, ast.Call):
-                node = node.func
-            else:
-                break
-        return ".".join(reversed(parts)) if parts else None
-
-    @staticmethod
-    def parse_router_defs(tree: ast.Module) -> Dict[str, str]:
-        """Собрать роуты"""
-        routers = {}
-
-        for node in tree.body:
-            # Ищем присваивания: router = APIRouter(...)
-            if isinstance(node, ast.Assign) and isinstance(node.value, ast.Call):
-                call_name = Parser.get_call_name(node.value.func)
-
-                # Сохраняем имя переменной
-                if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
-                    continue
-
-                var_name = node.targets[0].id
-
-                # APIRouter
-                if call_name.endswith("APIRouter"):
-                    prefix = ""
-                    for kw in node.value.keywords:
-                        if kw.arg == "prefix":
-                            prefix = ast.literal_eval(kw.value)  # гарантированно str
-                    routers[var_name] = prefix
-
-                # FastAPI
-                if call_name.endswith("FastAPI"):
-                    prefix = ""
-                    for kw in node.value.keywords:
-                        if kw.arg in ("root_path", "prefix"):
-                            prefix = ast.literal_eval(kw.value)
-                    routers[var_name] = prefix
-
-        return routers
-
     @staticmethod
-    def parse_function(node: Union[ast.FunctionDef, ast.AsyncFunctionDef],
-                       file_path: str,
-                       class_name: Optional[str] = None) -> Dict[str, Any]:
-        """Парсит функцию и собирает вызовы и декораторы"""
-        calls = [Parser.get_call_name(n.func)
-                 for n in ast.walk(node)
-                 if isinstance(n, ast.Call) and Parser.get_call_name(n.func)]
-
-        args = [arg.arg for arg in node.args.args]
-        arg_types = {arg.arg: arg.annotation.id
-                     for arg in node.args.args if isinstance(arg.annotation, ast.Name)}
-
-        decorators = []
-        for dec in node.decorator_list:
-            name = Parser.get_call_name(
-                dec.func if isinstance(dec, ast.Call) else dec
-            )
-
-            dec_args = []
-            path = ""
-
-            if isinstance(dec, ast.Call):
-
-                # --- позиционные аргументы ---
-                for arg in dec.args:
-                    # path должен быть строкой
-                    if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
-                        path = arg.value
-                    else:
-                        dec_args.append(ast.unparse(arg))
-
-                # --- именованные аргументы ---
-                for kw in dec.keywords:
-                    if kw.arg == "response_model":
-                        dec_args.append(f"response_model={ast.unparse(kw.value)}")
-                    else:
-                        dec_args.append(ast.unparse(kw.value))
-
-            decorators.append({
-                "name": name,
-                "args": dec_args,
-                "path": path
-            })
-
-            # СФОРМИРОВАТЬ И ВЕРНУТЬ ИНФО О ФУНКЦИИ
-            func_info = {
-                "name": node.name,
-                "file": file_path,
-                "class": class_name,
-                "args": args,
-                "arg_types": arg_types,
-                "decorators": decorators,
-                "calls": calls,
-                "is_endpoint": False,
-                "endpoint_info": None,
-                "_type": "async" if isinstance(node, ast.AsyncFunctionDef) else "sync",
-                "returns": ast.unparse(node.returns) if node.returns else None,
-            }
-
-            func_info = Parser._detect_endpoint(func_info)
-
-            return func_info
+    async def parse_python_file_s3(file_path: str) -> Dict[str, FunctionInfo]:
+        code = await object_manager.repo.read(file_path)
+        return (await parse_backend.parse(code, file_path)).functions
 
     @staticmethod
-    def _detect_endpoint(func_info: Dict[str, Any]) -> Dict[str, Any]:
-        for dec in func_info["decorators"]:
-            if not dec["name"]:
-                continue
-
-            parts = dec["name"].split(".")
-            if len(parts) == 2:
-                obj, method = parts
-                if method.lower() in Parser.HTTP_METHODS:
-                    func_info["is_endpoint"] = True
-
-                    func_info["endpoint_info"] = {
-                        "decorator": {
-                            "object": obj,
-                            "method": method.lower(),
-                            "args": dec["args"]
-                        },
-                        "path": dec.get("path", "") or "",
-                        "full_path": dec.get("path", "") or "",
-                    }
-                    break
-        return func_info
+    def parse_python_source(code: Union[str, bytes], file_path: str) -> ModuleInfo:
+        """Парсит уже прочитанный исходник python файла за один обход дерева"""
+        return SourceExtractor(file_path).extract(code)
 
     @staticmethod
-    def _enhance_endpoint_info(func_info: Dict[str, Any], routers: Dict[str, str]) -> Dict[str, Any]:
-        """Дополняет информацию об эндпоинте префиксом роутера"""
-        if func_info.get("is_endpoint") and func_info["endpoint_info"]:
-            endpoint_info = func_info["endpoint_info"]
-            router_obj = endpoint_info["decorator"]["object"]
-            prefix = routers.get(router_obj, "")
-            path = endpoint_info.get("path", "")
-
-            # Обновляем полный путь
-            endpoint_info["full_path"] = f"{prefix}{path}"
-
-            # Извлекаем response_model если есть
-            response_model = None
-            for arg in endpoint_info["decorator"].get("args", []):
-                if "response_model" in arg:
-                    match = re.search(r"response_model\s*=\s*([A-Za-z_][A-Za-z0-9_\.]*)", arg)
-                    if match:
-                        response_model = match.group(1)
-
-            if not response_model:
-                response_model = func_info.get("returns")
-
-            endpoint_info["response_model"] = response_model
+    async def collect_project_modules_s3(prefix: str) -> AsyncIterator[Tuple[str, ModuleInfo]]:
+        """Асинхронный генератор разобранных модулей проекта по мере чтения файлов из S3"""
+        ignore = IgnoreRules.from_config()
 
-        return func_info
+        # листинг следующих страниц идёт параллельно с чтением и разбором файлов
+        async def py_files():
+            async for file_key, _ in ignore.filter_listing(read_ahead(object_manager.repo.iter_objects(prefix)),
+                                                           prefix, lambda key: key.endswith(".py"),
+                                                           object_manager.repo.read):
+                yield file_key
 
-    @staticmethod
-    async def parse_python_file_s3(file_path: str) -> Dict[str, Dict[str, Any]]:
-        code = await object_manager.repo.read(file_path)
-        tree = ast.parse(code, filename=file_path)
-
-        # --- собираем роутеры/APIRouter/приложения ---
-        routers = Parser.parse_router_defs(tree)
-
-        funcs = {}
-        for node in tree.body:
-            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                func = Parser.parse_function(node, file_path)
-                if func is None:
-                    continue
-                func = Parser._enhance_endpoint_info(func, routers)
-                funcs[func["name"]] = func
-
-            elif isinstance(node, ast.ClassDef):
-                for sub in node.body:
-                    if isinstance(sub, (ast.FunctionDef, ast.AsyncFunctionDef)):
-                        func = Parser.parse_function(sub, file_path, class_name=node.name)
-                        if func is None:
-                            continue
-                        func = Parser._enhance_endpoint_info(func, routers)
-                        funcs[f"{node.name}.{func['name']}"] = func
-
-        return funcs
+        async for file_key, code in fetch_files(py_files(), object_manager.repo.read, ordered=True):
+            try:
+                yield file_key, await parse_backend.parse(code, file_key)
+            except Exception as e:
+                log.error(f"Ошибка при парсинге S3 файла {file_key}: {e}")
 
     @staticmethod
-    async def collect_project_functions_s3(prefix: str) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    async def collect_project_functions_s3(prefix: str) -> AsyncIterator[Tuple[str, FunctionInfo]]:
         """Асинхронный генератор функций проекта по мере чтения файлов из S3"""
-        keys = await object_manager.repo.get_filenames(prefix)
-        py_files = [k for k in keys if k.endswith(".py")]
-
-        for file_key in py_files:
-            try:
-                funcs = await Parser.parse_python_file_s3(file_key)
-                for func_name, func_data in funcs.items():
-                    yield func_name, func_data
-            except Exception as e:
-                print(f"Ошибка при парсинге S3 файла {file_key}: {e}")
+        async for _, module in Parser.collect_project_modules_s3(prefix):
+            for func_name, func_data in module.functions.items():
+                yield func_name, func_data
 
     @staticmethod
-    def build_functions_index(funcs: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
-        """Быстрый индекс функций для поиска вызовов"""
-        index = {}
-        for f_name, f_info in funcs.items():
-            index[f_name] = f_info
-            cls_name = f_info.get("class")
-            if cls_name:
-                index[f"{cls_name}.{f_info['name']}"] = f_info
-        return index
+    def resolve_calls(func_data: FunctionInfo, symbols: SymbolTable) -> List[str]:
+        """Разрешает вызовы функции в полные имена целевых функций"""
+        return symbols.resolve_calls(func_data)
 
     @staticmethod
-    def map_call_to_function(call: str, func_info: Dict[str, Any], all_funcs_index: Dict[str, Dict[str, Any]]):
-        """Быстрый поиск функции через индекс"""
-        if call in all_funcs_index:
-            return all_funcs_index[call]
-        obj, _, method = call.partition(".")
-        obj_type = func_info.get("arg_types", {}).get(obj)
-        if obj_type:
-            return all_funcs_index.get(f"{obj_type}.{method}")
-        return None
+    def call_graph_from_modules(modules: Iterable[Tuple[str, ModuleInfo]], root: str = "",
+                                symbols: Optional[SymbolTable] = None) -> Iterator[Tuple[str, List[str]]]:
+        """Граф вызовов по уже разобранным модулям; готовую таблицу символов можно передать в symbols"""
+        builder = CallGraphBuilder(root)
+        for file_key, module in modules:
+            builder.add(file_key, module)
+        return builder.edges(symbols)
 
     @staticmethod
     async def build_call_graph_s3(prefix: str) -> AsyncIterator[Tuple[str, List[str]]]:
-        """Асинхронный генератор графа вызовов по мере парсинга"""
-        all_funcs: Dict[str, Dict[str, Any]] = {}
-        async for func_name, func_data in Parser.collect_project_functions_s3(prefix):
-            all_funcs[func_name] = func_data
-            all_funcs_index = Parser.build_functions_index(all_funcs)
-
-            children: List[str] = []
-            for call in func_data["calls"]:
-                target_func = Parser.map_call_to_function(call, func_data, all_funcs_index)
-                resolved_name = (
-                    f"{target_func['file']}/{target_func['class']}.{target_func['name']}"
-                    if target_func and "class" in target_func and "file" in target_func
-                    else f"{func_data['file']}/{call}"
-                )
-                children.append(resolved_name)
-
-            yield func_name, children
+        """Асинхронный генератор графа вызовов: рёбра отдаются после индексации всего проекта"""
+        builder = CallGraphBuilder(prefix)
+        async for file_key, module in Parser.collect_project_modules_s3(prefix):
+            builder.add(file_key, module)
+        for parent, children in builder.edges():
+            yield parent, children
 
     @staticmethod
-    async def extract_endpoints(prefix: str) -> List[Dict[str, Any]]:
-        """Собирает все эндпоинты проекта за один проход"""
+    def endpoints_from_functions(funcs: Iterable[Tuple[str, FunctionInfo]]) -> List[Dict[str, Any]]:
+        """Собирает эндпоинты из уже разобранных функций"""
         endpoints = []
-        keys = await object_manager.repo.get_filenames(prefix)
-        py_files = [k for k in keys if k.endswith(".py")]
-
-        for file_key in py_files:
-            try:
-                funcs = await Parser.parse_python_file_s3(file_key)
-                for func_name, func_data in funcs.items():
-                    if func_data.get("is_endpoint"):
-                        endpoint_info = func_data["endpoint_info"]
-                        endpoints.append({
-                            "function": func_name,
-                            "file": func_data["file"],
-                            "method": endpoint_info["decorator"]["method"].upper(),
-                            "path": endpoint_info["full_path"],
-                            "args": func_data["args"],
-                            "response_model": endpoint_info.get("response_model"),
-                            "calls": func_data["calls"],
-                            "decorators": func_data.get("decorators", [])
-                        })
-            except Exception as e:
-                print(f"Ошибка при парсинге {file_key}: {e}")
+        for func_name, func_data in funcs:
+            endpoint = func_data.endpoint
+            if endpoint is not None:
+                endpoints.append({
+                    "function": func_name,
+                    "file": func_data.file,
+                    "method": endpoint.method.upper(),
+                    "path": endpoint.full_path,
+                    "args": list(func_data.args),
+                    "response_model": endpoint.response_model,
+                    "calls": list(func_data.calls),
+                    "decorators": [dec.to_dict() for dec in func_data.decorators]
+                })
         return endpoints
 
     @staticmethod
-    async def parse_requirements_s3(file_key: str) -> List[str]:
-        """Возвращает список имён пакетов из requirements.txt, файл из S3"""
+    async def extract_endpoints(prefix: str) -> List[Dict[str, Any]]:
+        """Собирает все эндпоинты проекта за один проход"""
+        funcs = [item async for item in Parser.collect_project_functions_s3(prefix)]
+        return Parser.endpoints_from_functions(funcs)
+
+    @staticmethod
+    def parse_requirements(lines: Iterable[str]) -> List[str]:
+        """Возвращает список имён пакетов из строк requirements.txt"""
         deps = []
-        async for line in object_manager.repo.stream_read(file_key, decode="utf-8"):
+        for line in lines:
             line = line.strip()
             if not line or line.startswith("#"):
                 continue
@@ -325,19 +114,17 @@ class Parser:
         return deps
 
     @staticmethod
-    async def parse_pyproject_s3(file_key: str) -> List[str]:
-        """Возвращает список имён пакетов из pyproject.toml, файл из S3"""
-        import io
+    async def parse_requirements_s3(file_key: str) -> List[str]:
+        """Возвращает список имён пакетов из requirements.txt, файл из S3"""
+        lines = [line async for line in object_manager.repo.stream_read(file_key, decode="utf-8")]
+        return Parser.parse_requirements(lines)
+
+    @staticmethod
+    def parse_pyproject(content: bytes) -> List[str]:
+        """Возвращает список имён пакетов из содержимого pyproject.toml"""
         import tomllib
 
-        # собираем все чанки в BytesIO, так как tomllib читает бинарные данные
-        chunks = []
-        async for chunk in object_manager.repo.stream_read(file_key):
-            if isinstance(chunk, str):
-                chunk = chunk.encode("utf-8")
-            chunks.append(chunk)
-        f = io.BytesIO(b"".join(chunks))
-        data = tomllib.load(f)
+        data = tomllib.loads(content.decode("utf-8"))
 
         deps = []
 
@@ -356,11 +143,21 @@ class Parser:
 
         return sorted(set(deps))
 
+    @staticmethod
+    async def parse_pyproject_s3(file_key: str) -> List[str]:
+        """Возвращает список имён пакетов из pyproject.toml, файл из S3"""
+        # собираем все чанки, так как tomllib читает документ целиком
+        chunks = []
+        async for chunk in object_manager.repo.stream_read(file_key):
+            if isinstance(chunk, str):
+                chunk = chunk.encode("utf-8")
+            chunks.append(chunk)
+        return Parser.parse_pyproject(b"".join(chunks))
+
     @staticmethod
     async def find_dependencies_files_s3(prefix: str) -> List[str]:
         """Ищет все файлы зависимостей в S3 по префиксу"""
         all_keys = await object_manager.repo.get_filenames(prefix)
-        # print(all_keys)
         return [k for k in all_keys if k.endswith(("requirements.txt", "pyproject.toml"))]
 
     @staticmethod
@@ -378,10 +175,32 @@ class Parser:
                     deps = await Parser.parse_pyproject_s3(file_key)
                     result[os.path.basename(file_key)] = deps
             except Exception as e:
-                print(f"Ошибка при чтении зависимостей из {file_key}: {e}")
+                log.warning(f"Ошибка при чтении зависимостей из {file_key}: {e}")
 
         return result
 
+
+class CallGraphBuilder:
+    """
+    Граф вызовов за линейное время.
+    Модули копятся за O(1) на файл, а разрешение рёбер откладывается до появления всех модулей:
+    таблица символов строится по всему проекту, поэтому результат не зависит от порядка файлов.
+    """
+
+    def __init__(self, root: str = ""):
+        self.root = root
+        self.modules: Dict[str, ModuleInfo] = {}
+
+    def add(self, file_key: str, module: ModuleInfo) -> None:
+        self.modules[file_key] = module
+
+    def edges(self, symbols: Optional[SymbolTable] = None) -> Iterator[Tuple[str, List[str]]]:
+        """Разрешает отложенные рёбра по таблице символов, родители в порядке добавления"""
+        symbols = symbols or SymbolTable(self.modules, self.root)
+        for module in self.modules.values():
+            for func_name, func_data in module.functions.items():
+                yield func_name, symbols.resolve_calls(func_data)
+
 # async def main():
 #     from utils.logger import create_logger
 #     log = create_logger("EnhancedFunctionParser")
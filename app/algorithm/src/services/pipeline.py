@@ -0,0 +1,146 @@
+import asyncio
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("ParsePipeline")
+
+T = TypeVar("T")
+
+_END = object()
+
+# Общий на процесс лимит одновременных чтений: одна большая задача не забирает всё хранилище
+GLOBAL_FETCH_LIMIT = asyncio.Semaphore(CONFIG.parser.global_fetch_concurrency)
+
+
+async def read_ahead(source: AsyncIterator[T], buffer: int = 2000) -> AsyncIterator[T]:
+    """Читает source в фоне, пока потребитель обрабатывает уже полученные элементы"""
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+    errors = []
+
+    async def produce():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            errors.append(e)
+        await queue.put(_END)
+
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await queue.get()) is not _END:
+            yield item
+        if errors:
+            raise errors[0]
+    finally:
+        producer.cancel()
+
+
+async def fetch_files(keys: AsyncIterator[str],
+                      read: Callable[[str], Awaitable[bytes]],
+                      concurrency: int = CONFIG.parser.fetch_concurrency,
+                      ordered: bool = CONFIG.parser.fetch_ordered) -> AsyncIterator[Tuple[str, bytes]]:
+    """
+    Читает файлы, держа в полёте не больше concurrency запросов задачи
+    (и не больше GLOBAL_FETCH_LIMIT на процесс).
+    ordered=False отдаёт файлы по мере готовности, ordered=True - в порядке ключей.
+    Файлы, которые не удалось прочитать, логируются и пропускаются.
+    """
+
+    async def fetch(file_key: str) -> Tuple[str, Optional[bytes]]:
+        async with GLOBAL_FETCH_LIMIT:
+            try:
+                return file_key, await read(file_key)
+            except Exception as e:
+                log.error(f"Ошибка чтения файла {file_key}: {e}")
+                return file_key, None
+
+    pending = deque() if ordered else set()
+    try:
+        if ordered:
+            async for file_key in keys:
+                pending.append(asyncio.create_task(fetch(file_key)))
+                while len(pending) >= concurrency or (pending and pending[0].done()):
+                    file_key, content = await pending.popleft()
+                    if content is not None:
+                        yield file_key, content
+            while pending:
+                file_key, content = await pending.popleft()
+                if content is not None:
+                    yield file_key, content
+        else:
+            async for file_key in keys:
+                pending.add(asyncio.create_task(fetch(file_key)))
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                else:
+                    done = {task for task in pending if task.done()}
+                    pending -= done
+                for task in done:
+                    file_key, content = task.result()
+                    if content is not None:
+                        yield file_key, content
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    file_key, content = task.result()
+                    if content is not None:
+                        yield file_key, content
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def batched(source: AsyncIterator[T], max_items: int, max_bytes: int, window: float,
+                  size_of: Callable[[T], int] = lambda item: 1) -> AsyncIterator[List[T]]:
+    """
+    Группирует элементы source в пачки.
+    Пачка отдаётся, когда набрано max_items элементов или max_bytes по size_of,
+    либо когда с первого элемента пачки прошло window секунд, а source не отдаёт новых элементов.
+    """
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_items)
+    errors = []
+
+    async def produce():
+        try:
+            async for item in source:
+                await queue.put(item)
+        except Exception as e:
+            errors.append(e)
+        await queue.put(_END)
+
+    loop = asyncio.get_running_loop()
+    producer = asyncio.create_task(produce())
+    batch: List[T] = []
+    batch_bytes = 0
+    deadline = 0.0
+    try:
+        while True:
+            if queue.empty() and batch:
+                # source задерживается: ждём только до конца окна
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=max(deadline - loop.time(), 0))
+                except TimeoutError:
+                    yield batch
+                    batch, batch_bytes = [], 0
+                    continue
+            else:
+                item = await queue.get()
+            if item is _END:
+                break
+
+            if not batch:
+                deadline = loop.time() + window
+            batch.append(item)
+            batch_bytes += size_of(item)
+            if len(batch) >= max_items or batch_bytes >= max_bytes:
+                yield batch
+                batch, batch_bytes = [], 0
+        if batch:
+            yield batch
+        if errors:
+            raise errors[0]
+    finally:
+        producer.cancel()
@@ -0,0 +1,229 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+from models.parse_models import FunctionInfo, ModuleInfo
+
+
+@dataclass(slots=True)
+class Namespace:
+    """Имена модуля, под которыми видны функции проекта"""
+    # верхнее имя -> {остаток имени или "" для самой функции -> функция}:
+    # "helper" -> {"": helper}, "Service" -> {"get": Service.get, "save": Service.save}
+    names: Dict[str, Dict[str, FunctionInfo]] = field(default_factory=dict)
+    # имя -> (file_key модуля, имя в нём): from app.services import UserService [as Users]
+    imported: Dict[str, Tuple[str, str]] = field(default_factory=dict)
+    # имя -> file_key модуля: import app.db [as db], from app import db
+    modules: Dict[str, str] = field(default_factory=dict)
+    # file_key модулей из from module import *
+    star: List[str] = field(default_factory=list)
+
+
+class SymbolTable:
+    """
+    Таблица символов проекта, строится один раз на анализ.
+    Пространство имён модуля собирается из его функций и методов классов, import/from импортов
+    (с учётом относительного level) и путей модулей проекта. Разрешённый вызов запоминается
+    для окружения функции (модуль, класс, аннотации аргументов), поэтому каждый следующий такой же
+    вызов разрешается одним поиском в словаре.
+    С track=True таблица запоминает, от чего зависело разрешение вызовов каждого файла:
+    по этим зависимостям инкрементальный анализ находит файлы, рёбра которых надо разрешить заново.
+    """
+
+    MAX_DEPTH = 16
+
+    def __init__(self, modules: Dict[str, ModuleInfo], root: str = "", track: bool = False):
+        self.modules = modules
+        self.root = root
+        self.track = track
+        # file_key -> модули, пространства имён которых читались при разрешении вызовов файла
+        self.used_modules: Dict[str, Set[str]] = {}
+        # file_key -> имена, искавшиеся среди уникальных имён проекта
+        self.used_names: Dict[str, Set[str]] = {}
+        # file_key модуля -> точечные имена модулей, которые искали его импорты
+        self.module_refs: Dict[str, Set[str]] = {}
+        # точечное имя модуля -> file_key; по хвосту имени - только однозначные
+        self._paths: Dict[str, str] = {}
+        self._suffixes: Dict[str, Optional[str]] = {}
+        for file_key in modules:
+            self._add_path(file_key)
+
+        self._namespaces: Dict[str, Namespace] = {}
+        # запасной путь для неразрешённых импортов: имя, единственное во всём проекте
+        self._unique: Dict[str, Optional[FunctionInfo]] = {}
+        for module in modules.values():
+            for name, func in module.functions.items():
+                self._unique[name] = None if name in self._unique else func
+        # (file_key, класс, аннотации аргументов) -> вызов -> имя узла графа
+        self._nodes: Dict[Tuple[str, Optional[str], Optional[Tuple[Tuple[str, str], ...]]], Dict[str, str]] = {}
+
+    # --- модули ---
+
+    def module_name(self, file_key: str) -> str:
+        """app/services/user.py -> app.services.user, app/services/__init__.py -> app.services"""
+        path = file_key[len(self.root):] if file_key.startswith(self.root) else file_key
+        parts = path[:-3].split("/") if path.endswith(".py") else path.split("/")
+        if parts[-1] == "__init__":
+            parts.pop()
+        return ".".join(parts)
+
+    def module_names(self, file_key: str) -> List[str]:
+        """Имена, под которыми модуль находят импорты: полное точечное имя, затем его хвосты"""
+        name = self.module_name(file_key)
+        if not name:
+            return []
+        names = [name]
+        # проект может лежать в src/ или глубже: "app.services.user" ищется и как хвост "src.app.services.user"
+        dot = name.find(".")
+        while dot != -1:
+            names.append(name[dot + 1:])
+            dot = name.find(".", dot + 1)
+        return names
+
+    def _add_path(self, file_key: str) -> None:
+        names = self.module_names(file_key)
+        if not names:
+            return
+        self._paths[names[0]] = file_key
+        for suffix in names[1:]:
+            self._suffixes[suffix] = file_key if suffix not in self._suffixes else None
+
+    def _find_module(self, name: Optional[str]) -> Optional[str]:
+        if not name:
+            return None
+        file_key = self._paths.get(name)
+        if file_key is None:
+            file_key = self._suffixes.get(name)
+        return file_key
+
+    def _absolute(self, file_key: str, module: Optional[str], level: int) -> Optional[str]:
+        """Имя модуля из from-импорта; для относительного - от пакета file_key"""
+        if not level:
+            return module
+        package = self.module_name(file_key).split(".")
+        if not file_key.endswith("__init__.py"):
+            package.pop()
+        if level > 1:
+            if level - 1 > len(package):
+                return None
+            package = package[:len(package) - (level - 1)]
+        if module:
+            package.append(module)
+        return ".".join(package)
+
+    def namespace(self, file_key: str) -> Namespace:
+        """Пространство имён модуля; строится при первом обращении, импорты разрешаются при поиске"""
+        namespace = self._namespaces.get(file_key)
+        if namespace is not None:
+            return namespace
+
+        namespace = Namespace()
+        find = self._find_module
+        if self.track:
+            refs = self.module_refs.setdefault(file_key, set())
+
+            def find(name: Optional[str]) -> Optional[str]:
+                if name:
+                    refs.add(name)
+                return self._find_module(name)
+
+        for imp in self.modules[file_key].imports:
+            if imp.name is None:
+                # import app.services.user [as user]
+                target = find(imp.module)
+                if target is not None:
+                    namespace.modules[imp.alias or imp.module] = target
+                continue
+
+            base = self._absolute(file_key, imp.module, imp.level)
+            if imp.name == "*":
+                target = find(base)
+                if target is not None:
+                    namespace.star.append(target)
+                continue
+            alias = imp.alias or imp.name
+            submodule = find(f"{base}.{imp.name}" if base else imp.name)
+            if submodule is not None:
+                namespace.modules[alias] = submodule
+                continue
+            target = find(base)
+            if target is not None:
+                namespace.imported[alias] = (target, imp.name)
+        for name, func in self.modules[file_key].functions.items():
+            head, _, rest = name.partition(".")
+            namespace.names.setdefault(head, {})[rest] = func
+
+        self._namespaces[file_key] = namespace
+        return namespace
+
+    def lookup(self, file_key: str, name: str, depth: int = 0,
+               used: Optional[Set[str]] = None) -> Optional[FunctionInfo]:
+        """
+        Функция проекта под именем name ("helper", "Service.get", "users.Service.get") в модуле.
+        В used добавляются все модули, пространства имён которых пришлось прочитать.
+        """
+        # цепочка реэкспортов длиннее MAX_DEPTH - циклический импорт
+        if depth > self.MAX_DEPTH:
+            return None
+        if used is not None:
+            used.add(file_key)
+        namespace = self.namespace(file_key)
+        head, dot, rest = name.partition(".")
+        members = namespace.names.get(head)
+        if members is not None:
+            return members.get(rest)
+        imported = namespace.imported.get(head)
+        if imported is not None:
+            target, original = imported
+            return self.lookup(target, f"{original}.{rest}" if dot else original, depth + 1, used)
+        if dot and namespace.modules:
+            # db.get_user / app.services.user.get_user: самый длинный известный модуль в начале имени
+            end = len(name)
+            while (end := name.rfind(".", 0, end)) != -1:
+                target = namespace.modules.get(name[:end])
+                if target is not None:
+                    return self.lookup(target, name[end + 1:], depth + 1, used)
+        for target in namespace.star:
+            func = self.lookup(target, name, depth + 1, used)
+            if func is not None:
+                return func
+        return None
+
+    # --- вызовы ---
+
+    def resolve(self, func: FunctionInfo, call: str) -> Optional[FunctionInfo]:
+        """Функция проекта, которую вызывает call из func, или None"""
+        in_project = func.file in self.modules
+        used = self.used_modules.setdefault(func.file, set()) if self.track else None
+        target = self.lookup(func.file, call, used=used) if in_project else None
+        if target is not None:
+            return target
+
+        obj, dot, method = call.partition(".")
+        if dot:
+            # self.method() / cls.method() и service.method() по аннотации аргумента
+            owner = func.class_name if obj in ("self", "cls") else func.arg_type(obj)
+            if owner:
+                typed = f"{owner}.{method}"
+                target = self.lookup(func.file, typed, used=used) if in_project else None
+                return target or self._unique_function(func, typed)
+        return self._unique_function(func, call)
+
+    def _unique_function(self, func: FunctionInfo, name: str) -> Optional[FunctionInfo]:
+        if self.track:
+            self.used_names.setdefault(func.file, set()).add(name)
+        return self._unique.get(name)
+
+    def resolve_calls(self, func: FunctionInfo) -> List[str]:
+        """Вызовы функции в виде имён узлов графа"""
+        # от модуля, класса и аннотаций зависит разрешение: в таком же окружении вызов не разрешается заново
+        arg_types = tuple(func.arg_types.items()) if func.arg_types else None
+        nodes = self._nodes.setdefault((func.file, func.class_name, arg_types), {})
+        children: List[str] = []
+        for call in func.calls:
+            node = nodes.get(call)
+            if node is None:
+                target = self.resolve(func, call)
+                node = nodes[call] = (f"{target.file}/{target.class_name}.{target.name}" if target
+                                      else f"{func.file}/{call}")
+            children.append(node)
+        return children
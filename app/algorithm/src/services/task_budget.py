@@ -0,0 +1,99 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Dict, Optional, TypeVar
+
+from utils.config import CONFIG
+
+T = TypeVar("T")
+
+
+class TaskStopped(Exception):
+    """
+    Задача остановлена до конца анализа. reason - имя причины из common.StopReason
+    (CANCELLED, TIME_BUDGET, BYTES_BUDGET, FILES_BUDGET, FUNCTIONS_BUDGET).
+    """
+
+    def __init__(self, reason: str, detail: str):
+        super().__init__(detail)
+        self.reason = reason
+        self.detail = detail
+
+    @property
+    def partial(self) -> bool:
+        """Результат, собранный до остановки, стоит отправить: отменённая задача никому не нужна"""
+        return self.reason != "CANCELLED"
+
+
+class TaskBudget:
+    """
+    Бюджет задачи разбора: время, прочитанные байты, файлы и функции; 0 - без ограничения.
+    Расход учитывается на этапах анализа, а check() в точках проверки останавливает задачу исключением
+    TaskStopped, если бюджет исчерпан или задача отменена. Долгие ожидания (чтение файла, разбор) идут
+    через within(): время задачи истекает и посреди них.
+    """
+
+    LIMITS = ("seconds", "max_bytes", "max_files", "max_functions")
+
+    def __init__(self, seconds: float = CONFIG.budget.seconds, max_bytes: int = CONFIG.budget.max_bytes,
+                 max_files: int = CONFIG.budget.max_files, max_functions: int = CONFIG.budget.max_functions):
+        self.seconds = seconds
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.max_functions = max_functions
+        self.started = time.monotonic()
+        self.bytes_read = 0
+        self.files = 0
+        self.functions = 0
+        self.cancelled: Optional[str] = None
+
+    @classmethod
+    def from_task(cls, overrides: Optional[Dict[str, Any]]) -> "TaskBudget":
+        """Бюджет из конфига с переопределениями из сообщения задачи: {"seconds": 60, "max_files": 1000}"""
+        return cls(**{key: value for key, value in (overrides or {}).items() if key in cls.LIMITS})
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def remaining(self) -> Optional[float]:
+        """Секунд до конца времени задачи; None - время не ограничено"""
+        if not self.seconds:
+            return None
+        return max(0.0, self.seconds - self.elapsed)
+
+    async def within(self, awaitable: Awaitable[T]) -> T:
+        """Ожидание не дольше оставшегося времени задачи; по его истечении - TaskStopped(TIME_BUDGET)"""
+        try:
+            return await asyncio.wait_for(awaitable, self.remaining)
+        except asyncio.TimeoutError:
+            # таймаут самой операции (например, S3) при оставшемся времени пробрасывается как есть
+            self.check_time()
+            raise
+
+    def check_time(self) -> None:
+        if self.seconds and self.elapsed >= self.seconds:
+            raise TaskStopped("TIME_BUDGET", f"время задачи больше {self.seconds} с")
+
+    def spend(self, files: int = 0, size: int = 0, functions: int = 0) -> None:
+        self.files += files
+        self.bytes_read += size
+        self.functions += functions
+
+    def cancel(self, detail: str) -> None:
+        if self.cancelled is None:
+            self.cancelled = detail
+
+    def check(self, cancel_only: bool = False) -> None:
+        """cancel_only - только отмена: для отправки частичного результата уже остановленной задачи"""
+        if self.cancelled is not None:
+            raise TaskStopped("CANCELLED", self.cancelled)
+        if cancel_only:
+            return
+        self.check_time()
+        if self.max_bytes and self.bytes_read > self.max_bytes:
+            raise TaskStopped("BYTES_BUDGET", f"прочитано больше {self.max_bytes} байт")
+        if self.max_files and self.files > self.max_files:
+            raise TaskStopped("FILES_BUDGET", f"файлов больше {self.max_files}")
+        if self.max_functions and self.functions > self.max_functions:
+            raise TaskStopped("FUNCTIONS_BUDGET", f"функций больше {self.max_functions}")
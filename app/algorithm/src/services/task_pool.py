@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from aio_pika.abc import AbstractIncomingMessage
+
+from services.manage.user_quota_manager import UserQuotaManager
+from utils.logger import create_logger
+
+log = create_logger("TaskPool")
+
+
+class TaskPool:
+    """
+    Пул обработчиков задач из очереди фиксированного размера.
+    Сообщение подтверждается только после успешной обработки (для разбора - после отправки DONE).
+    При ошибке задача возвращается в очередь один раз, повторная ошибка отклоняет её окончательно.
+    С quota задача пользователя, у которого уже много задач в работе, не занимает обработчик:
+    defer кладёт её копию в очередь ожидания, а исходное сообщение подтверждается.
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[None]], size: int,
+                 quota: Optional[UserQuotaManager] = None,
+                 defer: Optional[Callable[[AbstractIncomingMessage], Awaitable[None]]] = None):
+        if size < 1:
+            raise ValueError(f"Размер пула задач должен быть положительным, получено {size}")
+        if (quota is None) != (defer is None):
+            raise ValueError("Ограничение задач пользователя требует способа отложить задачу")
+        self.handler = handler
+        self.size = size
+        self.quota = quota
+        self.defer = defer
+        self._slots = asyncio.Semaphore(size)
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, body: Dict[str, Any], message: AbstractIncomingMessage) -> None:
+        """Ждёт свободного обработчика и запускает задачу"""
+        await self._slots.acquire()
+        if self.quota is not None and not await self.quota.acquire(body):
+            self._slots.release()
+            await self._defer(body, message)
+            return
+        task = asyncio.create_task(self._run(body, message))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        self._slots.release()
+
+    async def _run(self, body: Dict[str, Any], message: AbstractIncomingMessage) -> None:
+        try:
+            await self.handler(body)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # остановка сервиса: задачу доделает другая реплика
+                await self._release(body, finished=False)
+                await self._nack(message, requeue=True)
+                raise
+            # CancelledError изнутри обработчика (например, отменённый gRPC вызов) - это ошибка задачи
+            await self._failed(body, message, "вызов отменён")
+        except Exception as e:
+            await self._failed(body, message, e)
+        else:
+            await self._release(body, finished=True)
+            try:
+                await message.ack()
+                log.info(f"Задача обработана: {body}")
+            except Exception as e:
+                log.error(f"Задача {body} обработана, но подтверждение не отправлено: {e}")
+
+    async def _failed(self, body: Dict[str, Any], message: AbstractIncomingMessage, error: Any) -> None:
+        requeue = not message.redelivered
+        log.error(f"Ошибка обработки задачи {body}: {error}, "
+                  f"{'возвращена в очередь' if requeue else 'отклонена после повторной попытки'}")
+        await self._release(body, finished=not requeue)
+        await self._nack(message, requeue=requeue)
+
+    async def _release(self, body: Dict[str, Any], finished: bool) -> None:
+        if self.quota is not None:
+            await self.quota.release(body, finished)
+
+    async def _defer(self, body: Dict[str, Any], message: AbstractIncomingMessage) -> None:
+        try:
+            await self.defer(message)
+        except Exception as e:
+            log.error(f"Не удалось отложить задачу {body}: {e}")
+            await self._nack(message, requeue=True)
+            return
+        try:
+            await message.ack()
+        except Exception as e:
+            # копия уже в очереди ожидания: задача может выполниться дважды, что для разбора безопасно
+            log.error(f"Задача {body} отложена, но подтверждение не отправлено: {e}")
+
+    @staticmethod
+    async def _nack(message: AbstractIncomingMessage, requeue: bool) -> None:
+        try:
+            await message.nack(requeue=requeue)
+        except Exception as e:
+            # канал уже закрыт - брокер сам вернёт неподтверждённое сообщение в очередь
+            log.error(f"Не удалось вернуть сообщение в очередь: {e}")
+
+    async def close(self) -> None:
+        """Отменяет выполняющиеся задачи и ждёт их завершения"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
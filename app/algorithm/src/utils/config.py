@@ -20,6 +20,11 @@ class ConfigBroker:
     user: str
     password: str
     exchange: str
+    workers: int
+    control_key: str
+    max_priority: int
+    queue_deferred: str
+    queue_legacy: str
 
 @dataclass
 class ConfigS3:
@@ -29,11 +34,65 @@ class ConfigS3:
     ACCESS_ID: str
     SECRET_KEY: str
     BUCKET: str
+    max_pool_connections: int
+    keepalive_timeout: float
 
 @dataclass
 class ConfigGRPC:
     host: str
     port: int
+    compression: str
+    max_streams: int
+    connect_timeout: float
+    keepalive_time: float
+    keepalive_timeout: float
+    reconnect_backoff_max: float
+    architecture_encoding: str
+    architecture_batch_size: int
+    architecture_batch_bytes: int
+    architecture_batch_window: float
+
+@dataclass
+class ConfigParser:
+    fetch_concurrency: int
+    global_fetch_concurrency: int
+    fetch_ordered: bool
+    backend: str
+    workers: int
+    archive_spool_memory: int
+    archive_spool_dir: str
+
+@dataclass
+class ConfigRedis:
+    host: str
+    port: int
+    db: int
+
+@dataclass
+class ConfigCache:
+    backend: str
+    dir: str
+    max_bytes: int
+    snapshots: bool
+
+@dataclass
+class ConfigBudget:
+    seconds: float
+    max_bytes: int
+    max_files: int
+    max_functions: int
+
+@dataclass
+class ConfigSchedule:
+    user_max_running: int
+    backend: str
+    defer_seconds: float
+
+@dataclass
+class ConfigIgnore:
+    defaults: bool
+    patterns: list[str]
+    gitignore: bool
 
 @dataclass
 class Config:
@@ -41,6 +100,12 @@ class Config:
     broker: ConfigBroker
     s3: ConfigS3
     grpc: ConfigGRPC
+    parser: ConfigParser
+    redis: ConfigRedis
+    cache: ConfigCache
+    budget: ConfigBudget
+    ignore: ConfigIgnore
+    schedule: ConfigSchedule
 
 
 def load_config() -> Config:
@@ -51,11 +116,19 @@ def load_config() -> Config:
         ),
         broker = ConfigBroker(
             host=os.environ.get("RABBIT_HOST","localhost"),
-            queue_task=os.environ.get("RABBIT_QUEUE_TASKS","tasks"),
+            # очередь с приоритетами: у старой очереди tasks их нет, а аргументы очереди после создания не меняются
+            queue_task=os.environ.get("RABBIT_QUEUE_TASKS", "tasks.priority"),
             queue_result=os.environ.get("RABBIT_QUEUE_RESULTS", "results"),
             user=os.environ.get("RabbitMQ_USER", "guest"),
             password=os.environ.get("RabbitMQ_PASSWORD", "guest"),
-            exchange=os.environ.get("RABBIT_EXCHANGE","default_exchange")
+            exchange=os.environ.get("RABBIT_EXCHANGE","default_exchange"),
+            workers=int(os.environ.get("ALGORITHM_TASK_WORKERS", 1)),
+            control_key=os.environ.get("RABBIT_CONTROL_KEY", "control"),
+            max_priority=int(os.environ.get("RABBIT_MAX_PRIORITY", 9)),
+            queue_deferred=os.environ.get("RABBIT_QUEUE_DEFERRED", "tasks.deferred"),
+            # очередь задач до перехода на tasks.priority: алгоритм отвязывает её от exchange и дочитывает.
+            # Когда в ней не останется сообщений (rabbitmqctl list_queues), её можно удалить и задать ""
+            queue_legacy=os.environ.get("RABBIT_QUEUE_TASKS_LEGACY", "tasks")
         ),
         s3=ConfigS3(
             host=os.environ.get("MINIO_HOST", "minio"),
@@ -63,11 +136,62 @@ def load_config() -> Config:
             port_console=os.environ.get("S3_CONSOLE_PORT", 9001),
             ACCESS_ID=os.environ.get("ACCESS_ID", "admin"),
             SECRET_KEY=os.environ.get("SECRET_KEY", "123456789"),
-            BUCKET=os.environ.get("BUCKET", "default")
+            BUCKET=os.environ.get("BUCKET", "default"),
+            max_pool_connections=int(os.environ.get("S3_MAX_POOL_CONNECTIONS", 50)),
+            keepalive_timeout=float(os.environ.get("S3_KEEPALIVE_TIMEOUT", 60))
         ),
         grpc=ConfigGRPC(
             host=os.environ.get("GRPC_HOST", "core_service"),
-            port=os.environ.get("GRPC_PORT", 50051)
+            port=os.environ.get("GRPC_PORT", 50051),
+            compression=os.environ.get("GRPC_COMPRESSION", "gzip"),
+            max_streams=int(os.environ.get("GRPC_MAX_STREAMS", 100)),
+            connect_timeout=float(os.environ.get("GRPC_CONNECT_TIMEOUT", 10)),
+            keepalive_time=float(os.environ.get("GRPC_KEEPALIVE_TIME", 30)),
+            keepalive_timeout=float(os.environ.get("GRPC_KEEPALIVE_TIMEOUT", 10)),
+            reconnect_backoff_max=float(os.environ.get("GRPC_RECONNECT_BACKOFF_MAX", 10)),
+            architecture_encoding=os.environ.get("GRPC_ARCHITECTURE_ENCODING", "batch"),
+            architecture_batch_size=int(os.environ.get("GRPC_ARCHITECTURE_BATCH_SIZE", 500)),
+            architecture_batch_bytes=int(os.environ.get("GRPC_ARCHITECTURE_BATCH_BYTES", 1024 * 1024)),
+            architecture_batch_window=float(os.environ.get("GRPC_ARCHITECTURE_BATCH_WINDOW", 0.05))
+        ),
+        parser=ConfigParser(
+            fetch_concurrency=int(os.environ.get("PARSER_FETCH_CONCURRENCY", 16)),
+            global_fetch_concurrency=int(os.environ.get("PARSER_GLOBAL_FETCH_CONCURRENCY", 50)),
+            fetch_ordered=os.environ.get("PARSER_FETCH_ORDERED", "false").lower() in ["true", "1", "yes"],
+            backend=os.environ.get("PARSER_BACKEND", "process"),
+            workers=int(os.environ.get("PARSER_WORKERS", 0)),
+            archive_spool_memory=int(os.environ.get("PARSER_ARCHIVE_SPOOL_MEMORY", 64 * 1024 * 1024)),
+            archive_spool_dir=os.environ.get("PARSER_ARCHIVE_SPOOL_DIR")
+        ),
+        redis=ConfigRedis(
+            host=os.environ.get("REDIS_HOST", "redis"),
+            port=int(os.environ.get("REDIS_PORT", 6379)),
+            db=int(os.environ.get("REDIS_DB", 0))
+        ),
+        cache=ConfigCache(
+            backend=os.environ.get("PARSE_CACHE_BACKEND", "disk"),
+            dir=os.environ.get("PARSE_CACHE_DIR", "/tmp/algorithm_parse_cache"),
+            max_bytes=int(os.environ.get("PARSE_CACHE_MAX_BYTES", 512 * 1024 * 1024)),
+            snapshots=os.environ.get("ANALYSIS_SNAPSHOTS", "false").lower() in ["true", "1", "yes"]
+        ),
+        # 0 - без ограничения
+        budget=ConfigBudget(
+            seconds=float(os.environ.get("TASK_MAX_SECONDS", 900)),
+            max_bytes=int(os.environ.get("TASK_MAX_BYTES", 1024 * 1024 * 1024)),
+            max_files=int(os.environ.get("TASK_MAX_FILES", 50000)),
+            max_functions=int(os.environ.get("TASK_MAX_FUNCTIONS", 1000000))
+        ),
+        # шаблоны в формате .gitignore через запятую, добавляются после встроенных
+        ignore=ConfigIgnore(
+            defaults=os.environ.get("IGNORE_DEFAULTS", "true").lower() in ["true", "1", "yes"],
+            patterns=[item.strip() for item in os.environ.get("IGNORE_PATTERNS", "").split(",") if item.strip()],
+            gitignore=os.environ.get("IGNORE_GITIGNORE", "true").lower() in ["true", "1", "yes"]
+        ),
+        # user_max_running 0 - без ограничения на пользователя
+        schedule=ConfigSchedule(
+            user_max_running=int(os.environ.get("TASK_USER_MAX_RUNNING", 2)),
+            backend=os.environ.get("TASK_SLOTS_BACKEND", "redis"),
+            defer_seconds=float(os.environ.get("TASK_DEFER_SECONDS", 5))
         )
     )
 
@@ -0,0 +1,96 @@
+import asyncio
+
+from grpc_.algorithm_client import algorithm_client
+from infrastructure.broker.consumer import Consumer
+from infrastructure.broker.manager import ConnectionBrokerManager
+from infrastructure.broker.producer import Producer
+from services.manage.object_manager import object_manager
+from services.manage.parse_cache_manager import parse_cache
+from services.manage.task_control_manager import task_control
+from services.manage.user_quota_manager import user_quota
+from services.parse_backend import parse_backend
+from services.parse_service import run_parse_microservice
+from services.task_pool import TaskPool
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+
+log = create_logger("MainService")
+
+
+async def parse_task(msg):
+    await run_parse_microservice(msg["task_id"], msg["project_path"], msg.get("project_key"), msg.get("budget"),
+                                 msg.get("ignore"))
+
+
+async def consume_tasks(consumer: Consumer, pool: TaskPool):
+    async for msg, message in consumer.deliveries():
+        log.info(f"Получена задача: {msg}")
+        await pool.submit(msg, message)
+
+
+async def consume_control(consumer: Consumer):
+    """Управляющие сообщения (отмена задач) приходят каждой реплике"""
+    async for msg in consumer.messages():
+        try:
+            task_control.handle(msg)
+        except Exception as e:
+            log.error(f"Ошибка обработки управляющего сообщения {msg}: {e}")
+
+
+async def main():
+    conn = ConnectionBrokerManager(
+        queue_name=CONFIG.broker.queue_task,
+        key="tasks",
+        max_priority=CONFIG.broker.max_priority
+    )
+    consumer = Consumer(conn)
+    producer = Producer(conn)
+    control_conn = ConnectionBrokerManager(
+        queue_name="",
+        key=CONFIG.broker.control_key,
+        exclusive=True
+    )
+    control_consumer = Consumer(control_conn)
+    # задачи пользователя сверх ограничения ждут в очереди ожидания и возвращаются в основную
+    pool = TaskPool(parse_task, size=CONFIG.broker.workers, quota=user_quota,
+                    defer=lambda message: producer.defer(message, CONFIG.broker.queue_deferred))
+
+    parse_backend.start()
+    await object_manager.repo.start()
+    await parse_cache.start()
+    await user_quota.start()
+    await algorithm_client.start()
+    await conn.connect()
+    await conn.declare_delay_queue(CONFIG.broker.queue_deferred, CONFIG.schedule.defer_seconds)
+    await control_conn.connect()
+    # prefetch равен размеру пула: лишние задачи остаются в очереди для других реплик
+    await consumer.start(CONFIG.broker.queue_task, prefetch_count=pool.size)
+    await control_consumer.start(control_conn.queue_name, prefetch_count=100)
+    control = asyncio.create_task(consume_control(control_consumer))
+    # задачи, оставшиеся в прежней очереди без приоритетов, дочитываются вместе с основной очередью;
+    # чтение не прекращается, когда она опустеет: туда ещё могут вернуться неподтверждённые задачи
+    legacy = None
+    if CONFIG.broker.queue_legacy and CONFIG.broker.queue_legacy != CONFIG.broker.queue_task:
+        legacy_queue = await conn.detach_queue(CONFIG.broker.queue_legacy, prefetch_count=pool.size)
+        if legacy_queue is not None:
+            legacy_consumer = Consumer(conn)
+            legacy_consumer.attach(legacy_queue)
+            legacy = asyncio.create_task(consume_tasks(legacy_consumer, pool))
+    log.info(f"Готов к получению сообщений, обработчиков: {pool.size}")
+
+    try:
+        await consume_tasks(consumer, pool)
+    finally:
+        control.cancel()
+        if legacy is not None:
+            legacy.cancel()
+        await pool.close()
+        await conn.close()
+        await control_conn.close()
+        await algorithm_client.close()
+        await object_manager.repo.close()
+        await parse_cache.close()
+        await user_quota.close()
+        parse_backend.shutdown()
+
@@ -20,13 +20,16 @@ class ConnectionBrokerManager(AbstractConnectionBroker):
                  user: str = CONFIG.broker.user,
                  password: str = CONFIG.broker.password,
                  exchange: str = CONFIG.broker.exchange,
-                 exchange_type: str = 'direct') -> None:
+                 exchange_type: str = 'direct',
+                 max_priority: int = 0) -> None:
         self.host: str = host
         self.user: str = user
         self.password: str = password
         self.exchange_name: str = exchange
         self.exchange_type: str = exchange_type
         self.queue_name: str = queue_name
+        # max_priority > 0 - очередь с приоритетами сообщений 0..max_priority
+        self.max_priority: int = max_priority
 
         self.exchange: Optional[Exchange] = None
         self.connection: Optional[AbstractRobustConnection] = None
@@ -55,7 +58,8 @@ class ConnectionBrokerManager(AbstractConnectionBroker):
             log.info("Подключение к брокеру закрыто")
 
     async def _create_queue(self, queue_name: str) -> AbstractQueue:
-        queue: AbstractQueue = await self.channel.declare_queue(queue_name, durable=True)
+        arguments = {"x-max-priority": self.max_priority} if self.max_priority else None
+        queue: AbstractQueue = await self.channel.declare_queue(queue_name, durable=True, arguments=arguments)
         log.info(f"Создана очередь: {queue_name}")
         return queue
 
@@ -1,4 +1,5 @@
 import json
+from typing import Optional
 
 import aio_pika
 from aio_pika import Message
@@ -13,14 +14,16 @@ class Producer:
     def __init__(self, connection: AbstractConnectionBroker):
         self.connection: AbstractConnectionBroker = connection
 
-    async def publish(self, routing_key: str, message: dict, persistent: bool = True) -> None:
+    async def publish(self, routing_key: str, message: dict, persistent: bool = True,
+                      priority: Optional[int] = None) -> None:
         try:
             body: bytes = json.dumps(message).encode()
             msg: Message = aio_pika.Message(
                 body,
                 delivery_mode=aio_pika.DeliveryMode.PERSISTENT if persistent else aio_pika.DeliveryMode.NOT_PERSISTENT,
+                priority=priority,
             )
             await self.connection.exchange.publish(msg, routing_key=routing_key)
-            log.info(f"Отправлено {routing_key}: {message}")
+            log.info(f"Отправлено {routing_key}{'' if priority is None else f' с приоритетом {priority}'}: {message}")
         except Exception as e:
             log.error(f"Ошибка при отправке сообщения {e}")
@@ -16,6 +16,18 @@ class AbstractRedisConnector(ABC):
     async def delete_verification_code(self, key: str) -> bool:
         pass
 
+    @abstractmethod
+    async def add_active_task(self, user_id: int, task_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def remove_active_task(self, user_id: int, task_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def count_active_tasks(self, user_id: int, ttl: int) -> int:
+        pass
+
     @abstractmethod
     async def check_redis(self) -> None:
         pass
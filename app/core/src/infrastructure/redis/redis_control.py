@@ -1,3 +1,4 @@
+import time
 from typing import Optional
 
 import redis
@@ -27,6 +28,26 @@ class RedisConnector(AbstractRedisConnector, redis.asyncio.Redis):
         log.info(f"В Redis удален код верификации для {key}")
         return True
 
+    @staticmethod
+    def active_tasks_key(user_id: int) -> str:
+        """Задачи пользователя в очереди и в работе; алгоритм удаляет задачу из набора, закончив её"""
+        return f"tasks:active:{user_id}"
+
+    async def add_active_task(self, user_id: int, task_id: int) -> None:
+        await self.zadd(self.active_tasks_key(user_id), {str(task_id): time.time()})
+
+    async def remove_active_task(self, user_id: int, task_id: int) -> None:
+        await self.zrem(self.active_tasks_key(user_id), str(task_id))
+
+    async def count_active_tasks(self, user_id: int, ttl: int) -> int:
+        # задачи старше ttl не учитываются: алгоритм мог не отметить их завершение (сбой реплики)
+        key = self.active_tasks_key(user_id)
+        async with self.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(key, "-inf", time.time() - ttl)
+            pipe.zcard(key)
+            _, count = await pipe.execute()
+        return count
+
     async def check_redis(self):
         try:
             pong = await self.ping()
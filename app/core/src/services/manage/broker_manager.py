@@ -1,6 +1,9 @@
+from typing import Optional
+
 from infrastructure.broker.interface import AbstractConnectionBroker
 from infrastructure.broker.manager import ConnectionBrokerManager
 from infrastructure.broker.producer import Producer
+from utils.config import CONFIG
 from utils.logger import create_logger
 
 log = create_logger("BrokerManagerService")
@@ -11,15 +14,16 @@ class BrokerManager:
         self.repo = repo
         self.producer = Producer(repo)
 
-    async def publish(self, routing_key: str, message: dict):
+    async def publish(self, routing_key: str, message: dict, priority: Optional[int] = None):
         """Отправка сообщения с повторными попытками через Producer."""
         try:
-            await self.producer.publish(routing_key, message)
+            await self.producer.publish(routing_key, message, priority=priority)
             return
         except Exception as e:
             log.error(f"Ошибка при вызове инфраструктуры в сервисном слое {routing_key}: {e}")
             raise
 
 
-broker_repo_task = ConnectionBrokerManager(queue_name="tasks", key="tasks")
+broker_repo_task = ConnectionBrokerManager(queue_name=CONFIG.broker.queue_task, key="tasks",
+                                           max_priority=CONFIG.broker.max_priority)
 broker_manager = BrokerManager(broker_repo_task)
@@ -8,14 +8,20 @@ from fastapi import UploadFile
 
 from infrastructure.object_storage.interface import AbstractStorage
 from infrastructure.object_storage.object_storage_manager import ObjectStorageManager
+from utils.config import CONFIG
 from utils.logger import create_logger
 
 log = create_logger("ObjectManagerService")
 
 
 class ObjectManager:
-    def __init__(self, repo: AbstractStorage):
+    UPLOAD_MODES = ("unpacked", "archive")
+
+    def __init__(self, repo: AbstractStorage, upload_mode: str = CONFIG.s3.upload_mode):
+        if upload_mode not in self.UPLOAD_MODES:
+            raise ValueError(f"Неизвестный режим загрузки репозитория {upload_mode}, допустимы: {self.UPLOAD_MODES}")
         self.repo = repo
+        self.upload_mode = upload_mode
 
     @staticmethod
     def generate_key(user: str, filename: str, tag: str = None):
@@ -53,6 +59,9 @@ class ObjectManager:
             while chunk := await fileobj.read(1024 * 1024):
                 tmp_file.write(chunk)
 
+        if self.upload_mode == "archive":
+            return await self._upload_archive(temp_archive_path, filename, user)
+
         with tempfile.TemporaryDirectory() as tmpdir:
             extract_dir = Path(tmpdir)
 
@@ -89,6 +98,23 @@ class ObjectManager:
 
         return f"{base_path}/unpacked/"
 
+    async def _upload_archive(self, temp_archive_path: Path, filename: str, user: str) -> str:
+        """Архив сохраняется одним объектом, алгоритм читает его одним запросом"""
+        try:
+            if zipfile.is_zipfile(temp_archive_path):
+                archive_type = "zip"
+            elif tarfile.is_tarfile(temp_archive_path):
+                archive_type = "tar"
+            else:
+                raise ValueError("Файл не является ZIP или TAR архивом")
+
+            s3_key = f"{self.generate_key(user, filename)}/archive.{archive_type}"
+            await self.repo.upload_file_with_path(key=s3_key, filepath=str(temp_archive_path))
+            return s3_key
+
+        finally:
+            temp_archive_path.unlink(missing_ok=True)
+
 
 s3_repo = ObjectStorageManager()
 object_manager = ObjectManager(s3_repo)
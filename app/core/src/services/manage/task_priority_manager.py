@@ -0,0 +1,54 @@
+import math
+
+from infrastructure.redis.interface import AbstractRedisConnector
+from infrastructure.redis.redis_control import Redis
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("TaskPriorityManagerService")
+
+
+class TaskPriorityManager:
+    """
+    Приоритет задачи разбора в очереди брокера: 0..max_priority, больше - раньше.
+    Небольшой проект получает максимальный приоритет, каждое удвоение размера сверх small_bytes снижает его
+    на единицу, и ещё на единицу - каждая задача пользователя, которая уже в очереди или в работе.
+    Так десяток больших загрузок одного пользователя не задерживает маленький проект другого.
+    """
+
+    def __init__(self, repo: AbstractRedisConnector, max_priority: int = CONFIG.broker.max_priority,
+                 small_bytes: int = CONFIG.tasks.small_project_bytes, active_ttl: int = CONFIG.tasks.active_ttl):
+        self.repo = repo
+        self.max_priority = max_priority
+        self.small_bytes = small_bytes
+        self.active_ttl = active_ttl
+
+    def size_penalty(self, size: int) -> int:
+        if size <= self.small_bytes:
+            return 0
+        return int(math.log2(size / self.small_bytes))
+
+    async def priority(self, user_id: int, size: int) -> int:
+        try:
+            active = await self.repo.count_active_tasks(user_id, self.active_ttl)
+        except Exception as e:
+            # без Redis приоритет считается только по размеру
+            log.error(f"Не удалось получить число задач пользователя {user_id}: {e}")
+            active = 0
+        return max(0, self.max_priority - self.size_penalty(size) - active)
+
+    async def register(self, user_id: int, task_id: int) -> None:
+        try:
+            await self.repo.add_active_task(user_id, task_id)
+        except Exception as e:
+            log.error(f"Не удалось учесть задачу {task_id} пользователя {user_id}: {e}")
+
+    async def unregister(self, user_id: int, task_id: int) -> None:
+        """Задача не попала в очередь: алгоритм её не получит и сам не снимет с учёта"""
+        try:
+            await self.repo.remove_active_task(user_id, task_id)
+        except Exception as e:
+            log.error(f"Не удалось снять с учёта задачу {task_id} пользователя {user_id}: {e}")
+
+
+task_priority = TaskPriorityManager(Redis)
@@ -9,6 +9,8 @@ from models.project_models import ProjectData, ArchitectureModel, ProjectCreateD
     ProjectListDataLite, ProjectDataLite
 from services.manage.broker_manager import broker_manager
 from services.manage.object_manager import object_manager
+from services.manage.task_priority_manager import task_priority
+from utils.config import CONFIG
 from utils.logger import create_logger
 
 log = create_logger("ProjectService")
@@ -45,7 +47,20 @@ class ProjectService:
 
             project = await Project.create_project(create_data=create_data, author_id=user_data.id, files_url=path)
 
-            await broker_manager.publish(routing_key="tasks", message={"task_id": project.id, "project_path": path})
+            # приоритет считается до учёта самой задачи: по размеру архива и задачам пользователя в работе
+            size = file.size or 0
+            priority = await task_priority.priority(user_data.id, size)
+            # учёт до публикации: иначе алгоритм может закончить задачу и снять её с учёта раньше, чем core
+            # её учтёт, и она до active_ttl будет числиться в работе и снижать приоритет пользователя
+            await task_priority.register(user_data.id, project.id)
+            try:
+                await broker_manager.publish(routing_key="tasks", priority=priority,
+                                             message={"task_id": project.id, "project_path": path,
+                                                      "project_key": project.id, "user_id": user_data.id,
+                                                      "size": size})
+            except Exception:
+                await task_priority.unregister(user_data.id, project.id)
+                raise
 
             architecture = ArchitectureModel(**project.architecture) if project.architecture else ArchitectureModel(
                 requirements=None, endpoints=None, data=None)
@@ -87,6 +102,10 @@ class ProjectService:
         try:
             await Project.delete_project(project_id, user_data.id)
 
+            # разбор удалённого проекта больше не нужен: алгоритм остановит задачу, если она ещё идёт
+            await broker_manager.publish(routing_key=CONFIG.broker.control_key,
+                                         message={"type": "cancel", "task_id": project_id, "reason": "проект удалён"})
+
             return
 
         except DataBaseEntityNotExists as e:
@@ -42,6 +42,14 @@ class ConfigBroker:
     user: str
     password: str
     exchange: str
+    max_priority: int
+    control_key: str
+
+
+@dataclass
+class ConfigTasks:
+    small_project_bytes: int
+    active_ttl: int
 
 
 @dataclass
@@ -52,6 +60,7 @@ class ConfigS3:
     ACCESS_ID: str
     SECRET_KEY: str
     BUCKET: str
+    upload_mode: str
 
 
 @dataclass
@@ -90,6 +99,7 @@ class Config:
     email: ConfigEmail
     redis: ConfigRedis
     postbox: ConfigPostbox
+    tasks: ConfigTasks
 
 
 def load_config() -> Config:
@@ -117,11 +127,15 @@ def load_config() -> Config:
         ),
         broker=ConfigBroker(
             host=os.environ.get("RABBIT_HOST", "localhost"),
-            queue_task=os.environ.get("RABBIT_QUEUE_TASKS", "tasks"),
+            # очередь с приоритетами: у старой очереди tasks их нет, а аргументы очереди после создания не меняются
+            queue_task=os.environ.get("RABBIT_QUEUE_TASKS", "tasks.priority"),
             queue_result=os.environ.get("RABBIT_QUEUE_RESULTS", "results"),
             user=os.environ.get("RabbitMQ_USER", "guest"),
             password=os.environ.get("RabbitMQ_PASSWORD", "guest"),
-            exchange=os.environ.get("RABBIT_EXCHANGE", "default_exchange")
+            exchange=os.environ.get("RABBIT_EXCHANGE", "default_exchange"),
+            max_priority=int(os.environ.get("RABBIT_MAX_PRIORITY", 9)),
+            # ключ управляющих сообщений алгоритму (отмена задач), тот же, что у алгоритма
+            control_key=os.environ.get("RABBIT_CONTROL_KEY", "control")
         ),
         s3=ConfigS3(
             host=os.environ.get("MINIO_HOST", "minio"),
@@ -129,7 +143,8 @@ def load_config() -> Config:
             port_console=os.environ.get("S3_CONSOLE_PORT", 9001),
             ACCESS_ID=os.environ.get("ACCESS_ID", "admin"),
             SECRET_KEY=os.environ.get("SECRET_KEY", "123456789"),
-            BUCKET=os.environ.get("BUCKET", "default")
+            BUCKET=os.environ.get("BUCKET", "default"),
+            upload_mode=os.environ.get("S3_UPLOAD_MODE", "unpacked")
         ),
         grpc=ConfigGRPC(
             host=os.environ.get("GRPC_HOST", "0.0.0.0"),
@@ -148,6 +163,10 @@ def load_config() -> Config:
             key_id = os.environ["ID_KEY"],
             secret_key = os.environ["ACCESS_KEY"],
             sender_email = os.environ["SENDER_EMAIL"]
+        ),
+        tasks=ConfigTasks(
+            small_project_bytes=int(os.environ.get("TASK_PRIORITY_SMALL_BYTES", 1024 * 1024)),
+            active_ttl=int(os.environ.get("TASK_ACTIVE_TTL", 24 * 60 * 60))
         )
     )
 
@@ -1,117 +1,191 @@
 import grpc
 import asyncio
+from contextlib import aclosing
 from grpc_reflection.v1alpha import reflection
 from grpc_control.generated.shared import common_pb2
 from grpc_control.generated.api import core_pb2_grpc, algorithm_pb2_grpc, core_pb2, algorithm_pb2
+from infrastructure.sessions.interface import AbstractSessionStore
+from infrastructure.sessions.memory_sessions import InMemorySessionStore
+from infrastructure.sessions.redis_sessions import RedisSessionStore
+from utils.config import CONFIG
 from utils.logger import create_logger
 
 log = create_logger("CoreGRPC")
 
-
-class TaskSession:
-    def __init__(self, task_id: int):
-        self.task_id = task_id
-        self.message_queue = asyncio.Queue()
-        self.all_messages = []
-        self.frontend_connected = set()
-        self.finished = False
-
-    async def add_message(self, msg: common_pb2.GraphPartResponse):
-        self.all_messages.append(msg)
-        await self.message_queue.put(msg)
-
-    async def get_next_message(self):
-        return await self.message_queue.get()
-
-    def get_all_messages(self):
-        return list(self.all_messages)
-
-    async def mark_done(self):
-        self.finished = True
-
-
-class TaskManager:
-    def __init__(self):
-        self.tasks = {}
-
-    def get_or_create_session(self, task_id: int):
-        if task_id not in self.tasks:
-            self.tasks[task_id] = TaskSession(task_id)
-        return self.tasks[task_id]
-
-    def remove_session(self, task_id: int):
-        if task_id in self.tasks:
-            del self.tasks[task_id]
+COMPRESSION = {
+    "none": grpc.Compression.NoCompression,
+    "gzip": grpc.Compression.Gzip,
+    "deflate": grpc.Compression.Deflate,
+}
+
+
+def describe_message(msg: common_pb2.GraphPartResponse) -> str:
+    """Краткое описание сообщения для журнала: содержимое пачек архитектуры не печатается"""
+    part = msg.WhichOneof("graph_part_type")
+    description = (f"task_id={msg.task_id} response_id={msg.response_id} "
+                   f"status={common_pb2.ParseStatus.Name(msg.status)} part={part}")
+    if part == "graph_architecture_batch":
+        description += f" edges={len(msg.graph_architecture_batch.edges)}"
+    elif part == "graph_architecture_encoded":
+        encoded = msg.graph_architecture_encoded
+        description += f" edges={len(encoded.parents)} new_nodes={len(encoded.nodes)}"
+    elif part == "graph_delta":
+        delta = msg.graph_delta
+        description += (f" base_task_id={delta.base_task_id} changed_files={delta.changed_files}"
+                        f" +nodes={len(delta.added_nodes)} -nodes={len(delta.removed_nodes)}"
+                        f" +edges={sum(len(edge.children) for edge in delta.added_edges)}"
+                        f" -edges={sum(len(edge.children) for edge in delta.removed_edges)}")
+    if msg.HasField("summary"):
+        summary = msg.summary
+        description += (f" complete={summary.complete} reason={common_pb2.StopReason.Name(summary.reason)}"
+                        f" files={summary.files} functions={summary.functions} elapsed={summary.elapsed:.1f}"
+                        f" skipped_files={summary.skipped_files}")
+    return description
+
+
+def create_session_store(backend: str = CONFIG.sessions.backend) -> AbstractSessionStore:
+    if backend == "redis":
+        return RedisSessionStore()
+    if backend == "memory":
+        return InMemorySessionStore()
+    raise ValueError(f"Неизвестный бэкенд сессий {backend}")
 
 
 class FrontendStreamService(core_pb2_grpc.FrontendStreamServiceServicer):
-    def __init__(self, task_manager: TaskManager):
-        self.task_manager = task_manager
+    def __init__(self, sessions: AbstractSessionStore,
+                 compression: str = CONFIG.compression.algorithm,
+                 compression_min_bytes: int = CONFIG.compression.min_bytes,
+                 cancel_on_disconnect_after: float = CONFIG.tasks.cancel_on_disconnect_after):
+        if compression not in COMPRESSION:
+            raise ValueError(f"Неизвестное сжатие {compression}, допустимы: {tuple(COMPRESSION)}")
+        self.sessions = sessions
+        self.compression = COMPRESSION[compression]
+        self.compression_min_bytes = compression_min_bytes
+        self.cancel_on_disconnect_after = cancel_on_disconnect_after
+        self._abandoned = set()
+
+    def _setup_compression(self, context) -> bool:
+        """
+        Сжатие сообщений стрима. gRPC сжимает ответ, не проверяя grpc-accept-encoding клиента,
+        а gRPC-Web клиенты сжатые сообщения не читают: для них (заголовок x-grpc-web от Envoy)
+        сообщения идут без сжатия, ответ целиком сжимает Envoy через Content-Encoding.
+        """
+        if self.compression == grpc.Compression.NoCompression:
+            return False
+        for key, value in context.invocation_metadata():
+            if key == "x-grpc-web" or (key == "x-user-agent" and value.startswith("grpc-web")):
+                return False
+        context.set_compression(self.compression)
+        return True
 
     async def RunAlgorithm(self, request, context):
-        session = self.task_manager.get_or_create_session(request.task_id)
-        session.frontend_connected.add(context)
+        task_id = request.task_id
+        await self.sessions.attach(task_id, context)
+        compressed = self._setup_compression(context)
 
-        log.info(f"[FRONT] Подключён фронтенд task_id={request.task_id}")
-
-        # Отдаём уже накопленные сообщения
-        for msg in session.get_all_messages():
-            log.info(f"[FRONT] → Отдаём накопленное сообщение на фронт: {msg}")
-            log.info(f"[FRONT] Детали сообщения:\n{msg}")
+        log.info(f"[FRONT] Подключён фронтенд task_id={task_id}")
 
+        # сначала уже накопленные сообщения, затем новые
+        replay = await self.sessions.backlog(task_id)
+        sent = 0
+        finished = False
         try:
-            while True:
-                try:
-                    msg = await asyncio.wait_for(session.get_next_message(), timeout=0.1)
-
-                    # Логируем САМО сообщение перед отправкой
-                    log.info(f"[FRONT] → Отдаём новое сообщение на фронт: {msg}")
-                    log.info(f"[FRONT] Детали сообщения:\n{msg}")
-
+            # подписка закрывается сразу при отключении фронтенда: в Redis она держит соединение с XREAD
+            async with aclosing(self.sessions.subscribe(task_id)) as messages:
+                async for msg in messages:
+                    log.info(f"[FRONT] → Отдаём {'накопленное' if sent < replay else 'новое'} сообщение на фронт: "
+                             f"{describe_message(msg)}")
+                    sent += 1
+
+                    # мелкие служебные сообщения сжимать невыгодно
+                    if compressed and msg.ByteSize() < self.compression_min_bytes:
+                        context.disable_next_message_compression()
                     yield msg
+            finished = True
 
-                except asyncio.TimeoutError:
-                    if session.finished and session.message_queue.empty():
-                        log.info(
-                            f"[FRONT] Завершаем отдачу сообщений task_id={request.task_id}"
-                        )
-                        break
+            log.info(f"[FRONT] Завершаем отдачу сообщений task_id={task_id}")
 
         finally:
-            session.frontend_connected.discard(context)
-            log.info(f"[FRONT] Отключение фронтенда task_id={request.task_id}")
-
-            if session.finished and not session.frontend_connected and session.message_queue.empty():
-                self.task_manager.remove_session(request.task_id)
-                log.info(f"[TASK_MANAGER] Полная очистка task_id={request.task_id}")
+            log.info(f"[FRONT] Отключение фронтенда task_id={task_id}")
+            left = await self.sessions.detach(task_id, context)
+            if (not left and not finished and self.cancel_on_disconnect_after > 0
+                    and not await self.sessions.is_finished(task_id)):
+                task = asyncio.create_task(self._cancel_abandoned(task_id))
+                self._abandoned.add(task)
+                task.add_done_callback(self._abandoned.discard)
+
+    async def _cancel_abandoned(self, task_id: int):
+        """Отменяет задачу, если за cancel_on_disconnect_after секунд ни один фронтенд не вернулся"""
+        await asyncio.sleep(self.cancel_on_disconnect_after)
+        if not await self.sessions.frontends(task_id) and await self.sessions.cancel(task_id, "фронтенд отключился"):
+            log.info(f"[TASK_MANAGER] Задача task_id={task_id} отменена: фронтенд не вернулся "
+                     f"за {self.cancel_on_disconnect_after} с")
+
+    async def CancelTask(self, request, context):
+        if await self.sessions.cancel(request.task_id, "отменена фронтендом"):
+            log.info(f"[FRONT] Отмена задачи task_id={request.task_id}")
+        return common_pb2.Empty()
 
 
 class AlgorithmConnectionService(algorithm_pb2_grpc.AlgorithmConnectionServiceServicer):
-    def __init__(self, task_manager: TaskManager):
-        self.task_manager = task_manager
+    def __init__(self, sessions: AbstractSessionStore):
+        self.sessions = sessions
 
     async def ConnectToCore(self, request_iterator, context):
-        session = None
+        # алгоритм передаёт task_id в метаданных: задачу можно отменить ещё до первого сообщения
+        task_id = dict(context.invocation_metadata()).get("x-task-id")
+        if task_id is None:
+            await self._receive(request_iterator)
+            return common_pb2.Empty()
+
+        task_id = int(task_id)
+        await self.sessions.open_stream(task_id)
+        receiving = asyncio.create_task(self._receive(request_iterator))
+        cancelled = asyncio.create_task(self.sessions.wait_cancelled(task_id))
+        try:
+            await asyncio.wait((receiving, cancelled), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            interrupted = not receiving.done()
+            if interrupted:
+                receiving.cancel()
+                await asyncio.wait((receiving,))
+            if not cancelled.done():
+                cancelled.cancel()
+                await asyncio.wait((cancelled,))
+            await self.sessions.close_stream(task_id)
+
+        if not interrupted:
+            # ошибки чтения стрима - как и раньше, ошибка вызова
+            receiving.result()
+            return common_pb2.Empty()
+
+        reason = cancelled.result()
+        log.info(f"[ALGORITHM] Стрим task_id={task_id} оборван: {reason}")
+        await self.sessions.finish(task_id, common_pb2.StopReason.CANCELLED, reason)
+        await context.abort(grpc.StatusCode.CANCELLED, reason)
+
+    async def _receive(self, request_iterator):
         async for msg in request_iterator:
-            if session is None:
-                session = self.task_manager.get_or_create_session(msg.task_id)
-            await session.add_message(msg)
-            if msg.status == common_pb2.ParseStatus.DONE:
-                await session.mark_done()
-        return common_pb2.Empty()
+            await self.sessions.append(msg.task_id, msg)
 
 
 class CoreServer:
-    def __init__(self, host='0.0.0.0', port=50051):
-        self.task_manager = TaskManager()
-        self.server = grpc.aio.server()
+    def __init__(self, host=CONFIG.server.host, port=CONFIG.server.port,
+                 keepalive_min_ping_interval=CONFIG.server.keepalive_min_ping_interval):
+        self.sessions = create_session_store()
+        # воркеры алгоритма держат постоянный канал с keepalive и между задачами:
+        # без этих опций сервер отвечает на частые ping без вызовов GOAWAY too_many_pings
+        self.server = grpc.aio.server(options=[
+            ("grpc.keepalive_permit_without_calls", 1),
+            ("grpc.http2.min_ping_interval_without_data_ms", int(keepalive_min_ping_interval * 1000)),
+        ])
 
         # Регистрируем сервисы
         core_pb2_grpc.add_FrontendStreamServiceServicer_to_server(
-            FrontendStreamService(self.task_manager), self.server
+            FrontendStreamService(self.sessions), self.server
         )
         algorithm_pb2_grpc.add_AlgorithmConnectionServiceServicer_to_server(
-            AlgorithmConnectionService(self.task_manager), self.server
+            AlgorithmConnectionService(self.sessions), self.server
         )
 
         # Включаем рефлексию
@@ -126,9 +200,11 @@ class CoreServer:
         self.port = self.server.add_insecure_port(f'{host}:{port}')
 
     async def start(self):
+        await self.sessions.start()
         await self.server.start()
         log.info(f"gRPC CoreServer запущен на порту {self.port}")
 
     async def stop(self):
         await self.server.stop(0)
+        await self.sessions.stop()
         log.info("gRPC CoreServer остановлен")
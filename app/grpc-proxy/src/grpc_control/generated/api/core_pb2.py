@@ -25,7 +25,7 @@ _sym_db = _symbol_database.Default()
 from grpc_control.generated.shared import common_pb2 as shared_dot_common__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0e\x61pi/core.proto\x12\x08\x63ore.api\x1a\x13shared/common.proto\"4\n\x10\x41lgorithmRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x03\x12\x0f\n\x07task_id\x18\x02 \x01(\x03\x32\x62\n\x15\x46rontendStreamService\x12I\n\x0cRunAlgorithm\x12\x1a.core.api.AlgorithmRequest\x1a\x19.common.GraphPartResponse\"\x00\x30\x01\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x0e\x61pi/core.proto\x12\x08\x63ore.api\x1a\x13shared/common.proto\"4\n\x10\x41lgorithmRequest\x12\x0f\n\x07user_id\x18\x01 \x01(\x03\x12\x0f\n\x07task_id\x18\x02 \x01(\x03\x32\x9d\x01\n\x15\x46rontendStreamService\x12I\n\x0cRunAlgorithm\x12\x1a.core.api.AlgorithmRequest\x1a\x19.common.GraphPartResponse\"\x00\x30\x01\x12\x39\n\nCancelTask\x12\x1a.core.api.AlgorithmRequest\x1a\r.common.Empty\"\x00\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -34,6 +34,6 @@ if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_ALGORITHMREQUEST']._serialized_start=49
   _globals['_ALGORITHMREQUEST']._serialized_end=101
-  _globals['_FRONTENDSTREAMSERVICE']._serialized_start=103
-  _globals['_FRONTENDSTREAMSERVICE']._serialized_end=201
+  _globals['_FRONTENDSTREAMSERVICE']._serialized_start=104
+  _globals['_FRONTENDSTREAMSERVICE']._serialized_end=261
 # @@protoc_insertion_point(module_scope)
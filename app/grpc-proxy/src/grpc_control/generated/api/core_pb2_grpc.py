@@ -40,6 +40,11 @@ class FrontendStreamServiceStub(object):
                 request_serializer=api_dot_core__pb2.AlgorithmRequest.SerializeToString,
                 response_deserializer=shared_dot_common__pb2.GraphPartResponse.FromString,
                 _registered_method=True)
+        self.CancelTask = channel.unary_unary(
+                '/core.api.FrontendStreamService/CancelTask',
+                request_serializer=api_dot_core__pb2.AlgorithmRequest.SerializeToString,
+                response_deserializer=shared_dot_common__pb2.Empty.FromString,
+                _registered_method=True)
 
 
 class FrontendStreamServiceServicer(object):
@@ -52,6 +57,13 @@ class FrontendStreamServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def CancelTask(self, request, context):
+        """Отмена задачи: алгоритм прекращает разбор, фронтенды получают DONE с причиной CANCELLED
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_FrontendStreamServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -60,6 +72,11 @@ def add_FrontendStreamServiceServicer_to_server(servicer, server):
                     request_deserializer=api_dot_core__pb2.AlgorithmRequest.FromString,
                     response_serializer=shared_dot_common__pb2.GraphPartResponse.SerializeToString,
             ),
+            'CancelTask': grpc.unary_unary_rpc_method_handler(
+                    servicer.CancelTask,
+                    request_deserializer=api_dot_core__pb2.AlgorithmRequest.FromString,
+                    response_serializer=shared_dot_common__pb2.Empty.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'core.api.FrontendStreamService', rpc_method_handlers)
@@ -97,3 +114,30 @@ class FrontendStreamService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def CancelTask(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/core.api.FrontendStreamService/CancelTask',
+            api_dot_core__pb2.AlgorithmRequest.SerializeToString,
+            shared_dot_common__pb2.Empty.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
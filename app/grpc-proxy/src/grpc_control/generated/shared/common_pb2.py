@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13shared/common.proto\x12\x06\x63ommon\"\x07\n\x05\x45mpty\"\xa2\x02\n\x11GraphPartResponse\x12\x0f\n\x07task_id\x18\x01 \x01(\x03\x12\x13\n\x0bresponse_id\x18\x02 \x01(\x05\x12#\n\x06status\x18\x03 \x01(\x0e\x32\x13.common.ParseStatus\x12;\n\x12graph_requirements\x18\x04 \x01(\x0b\x32\x1d.common.GraphPartRequirementsH\x00\x12\x35\n\x0fgraph_endpoints\x18\x05 \x01(\x0b\x32\x1a.common.GraphPartEndpointsH\x00\x12;\n\x12graph_architecture\x18\x06 \x01(\x0b\x32\x1d.common.GraphPartArchitectureH\x00\x42\x11\n\x0fgraph_part_type\"<\n\x15GraphPartRequirements\x12\r\n\x05total\x18\x01 \x01(\r\x12\x14\n\x0crequirements\x18\x02 \x03(\t\"\x93\x01\n\x12GraphPartEndpoints\x12\r\n\x05total\x18\x01 \x01(\r\x12<\n\tendpoints\x18\x02 \x03(\x0b\x32).common.GraphPartEndpoints.EndpointsEntry\x1a\x30\n\x0e\x45ndpointsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"9\n\x15GraphPartArchitecture\x12\x0e\n\x06parent\x18\x01 \x01(\t\x12\x10\n\x08\x63hildren\x18\x02 \x03(\t*T\n\x0bParseStatus\x12\t\n\x05START\x10\x00\x12\x10\n\x0cREQUIREMENTS\x10\x01\x12\r\n\tENDPOINTS\x10\x02\x12\x0f\n\x0b\x41RHITECTURE\x10\x03\x12\x08\n\x04\x44ONE\x10\x04\x62\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x13shared/common.proto\x12\x06\x63ommon\"\x07\n\x05\x45mpty\"\x90\x04\n\x11GraphPartResponse\x12\x0f\n\x07task_id\x18\x01 \x01(\x03\x12\x13\n\x0bresponse_id\x18\x02 \x01(\x05\x12#\n\x06status\x18\x03 \x01(\x0e\x32\x13.common.ParseStatus\x12;\n\x12graph_requirements\x18\x04 \x01(\x0b\x32\x1d.common.GraphPartRequirementsH\x00\x12\x35\n\x0fgraph_endpoints\x18\x05 \x01(\x0b\x32\x1a.common.GraphPartEndpointsH\x00\x12;\n\x12graph_architecture\x18\x06 \x01(\x0b\x32\x1d.common.GraphPartArchitectureH\x00\x12\x46\n\x18graph_architecture_batch\x18\x07 \x01(\x0b\x32\".common.GraphPartArchitectureBatchH\x00\x12J\n\x1agraph_architecture_encoded\x18\x08 \x01(\x0b\x32$.common.GraphPartArchitectureEncodedH\x00\x12-\n\x0bgraph_delta\x18\t \x01(\x0b\x32\x16.common.GraphPartDeltaH\x00\x12)\n\x07summary\x18\n \x01(\x0b\x32\x18.common.GraphPartSummaryB\x11\n\x0fgraph_part_type\"<\n\x15GraphPartRequirements\x12\r\n\x05total\x18\x01 \x01(\r\x12\x14\n\x0crequirements\x18\x02 \x03(\t\"\x93\x01\n\x12GraphPartEndpoints\x12\r\n\x05total\x18\x01 \x01(\r\x12<\n\tendpoints\x18\x02 \x03(\x0b\x32).common.GraphPartEndpoints.EndpointsEntry\x1a\x30\n\x0e\x45ndpointsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"9\n\x15GraphPartArchitecture\x12\x0e\n\x06parent\x18\x01 \x01(\t\x12\x10\n\x08\x63hildren\x18\x02 \x03(\t\"J\n\x1aGraphPartArchitectureBatch\x12,\n\x05\x65\x64ges\x18\x01 \x03(\x0b\x32\x1d.common.GraphPartArchitecture\"}\n\x1cGraphPartArchitectureEncoded\x12\x13\n\x0bnode_offset\x18\x01 \x01(\r\x12\r\n\x05nodes\x18\x02 \x03(\t\x12\x0f\n\x07parents\x18\x03 \x03(\r\x12\x16\n\x0e\x63hildren_count\x18\x04 \x03(\r\x12\x10\n\x08\x63hildren\x18\x05 \x03(\r\"\xed\x01\n\x0eGraphPartDelta\x12\x14\n\x0c\x62\x61se_task_id\x18\x01 \x01(\x03\x12\x13\n\x0b\x61\x64\x64\x65\x64_nodes\x18\x02 \x03(\t\x12\x15\n\rremoved_nodes\x18\x03 \x03(\t\x12\x32\n\x0b\x61\x64\x64\x65\x64_edges\x18\x04 \x03(\x0b\x32\x1d.common.GraphPartArchitecture\x12\x34\n\rremoved_edges\x18\x05 \x03(\x0b\x32\x1d.common.GraphPartArchitecture\x12\x15\n\rchanged_files\x18\x06 \x01(\r\x12\x18\n\x10reanalyzed_files\x18\x07 \x01(\r\"\xc8\x01\n\x10GraphPartSummary\x12\x10\n\x08\x63omplete\x18\x01 \x01(\x08\x12\"\n\x06reason\x18\x02 \x01(\x0e\x32\x12.common.StopReason\x12\x0e\n\x06\x64\x65tail\x18\x03 \x01(\t\x12\r\n\x05\x66iles\x18\x04 \x01(\r\x12\r\n\x05\x62ytes\x18\x05 \x01(\x04\x12\x11\n\tfunctions\x18\x06 \x01(\r\x12\x0f\n\x07\x65lapsed\x18\x07 \x01(\x01\x12\x15\n\rskipped_files\x18\x08 \x01(\r\x12\x15\n\rskipped_bytes\x18\t \x01(\x04*\x91\x01\n\nStopReason\x12\r\n\tCOMPLETED\x10\x00\x12\r\n\tCANCELLED\x10\x01\x12\x0f\n\x0bTIME_BUDGET\x10\x02\x12\x10\n\x0c\x42YTES_BUDGET\x10\x03\x12\x10\n\x0c\x46ILES_BUDGET\x10\x04\x12\x14\n\x10\x46UNCTIONS_BUDGET\x10\x05\x12\x0b\n\x07\x45XPIRED\x10\x06\x12\r\n\tTRUNCATED\x10\x07*_\n\x0bParseStatus\x12\t\n\x05START\x10\x00\x12\x10\n\x0cREQUIREMENTS\x10\x01\x12\r\n\tENDPOINTS\x10\x02\x12\x0f\n\x0b\x41RHITECTURE\x10\x03\x12\x08\n\x04\x44ONE\x10\x04\x12\t\n\x05\x44\x45LTA\x10\x05\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -33,18 +33,28 @@ if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
   _globals['_GRAPHPARTENDPOINTS_ENDPOINTSENTRY']._loaded_options = None
   _globals['_GRAPHPARTENDPOINTS_ENDPOINTSENTRY']._serialized_options = b'8\001'
-  _globals['_PARSESTATUS']._serialized_start=604
-  _globals['_PARSESTATUS']._serialized_end=688
+  _globals['_STOPREASON']._serialized_start=1489
+  _globals['_STOPREASON']._serialized_end=1634
+  _globals['_PARSESTATUS']._serialized_start=1636
+  _globals['_PARSESTATUS']._serialized_end=1731
   _globals['_EMPTY']._serialized_start=31
   _globals['_EMPTY']._serialized_end=38
   _globals['_GRAPHPARTRESPONSE']._serialized_start=41
-  _globals['_GRAPHPARTRESPONSE']._serialized_end=331
-  _globals['_GRAPHPARTREQUIREMENTS']._serialized_start=333
-  _globals['_GRAPHPARTREQUIREMENTS']._serialized_end=393
-  _globals['_GRAPHPARTENDPOINTS']._serialized_start=396
-  _globals['_GRAPHPARTENDPOINTS']._serialized_end=543
-  _globals['_GRAPHPARTENDPOINTS_ENDPOINTSENTRY']._serialized_start=495
-  _globals['_GRAPHPARTENDPOINTS_ENDPOINTSENTRY']._serialized_end=543
-  _globals['_GRAPHPARTARCHITECTURE']._serialized_start=545
-  _globals['_GRAPHPARTARCHITECTURE']._serialized_end=602
+  _globals['_GRAPHPARTRESPONSE']._serialized_end=569
+  _globals['_GRAPHPARTREQUIREMENTS']._serialized_start=571
+  _globals['_GRAPHPARTREQUIREMENTS']._serialized_end=631
+  _globals['_GRAPHPARTENDPOINTS']._serialized_start=634
+  _globals['_GRAPHPARTENDPOINTS']._serialized_end=781
+  _globals['_GRAPHPARTENDPOINTS_ENDPOINTSENTRY']._serialized_start=733
+  _globals['_GRAPHPARTENDPOINTS_ENDPOINTSENTRY']._serialized_end=781
+  _globals['_GRAPHPARTARCHITECTURE']._serialized_start=783
+  _globals['_GRAPHPARTARCHITECTURE']._serialized_end=840
+  _globals['_GRAPHPARTARCHITECTUREBATCH']._serialized_start=842
+  _globals['_GRAPHPARTARCHITECTUREBATCH']._serialized_end=916
+  _globals['_GRAPHPARTARCHITECTUREENCODED']._serialized_start=918
+  _globals['_GRAPHPARTARCHITECTUREENCODED']._serialized_end=1043
+  _globals['_GRAPHPARTDELTA']._serialized_start=1046
+  _globals['_GRAPHPARTDELTA']._serialized_end=1283
+  _globals['_GRAPHPARTSUMMARY']._serialized_start=1286
+  _globals['_GRAPHPARTSUMMARY']._serialized_end=1486
 # @@protoc_insertion_point(module_scope)
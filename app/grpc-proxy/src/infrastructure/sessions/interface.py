@@ -0,0 +1,79 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Dict
+
+from grpc_control.generated.shared import common_pb2
+
+
+class AbstractSessionStore(ABC):
+    """
+    Сессии задач: журнал сообщений алгоритма, общий для всех фронтендов задачи, и её состояние
+    (завершена, отменена, открыт ли стрим алгоритма). Стрим алгоритма и фронтенды одной задачи
+    встречаются только через хранилище, поэтому с общим хранилищем они могут попасть на разные реплики.
+    """
+
+    @abstractmethod
+    async def start(self) -> None:
+        pass
+
+    @abstractmethod
+    async def stop(self) -> None:
+        pass
+
+    @abstractmethod
+    async def append(self, task_id: int, msg: common_pb2.GraphPartResponse) -> None:
+        """Сообщение алгоритма в журнал задачи; DONE завершает задачу"""
+        pass
+
+    @abstractmethod
+    def subscribe(self, task_id: int) -> AsyncIterator[common_pb2.GraphPartResponse]:
+        """Все сообщения задачи с первого и до DONE; ждёт новые, пока задача не завершена"""
+        pass
+
+    @abstractmethod
+    async def backlog(self, task_id: int) -> int:
+        """Сколько сообщений уже в журнале: их фронтенд получит как накопленные"""
+        pass
+
+    @abstractmethod
+    async def attach(self, task_id: int, frontend: object) -> None:
+        pass
+
+    @abstractmethod
+    async def detach(self, task_id: int, frontend: object) -> int:
+        """Отключение фронтенда; возвращает, сколько фронтендов задачи ещё подключено"""
+        pass
+
+    @abstractmethod
+    async def frontends(self, task_id: int) -> int:
+        pass
+
+    @abstractmethod
+    async def is_finished(self, task_id: int) -> bool:
+        pass
+
+    @abstractmethod
+    async def cancel(self, task_id: int, reason: str) -> bool:
+        """Отменяет задачу; без открытого стрима алгоритма сразу завершает её. False - уже завершена или отменена"""
+        pass
+
+    @abstractmethod
+    async def open_stream(self, task_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def close_stream(self, task_id: int) -> None:
+        pass
+
+    @abstractmethod
+    async def wait_cancelled(self, task_id: int) -> str:
+        """Ждёт отмены задачи с открытым стримом алгоритма, возвращает причину"""
+        pass
+
+    @abstractmethod
+    async def finish(self, task_id: int, reason: int, detail: str) -> None:
+        """DONE от имени алгоритма: его стрим оборван, а фронтенды должны узнать, что задача закончена"""
+        pass
+
+    @abstractmethod
+    def stats(self) -> Dict[str, object]:
+        pass
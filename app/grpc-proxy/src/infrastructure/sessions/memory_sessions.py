@@ -0,0 +1,289 @@
+import asyncio
+import heapq
+import time
+from collections import Counter, OrderedDict
+from typing import AsyncIterator, Callable, Dict, List, Optional
+
+from grpc_control.generated.shared import common_pb2
+from infrastructure.sessions.interface import AbstractSessionStore
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("InMemorySessionStore")
+
+
+class TaskSession:
+    """
+    Задача в прокси: журнал сообщений алгоритма, общий для всех подписчиков.
+    Журнал только дополняется, каждый фронтенд читает его своим курсором: сначала история, затем новые
+    сообщения по мере поступления. Подписчики не мешают друг другу, а журнал не копируется.
+    """
+
+    def __init__(self, task_id: int, on_grow: Optional[Callable[["TaskSession", int], None]] = None):
+        self.task_id = task_id
+        self.all_messages = []
+        # размер журнала (байт protobuf) и последнее обращение - для TTL и вытеснения в InMemorySessionStore
+        self.bytes = 0
+        self.last_access = time.monotonic()
+        self.on_grow = on_grow
+        self.frontend_connected = set()
+        self.finished = False
+        # новое сообщение и завершение задачи будят ожидающих фронтендов, без опроса по таймеру
+        self.changed = asyncio.Condition()
+        # отмена задачи: стрим алгоритма обрывается со статусом CANCELLED
+        self.cancelled = asyncio.Event()
+        self.cancel_reason = ""
+        # стрим алгоритма открыт; без него отменённая задача завершается сразу
+        self.streaming = False
+        # стрим алгоритма уже подключался: незавершённая сессия без стрима брошена алгоритмом
+        self.streamed = False
+
+    @property
+    def state(self) -> str:
+        if self.streaming:
+            return "streaming"
+        if self.finished:
+            return "finished"
+        return "abandoned" if self.streamed else "idle"
+
+    def touch(self):
+        self.last_access = time.monotonic()
+
+    async def add_message(self, msg: common_pb2.GraphPartResponse):
+        size = msg.ByteSize()
+        async with self.changed:
+            self.all_messages.append(msg)
+            self.bytes += size
+            self.touch()
+            self.changed.notify_all()
+        if self.on_grow is not None:
+            self.on_grow(self, size)
+
+    async def subscribe(self) -> AsyncIterator[common_pb2.GraphPartResponse]:
+        """Все сообщения задачи с первого и до DONE; ждёт новые, пока задача не завершена"""
+        cursor = 0
+        while True:
+            if cursor < len(self.all_messages):
+                yield self.all_messages[cursor]
+                cursor += 1
+                continue
+            if self.finished:
+                return
+            async with self.changed:
+                await self.changed.wait_for(lambda: cursor < len(self.all_messages) or self.finished)
+
+    async def mark_done(self):
+        async with self.changed:
+            self.finished = True
+            self.changed.notify_all()
+
+    async def cancel(self, reason: str) -> bool:
+        if self.finished or self.cancelled.is_set():
+            return False
+        self.cancel_reason = reason
+        self.cancelled.set()
+        if not self.streaming:
+            await self.finish_cancelled()
+        return True
+
+    async def finish_cancelled(self):
+        await self.finish(common_pb2.StopReason.CANCELLED, self.cancel_reason)
+
+    async def finish(self, reason: int, detail: str):
+        """DONE от имени алгоритма: его стрим оборван, а фронтенды должны узнать, что задача закончена"""
+        if self.finished:
+            return
+        last = self.all_messages[-1].response_id if self.all_messages else 0
+        await self.add_message(common_pb2.GraphPartResponse(
+            task_id=self.task_id,
+            response_id=last + 1,
+            status=common_pb2.ParseStatus.DONE,
+            summary=common_pb2.GraphPartSummary(complete=False, reason=reason, detail=detail)
+        ))
+        await self.mark_done()
+
+
+class InMemorySessionStore(AbstractSessionStore):
+    """
+    Сессии задач в памяти процесса - только для одной реплики прокси, с ограничением памяти.
+    Сессия, в которую не пишет алгоритм, живёт ограниченное время с последнего обращения: ждущая
+    алгоритма - idle_ttl, завершённая - finished_ttl (поздний фронтенд ещё получит историю), брошенная
+    алгоритмом до DONE - abandoned_ttl. Незавершённая сессия по истечении TTL завершается DONE с причиной
+    EXPIRED, подключённые фронтенды его получают.
+    Сверх max_bytes сразу вытесняются давно не использованные сессии без стрима алгоритма и фронтендов.
+    """
+
+    def __init__(self, remember_cancelled: int = 1000,
+                 idle_ttl: float = CONFIG.tasks.idle_ttl,
+                 finished_ttl: float = CONFIG.tasks.finished_ttl,
+                 abandoned_ttl: float = CONFIG.tasks.abandoned_ttl,
+                 max_bytes: int = CONFIG.tasks.max_bytes,
+                 sweep_interval: float = CONFIG.tasks.sweep_interval):
+        # порядок LRU: давно не использованные сессии в начале, каждое обращение переносит сессию в конец
+        self.tasks: OrderedDict[int, TaskSession] = OrderedDict()
+        # отменённые задачи после удаления сессии: стрим алгоритма, пришедший позже, всё равно обрывается
+        self.remember_cancelled = remember_cancelled
+        self.cancelled = OrderedDict()
+        self.ttl = {"idle": idle_ttl, "finished": finished_ttl, "abandoned": abandoned_ttl}
+        self.finished_ttl = finished_ttl
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.total_bytes = 0
+        # причина удаления -> число сессий: idle, finished, abandoned (TTL), lru (бюджет памяти), done
+        self.evicted = Counter()
+        self._over_budget = False
+        self._sweeper: Optional[asyncio.Task] = None
+
+    def get_or_create_session(self, task_id: int):
+        session = self.tasks.get(task_id)
+        if session is None:
+            session = self.tasks[task_id] = TaskSession(task_id, on_grow=self._grown)
+        else:
+            session.touch()
+            self.tasks.move_to_end(task_id)
+        return session
+
+    def remove_session(self, task_id: int, reason: str = "done"):
+        if task_id in self.tasks:
+            session = self.tasks.pop(task_id)
+            self.total_bytes -= session.bytes
+            self.evicted[reason] += 1
+            if session.cancelled.is_set():
+                self.cancelled[task_id] = session.cancel_reason
+                while len(self.cancelled) > self.remember_cancelled:
+                    self.cancelled.popitem(last=False)
+            if reason != "done":
+                log.info(f"[TASK_MANAGER] Сессия task_id={task_id} удалена ({reason}): "
+                         f"сообщений {len(session.all_messages)}, {session.bytes} байт")
+
+    async def append(self, task_id: int, msg: common_pb2.GraphPartResponse) -> None:
+        session = self.get_or_create_session(task_id)
+        await session.add_message(msg)
+        if msg.status == common_pb2.ParseStatus.DONE:
+            await session.mark_done()
+
+    async def subscribe(self, task_id: int) -> AsyncIterator[common_pb2.GraphPartResponse]:
+        async for msg in self.get_or_create_session(task_id).subscribe():
+            yield msg
+
+    async def backlog(self, task_id: int) -> int:
+        return len(self.get_or_create_session(task_id).all_messages)
+
+    async def attach(self, task_id: int, frontend: object) -> None:
+        self.get_or_create_session(task_id).frontend_connected.add(frontend)
+
+    async def detach(self, task_id: int, frontend: object) -> int:
+        session = self.tasks.get(task_id)
+        if session is None:
+            return 0
+        session.frontend_connected.discard(frontend)
+        session.touch()
+        self.tasks.move_to_end(task_id)
+        # завершённая сессия остаётся на finished_ttl для поздних фронтендов, затем её удалит sweep
+        if session.finished and not session.frontend_connected and self.finished_ttl <= 0:
+            self.remove_session(task_id)
+            log.info(f"[TASK_MANAGER] Полная очистка task_id={task_id}")
+        return len(session.frontend_connected)
+
+    async def frontends(self, task_id: int) -> int:
+        session = self.tasks.get(task_id)
+        return len(session.frontend_connected) if session is not None else 0
+
+    async def is_finished(self, task_id: int) -> bool:
+        session = self.tasks.get(task_id)
+        return session is not None and session.finished
+
+    async def cancel(self, task_id: int, reason: str) -> bool:
+        return await self.get_or_create_session(task_id).cancel(reason)
+
+    async def open_stream(self, task_id: int) -> None:
+        session = self.get_or_create_session(task_id)
+        reason = self.cancelled.pop(task_id, None)
+        if reason is not None:
+            await session.cancel(reason)
+        session.streaming = session.streamed = True
+
+    async def close_stream(self, task_id: int) -> None:
+        session = self.get_or_create_session(task_id)
+        session.streaming = False
+
+    async def wait_cancelled(self, task_id: int) -> str:
+        session = self.get_or_create_session(task_id)
+        await session.cancelled.wait()
+        return session.cancel_reason
+
+    async def finish(self, task_id: int, reason: int, detail: str) -> None:
+        await self.get_or_create_session(task_id).finish(reason, detail)
+
+    def _grown(self, session: TaskSession, size: int):
+        self.total_bytes += size
+        if session.task_id in self.tasks:
+            self.tasks.move_to_end(session.task_id)
+        if self.max_bytes and self.total_bytes > self.max_bytes:
+            self._evict(keep=session)
+
+    def _evict(self, keep: TaskSession):
+        """Вытесняет давно не использованные сессии без подключений, пока журналы не уместятся в max_bytes"""
+        evicted, freed = [], 0
+        # с начала LRU: обход заканчивается, как только освобождено достаточно
+        for session in self.tasks.values():
+            if self.total_bytes - freed <= self.max_bytes:
+                break
+            if session is not keep and not session.streaming and not session.frontend_connected:
+                evicted.append(session.task_id)
+                freed += session.bytes
+        for task_id in evicted:
+            self.remove_session(task_id, "lru")
+        over_budget = self.total_bytes > self.max_bytes
+        if over_budget and not self._over_budget:
+            log.warning(f"[TASK_MANAGER] Журналы сессий {self.total_bytes} байт больше {self.max_bytes}: "
+                        f"все оставшиеся сессии в работе")
+        self._over_budget = over_budget
+
+    async def sweep(self):
+        """Удаляет сессии с истёкшим TTL"""
+        now = time.monotonic()
+        for session in list(self.tasks.values()):
+            state = session.state
+            if state == "streaming" or now - session.last_access <= self.ttl[state]:
+                continue
+            if state == "finished":
+                # фронтенд ещё читает историю
+                if not session.frontend_connected:
+                    self.remove_session(session.task_id, state)
+                continue
+            await session.finish(common_pb2.StopReason.EXPIRED, f"нет сообщений дольше {self.ttl[state]:g} с")
+            self.remove_session(session.task_id, state)
+
+    def stats(self) -> Dict[str, object]:
+        states = Counter(session.state for session in self.tasks.values())
+        return {"sessions": len(self.tasks), "bytes": self.total_bytes, "states": dict(states),
+                "evicted": dict(self.evicted)}
+
+    def session_stats(self, top: int = 5) -> List[Dict[str, object]]:
+        """Самые большие сессии: память и состояние"""
+        now = time.monotonic()
+        largest = heapq.nlargest(top, self.tasks.values(), key=lambda session: session.bytes)
+        return [{"task_id": session.task_id, "state": session.state, "messages": len(session.all_messages),
+                 "bytes": session.bytes, "frontends": len(session.frontend_connected),
+                 "idle": round(now - session.last_access)} for session in largest]
+
+    async def start(self):
+        if self.sweep_interval > 0:
+            self._sweeper = asyncio.create_task(self._sweep_forever())
+
+    async def stop(self):
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            await asyncio.gather(self._sweeper, return_exceptions=True)
+            self._sweeper = None
+
+    async def _sweep_forever(self):
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                await self.sweep()
+                if self.tasks:
+                    log.info(f"[TASK_MANAGER] {self.stats()}, крупные сессии: {self.session_stats()}")
+            except Exception as e:
+                log.error(f"[TASK_MANAGER] Ошибка очистки сессий: {e}")
@@ -0,0 +1,318 @@
+import asyncio
+import math
+import time
+from typing import AsyncIterator, Dict, Optional, Set
+
+import redis.asyncio as redis
+
+from grpc_control.generated.shared import common_pb2
+from infrastructure.sessions.interface import AbstractSessionStore
+from utils.config import CONFIG
+from utils.logger import create_logger
+
+log = create_logger("RedisSessionStore")
+
+# Сообщение в журнал задачи. Режим: 0 - сообщение, 1 - DONE алгоритма, 2 - DONE от прокси (если задача не завершена)
+_APPEND = """
+if ARGV[3] == '2' and redis.call('HGET', KEYS[2], 'finished') == '1' then
+    return 0
+end
+if tonumber(ARGV[4]) > 0 then
+    redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[4], '*', 'm', ARGV[1])
+else
+    redis.call('XADD', KEYS[1], '*', 'm', ARGV[1])
+end
+redis.call('HSET', KEYS[2], 'last', ARGV[2], 'touched', ARGV[6])
+redis.call('HINCRBY', KEYS[2], 'bytes', ARGV[5])
+if ARGV[3] ~= '0' then
+    redis.call('HSET', KEYS[2], 'finished', '1')
+end
+redis.call('EXPIRE', KEYS[1], ARGV[7])
+redis.call('EXPIRE', KEYS[2], ARGV[7])
+return 1
+"""
+
+# Отмена: 1 - стрим алгоритма открыт на какой-то реплике, она его оборвёт; 0 - стрима нет; -1 - уже не нужна
+_CANCEL = """
+if redis.call('HGET', KEYS[1], 'finished') == '1' or redis.call('HEXISTS', KEYS[1], 'cancel') == 1 then
+    return -1
+end
+redis.call('HSET', KEYS[1], 'cancel', ARGV[1], 'touched', ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+if tonumber(redis.call('HGET', KEYS[1], 'stream_until') or '0') > tonumber(ARGV[2]) then
+    redis.call('PUBLISH', ARGV[4], ARGV[5])
+    return 1
+end
+return 0
+"""
+
+# Открытие и продление аренды стрима алгоритма; возвращает причину отмены или ''
+_LEASE = """
+redis.call('HSET', KEYS[1], 'stream_until', ARGV[1], 'streamed', '1', 'touched', ARGV[2])
+if redis.call('HGET', KEYS[1], 'finished') ~= '1' then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+    redis.call('EXPIRE', KEYS[2], ARGV[3])
+end
+return redis.call('HGET', KEYS[1], 'cancel') or ''
+"""
+
+_CLOSE = """
+redis.call('HSET', KEYS[1], 'stream_until', '0', 'touched', ARGV[1])
+if redis.call('HGET', KEYS[1], 'finished') ~= '1' then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    redis.call('EXPIRE', KEYS[2], ARGV[2])
+end
+return 1
+"""
+
+_ATTACH = """
+redis.call('HINCRBY', KEYS[1], 'frontends', 1)
+redis.call('HSET', KEYS[1], 'touched', ARGV[1])
+if redis.call('HGET', KEYS[1], 'finished') ~= '1' then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 1
+"""
+
+# Отключение фронтенда; завершённая задача без фронтендов живёт finished_ttl, при 0 - удаляется сразу
+_DETACH = """
+local left = redis.call('HINCRBY', KEYS[1], 'frontends', -1)
+if left < 0 then
+    redis.call('HSET', KEYS[1], 'frontends', '0')
+    left = 0
+end
+redis.call('HSET', KEYS[1], 'touched', ARGV[1])
+if redis.call('HGET', KEYS[1], 'finished') == '1' and left == 0 then
+    if tonumber(ARGV[2]) <= 0 then
+        redis.call('DEL', KEYS[1], KEYS[2])
+    else
+        redis.call('EXPIRE', KEYS[1], ARGV[2])
+        redis.call('EXPIRE', KEYS[2], ARGV[2])
+    end
+end
+return left
+"""
+
+
+class RedisSessionStore(AbstractSessionStore):
+    """
+    Сессии задач в Redis, общие для всех реплик прокси: стрим алгоритма и фронтенды задачи могут попасть
+    на разные реплики за Envoy.
+    Журнал задачи - Redis Stream <prefix>:<task_id>:log, каждый фронтенд читает его XREAD со своим курсором
+    (ID последней записи): сначала история, затем новые сообщения без опроса. Журнал обрезается
+    до ~max_messages записей; граф передаётся частями, поэтому фронтенд, не успевший прочитать обрезанные
+    сообщения, получает не их остаток, а DONE с причиной TRUNCATED. Состояние - хеш <prefix>:<task_id>:meta: завершена, причина отмены,
+    аренда стрима алгоритма, число фронтендов, последнее обращение.
+    Отмена публикуется в канал <prefix>:cancel, реплика со стримом алгоритма обрывает его; отмену,
+    пропущенную без подписки, стрим увидит при продлении аренды.
+    TTL те же, что у сессий в памяти: ключи незавершённой задачи живут max(idle_ttl, abandoned_ttl),
+    завершённой - finished_ttl. DONE с причиной EXPIRED отправляет фронтенд, дождавшийся истечения TTL.
+    """
+
+    def __init__(self, host: str = CONFIG.redis.host, port: int = CONFIG.redis.port, db: int = CONFIG.redis.db,
+                 prefix: str = CONFIG.sessions.prefix,
+                 max_messages: int = CONFIG.sessions.max_messages,
+                 read_block: float = CONFIG.sessions.read_block,
+                 stream_lease: float = CONFIG.sessions.stream_lease,
+                 idle_ttl: float = CONFIG.tasks.idle_ttl,
+                 finished_ttl: float = CONFIG.tasks.finished_ttl,
+                 abandoned_ttl: float = CONFIG.tasks.abandoned_ttl,
+                 read_count: int = 100,
+                 client: Optional[redis.Redis] = None):
+        self.client = client if client is not None else redis.Redis(host=host, port=port, db=db)
+        self.prefix = prefix
+        self.max_messages = max_messages
+        self.read_block = read_block
+        self.stream_lease = stream_lease
+        self.read_count = read_count
+        self.ttl = {"idle": idle_ttl, "finished": finished_ttl, "abandoned": abandoned_ttl}
+        self.finished_ttl = finished_ttl
+        self.live_ttl = math.ceil(max(idle_ttl, abandoned_ttl, stream_lease))
+        self._append = self.client.register_script(_APPEND)
+        self._cancel = self.client.register_script(_CANCEL)
+        self._lease = self.client.register_script(_LEASE)
+        self._close = self.client.register_script(_CLOSE)
+        self._attach = self.client.register_script(_ATTACH)
+        self._detach = self.client.register_script(_DETACH)
+        # стримы алгоритма на этой реплике: task_id -> события, будящие их при отмене
+        self._streams: Dict[int, Set[asyncio.Event]] = {}
+        self._subscribers = 0
+        self._listener = None
+
+    @property
+    def _channel(self) -> str:
+        return f"{self.prefix}:cancel"
+
+    def _log_key(self, task_id: int) -> str:
+        return f"{self.prefix}:{task_id}:log"
+
+    def _meta_key(self, task_id: int) -> str:
+        return f"{self.prefix}:{task_id}:meta"
+
+    def _keys(self, task_id: int):
+        return [self._meta_key(task_id), self._log_key(task_id)]
+
+    async def start(self) -> None:
+        await self.client.ping()
+        self._listener = asyncio.create_task(self._listen_cancels())
+        log.info("Сессии задач в Redis подключены")
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        await self.client.aclose()
+
+    async def append(self, task_id: int, msg: common_pb2.GraphPartResponse) -> None:
+        done = msg.status == common_pb2.ParseStatus.DONE
+        await self._append_message(task_id, msg, mode=1 if done else 0)
+
+    async def _append_message(self, task_id: int, msg: common_pb2.GraphPartResponse, mode: int) -> bool:
+        payload = msg.SerializeToString()
+        ttl = self.live_ttl if mode == 0 or self.finished_ttl <= 0 else math.ceil(self.finished_ttl)
+        return bool(await self._append(
+            keys=[self._log_key(task_id), self._meta_key(task_id)],
+            args=[payload, msg.response_id, mode, self.max_messages, len(payload), time.time(), ttl]))
+
+    async def subscribe(self, task_id: int) -> AsyncIterator[common_pb2.GraphPartResponse]:
+        key = self._log_key(task_id)
+        cursor = "0-0"
+        # response_id идут подряд с 1 (повторный стрим алгоритма начинает заново): пропуск - обрезка журнала
+        expected = 1
+        self._subscribers += 1
+        try:
+            while True:
+                entries = await self.client.xread({key: cursor}, count=self.read_count,
+                                                  block=int(self.read_block * 1000))
+                if not entries:
+                    await self._expire_if_stale(task_id)
+                    continue
+                for entry_id, fields in entries[0][1]:
+                    msg = common_pb2.GraphPartResponse.FromString(fields[b"m"])
+                    if msg.response_id > expected:
+                        log.warning(f"[SESSIONS] Журнал task_id={task_id} обрезан: пропущены сообщения "
+                                    f"{expected}..{msg.response_id - 1}")
+                        yield self._truncated(task_id, expected, msg.response_id)
+                        return
+                    expected = msg.response_id + 1
+                    cursor = entry_id
+                    yield msg
+                    if msg.status == common_pb2.ParseStatus.DONE:
+                        return
+        finally:
+            self._subscribers -= 1
+
+    @staticmethod
+    def _truncated(task_id: int, expected: int, found: int) -> common_pb2.GraphPartResponse:
+        """DONE подписчику, пропустившему обрезанную часть журнала: неполный граф он не соберёт"""
+        return common_pb2.GraphPartResponse(
+            task_id=task_id,
+            response_id=expected,
+            status=common_pb2.ParseStatus.DONE,
+            summary=common_pb2.GraphPartSummary(
+                complete=False, reason=common_pb2.StopReason.TRUNCATED,
+                detail=f"журнал задачи обрезан, сообщения {expected}..{found - 1} недоступны")
+        )
+
+    async def _expire_if_stale(self, task_id: int) -> None:
+        """Фронтенд долго не получал сообщений: незавершённая задача без стрима алгоритма завершается по TTL"""
+        meta = await self.client.hgetall(self._meta_key(task_id))
+        now = time.time()
+        if meta.get(b"finished") == b"1" or float(meta.get(b"stream_until") or 0) > now:
+            return
+        cancel = meta.get(b"cancel")
+        if cancel is not None:
+            # отменили при открытом стриме, а реплика со стримом пропала
+            await self.finish(task_id, common_pb2.StopReason.CANCELLED, cancel.decode())
+            return
+        state = "abandoned" if meta.get(b"streamed") == b"1" else "idle"
+        if now - float(meta.get(b"touched") or 0) > self.ttl[state]:
+            await self.finish(task_id, common_pb2.StopReason.EXPIRED, f"нет сообщений дольше {self.ttl[state]:g} с")
+            log.info(f"[SESSIONS] Сессия task_id={task_id} завершена по TTL ({state})")
+
+    async def backlog(self, task_id: int) -> int:
+        return await self.client.xlen(self._log_key(task_id))
+
+    async def attach(self, task_id: int, frontend: object) -> None:
+        await self._attach(keys=[self._meta_key(task_id)], args=[time.time(), self.live_ttl])
+
+    async def detach(self, task_id: int, frontend: object) -> int:
+        return int(await self._detach(keys=self._keys(task_id), args=[time.time(), math.ceil(self.finished_ttl)]))
+
+    async def frontends(self, task_id: int) -> int:
+        return int(await self.client.hget(self._meta_key(task_id), "frontends") or 0)
+
+    async def is_finished(self, task_id: int) -> bool:
+        return await self.client.hget(self._meta_key(task_id), "finished") == b"1"
+
+    async def cancel(self, task_id: int, reason: str) -> bool:
+        result = await self._cancel(keys=[self._meta_key(task_id)],
+                                    args=[reason, time.time(), self.live_ttl, self._channel, task_id])
+        if result == 0:
+            await self.finish(task_id, common_pb2.StopReason.CANCELLED, reason)
+        return result >= 0
+
+    async def _renew(self, task_id: int) -> str:
+        now = time.time()
+        reason = await self._lease(keys=self._keys(task_id), args=[now + self.stream_lease, now, self.live_ttl])
+        return reason.decode() if reason else ""
+
+    async def open_stream(self, task_id: int) -> None:
+        await self._renew(task_id)
+
+    async def close_stream(self, task_id: int) -> None:
+        await self._close(keys=self._keys(task_id), args=[time.time(), self.live_ttl])
+
+    async def wait_cancelled(self, task_id: int) -> str:
+        wakeup = asyncio.Event()
+        self._streams.setdefault(task_id, set()).add(wakeup)
+        try:
+            while True:
+                reason = await self._renew(task_id)
+                if reason:
+                    return reason
+                try:
+                    await asyncio.wait_for(wakeup.wait(), self.stream_lease / 3)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+        finally:
+            waiters = self._streams.get(task_id)
+            if waiters is not None:
+                waiters.discard(wakeup)
+                if not waiters:
+                    del self._streams[task_id]
+
+    async def finish(self, task_id: int, reason: int, detail: str) -> None:
+        last = await self.client.hget(self._meta_key(task_id), "last")
+        await self._append_message(task_id, common_pb2.GraphPartResponse(
+            task_id=task_id,
+            response_id=int(last or 0) + 1,
+            status=common_pb2.ParseStatus.DONE,
+            summary=common_pb2.GraphPartSummary(complete=False, reason=reason, detail=detail)
+        ), mode=2)
+
+    async def _listen_cancels(self):
+        while True:
+            try:
+                async with self.client.pubsub() as pubsub:
+                    await pubsub.subscribe(self._channel)
+                    # отмены, пропущенные без подписки: стримы сразу перепроверяют свои задачи
+                    self._wake(list(self._streams))
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self._wake([int(message["data"])])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log.error(f"[SESSIONS] Ошибка подписки на отмены: {e}")
+                await asyncio.sleep(1)
+
+    def _wake(self, task_ids):
+        for task_id in task_ids:
+            for wakeup in self._streams.get(task_id, ()):
+                wakeup.set()
+
+    def stats(self) -> Dict[str, object]:
+        return {"streams": len(self._streams), "subscribers": self._subscribers}
@@ -6,7 +6,7 @@ log = create_logger("CoreGRPCMain")
 
 
 async def main():
-    server = CoreServer(host='0.0.0.0', port=50051)
+    server = CoreServer()
     await server.start()
     log.info(f"gRPC CoreServer запущен на {server.port}")
 
@@ -0,0 +1,97 @@
+import os
+from dataclasses import dataclass
+
+# Переменные окружения приходят из env_file docker-compose, .env здесь не читается
+
+
+@dataclass
+class ConfigServer:
+    host: str
+    port: int
+    keepalive_min_ping_interval: float
+
+
+@dataclass
+class ConfigCompression:
+    algorithm: str
+    min_bytes: int
+
+
+@dataclass
+class ConfigTasks:
+    # через сколько секунд без фронтендов незавершённая задача отменяется, 0 - не отменять
+    cancel_on_disconnect_after: float
+    # время жизни сессии без изменений, с: ждущей алгоритма, завершённой и брошенной алгоритмом до DONE
+    idle_ttl: float
+    finished_ttl: float
+    abandoned_ttl: float
+    # общий размер журналов сессий, сверх него вытесняются давно не использованные; 0 - без ограничения
+    max_bytes: int
+    sweep_interval: float
+
+
+@dataclass
+class ConfigRedis:
+    host: str
+    port: int
+    db: int
+
+
+@dataclass
+class ConfigSessions:
+    # memory - сессии в процессе (одна реплика), redis - в Redis Streams, общие для всех реплик
+    backend: str
+    prefix: str
+    # примерная длина журнала задачи в Redis, старые сообщения обрезаются (опоздавший фронтенд получит DONE
+    # с причиной TRUNCATED); 0 - без ограничения
+    max_messages: int
+    # сколько секунд фронтенд ждёт новые сообщения одним XREAD, прежде чем проверить TTL сессии
+    read_block: float
+    # аренда стрима алгоритма: реплика продлевает её, пока стрим открыт; у упавшей реплики аренда истекает
+    stream_lease: float
+
+
+@dataclass
+class Config:
+    server: ConfigServer
+    compression: ConfigCompression
+    tasks: ConfigTasks
+    redis: ConfigRedis
+    sessions: ConfigSessions
+
+
+def load_config() -> Config:
+    return Config(
+        server=ConfigServer(
+            host=os.environ.get("GRPC_PROXY_HOST", "0.0.0.0"),
+            port=int(os.environ.get("GRPC_PROXY_PORT", 50051)),
+            keepalive_min_ping_interval=float(os.environ.get("GRPC_KEEPALIVE_MIN_PING_INTERVAL", 10)),
+        ),
+        compression=ConfigCompression(
+            algorithm=os.environ.get("GRPC_COMPRESSION", "gzip"),
+            min_bytes=int(os.environ.get("GRPC_COMPRESSION_MIN_BYTES", 1024)),
+        ),
+        tasks=ConfigTasks(
+            cancel_on_disconnect_after=float(os.environ.get("GRPC_CANCEL_ON_DISCONNECT_AFTER", 0)),
+            idle_ttl=float(os.environ.get("GRPC_SESSION_IDLE_TTL", 3600)),
+            finished_ttl=float(os.environ.get("GRPC_SESSION_FINISHED_TTL", 300)),
+            abandoned_ttl=float(os.environ.get("GRPC_SESSION_ABANDONED_TTL", 600)),
+            max_bytes=int(os.environ.get("GRPC_SESSIONS_MAX_BYTES", 512 * 1024 * 1024)),
+            sweep_interval=float(os.environ.get("GRPC_SESSION_SWEEP_INTERVAL", 30)),
+        ),
+        redis=ConfigRedis(
+            host=os.environ.get("REDIS_HOST", "redis"),
+            port=int(os.environ.get("REDIS_PORT", 6379)),
+            db=int(os.environ.get("REDIS_DB", 0)),
+        ),
+        sessions=ConfigSessions(
+            backend=os.environ.get("GRPC_SESSION_BACKEND", "memory"),
+            prefix=os.environ.get("GRPC_SESSION_PREFIX", "proxy:session"),
+            max_messages=int(os.environ.get("GRPC_SESSION_MAX_MESSAGES", 100000)),
+            read_block=float(os.environ.get("GRPC_SESSION_READ_BLOCK", 10)),
+            stream_lease=float(os.environ.get("GRPC_SESSION_STREAM_LEASE", 30)),
+        ),
+    )
+
+
+CONFIG = load_config()